@@ -12,13 +12,40 @@ import os
 import tempfile
 import subprocess
 import json
+import queue
 import re
 import time  # Add time module import
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
-from typing import Dict, Tuple, Optional, Any
-from openai import AzureOpenAI
+from contextlib import nullcontext
+from typing import Dict, Tuple, Optional, Any, List, Iterator, NamedTuple, Union
 from backend.modelica.manager import OpenModelicaManager
 from backend.modelica.generator import ModelicaCodeGenerator
+from backend.providers.azure_openai import (
+    azure_openai, chat_limiter, embedding_limiter, completion_flights, embedding_flights
+)
+from backend.db.response_cache import ResponseCache, response_key, normalize_prompt
+from backend.db.vector_store import ModelicaVectorStore
+from backend.modelica.session_pool import OMCSessionPool, PooledSession
+from backend.modelica.compile_cache import CompiledModelCache, CompiledModel, executable_name
+from backend.modelica.sweep import expand_points, run_sweep
+from backend.modelica.process import RunControl, run_process, report_on_file, SimulationTimeoutError, SimulationCancelledError
+from backend.modelica.progress import simulation_events, format_sse, format_line
+from backend.modelica.pipeline import SimulationPipeline
+from backend.modelica.jobs import SimulationJobQueue, QueueFullError, SUCCEEDED
+from backend.modelica.mat_reader import MatResultReader
+from backend.modelica.result_store import ResultStore
+from backend.modelica.simulation_setup import resolve_setup
+from backend.modelica.downsample import PyramidCache, overview
+from backend.modelica.wire import BINARY_MIMETYPE, negotiate_dtype, encode_binary, to_jsonable
+from backend.modelica.msl_index import load_msl_index
+from backend.modelica.validator import validate_references, format_issues
+from backend.modelica.outline import parse_outline, extract_code
+from backend.modelica.canonical import structural_hash
 from backend.config.settings import Settings
 from backend.utils.logger import setup_logger
 from backend.prompts.modelica_prompts import  ModelicaPrompts
@@ -27,11 +54,59 @@ import ipdb
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 结果ID只允许字母、数字、下划线、点和横线，防止路径穿越
+RESULT_ID_PATTERN = re.compile(r'^[\w.-]+$')
+# 内存中保留的生成记录数，仿真请求通过生成ID证明代码由本服务生成
+GENERATION_RECORDS = 1024
+
+# 标准库类树索引，用于在调用omc之前检查代码中的引用；未生成索引时不做检查
+msl_index = load_msl_index(Settings.MSL_INDEX_PATH) if Settings.MSL_VALIDATION != 'off' else None
+
+def reference_issues(modelica_code: str) -> List[Dict[str, Any]]:
+    """检查代码中对标准库的引用，返回问题列表，未加载索引时返回空列表"""
+    if msl_index is None:
+        return []
+    issues = validate_references(modelica_code, msl_index)
+    if issues:
+        logger.warning(f"代码引用检查发现{len(issues)}个问题:\n{format_issues(issues)}")
+    return issues
+
+def rejected_references(modelica_code: str) -> Optional[Dict[str, Any]]:
+    """引用检查未通过且配置为拒绝时返回错误结果，否则返回None"""
+    issues = reference_issues(modelica_code)
+    if not issues or Settings.MSL_VALIDATION != 'reject':
+        return None
+    return {
+        'status': '代码检查未通过',
+        'error': f"代码引用了标准库中不存在的类或组件:\n{format_issues(issues)}",
+        'issues': issues,
+        'info': None
+    }
+
+def storable_code(issues: List[Dict[str, Any]]) -> bool:
+    """生成的代码是否可以写入响应缓存：引用检查通过，或配置为不拒绝引用错误的代码"""
+    return not issues or Settings.MSL_VALIDATION != 'reject'
+
+class CheckedCode(NamedTuple):
+    """流式生成结束后检查（和修复）过的完整代码，以及修复后仍存在的引用问题"""
+    code: str
+    issues: List[Dict[str, Any]]
+
 class OpenModelicaManager:
     """OpenModelica功能管理类"""
     
     def __init__(self):
         self.omc = None
+        self.session_pool = None
+        self.compile_cache = CompiledModelCache(
+            os.path.join(os.path.dirname(__file__), 'temp', 'compile_cache'),
+            max_bytes=Settings.COMPILE_CACHE_MAX_MB * 1024 * 1024
+        )
+        self.result_store = ResultStore(
+            os.path.join(os.path.dirname(__file__), 'temp'),
+            max_age=Settings.RESULT_MAX_AGE_HOURS * 3600,
+            max_bytes=Settings.RESULT_MAX_MB * 1024 * 1024
+        )
         self.is_available = False
         self.status_message = ""
         self._check_installation()
@@ -121,6 +196,7 @@ class OpenModelicaManager:
             if result.returncode == 0:
                 logger.info(f"OpenModelica连接成功，版本：{result.stdout.strip()}")
                 self.omc = 'available'  # 标记为可用
+                self._initialize_session_pool()
                 return
                 
         except Exception as e:
@@ -129,8 +205,37 @@ class OpenModelicaManager:
             self.status_message = f"OpenModelica初始化失败: {str(e)}"
             self.omc = None
 
-    def simulate_model(self, modelica_code: str, model_name: str) -> Dict[str, Any]:
-        """执行Modelica模型仿真"""
+    def _initialize_session_pool(self) -> None:
+        """初始化常驻OMC会话池，OMPython不可用时保持子进程方式"""
+        if not Settings.OMC_POOL_ENABLED:
+            return
+        if not OMCSessionPool.is_supported():
+            logger.warning("未安装OMPython，仿真将使用omc子进程方式")
+            return
+        self.session_pool = OMCSessionPool(
+            size=Settings.OMC_POOL_SIZE,
+            max_uses=Settings.OMC_SESSION_MAX_USES,
+            preload_libraries=Settings.OMC_PRELOAD_LIBRARIES
+        )
+
+    def simulate_model(self, modelica_code: str, model_name: str,
+                       control: Optional[RunControl] = None,
+                       setup: Optional[Dict[str, Any]] = None,
+                       session: Optional[PooledSession] = None) -> Dict[str, Any]:
+        """执行Modelica模型仿真
+
+        Args:
+            modelica_code: 模型代码
+            model_name: 模型名称
+            control: 运行控制，超时或取消时结束omc子进程并抛出异常
+            setup: 仿真设置（见resolve_setup），None时使用默认设置并输出所有变量
+            session: 已提前借出的OMC会话，None时编译时再从会话池借用
+        """
+        setup = setup or resolve_setup()
+        # 引用错误的代码不必等到omc加载和翻译后才失败
+        rejected = rejected_references(modelica_code)
+        if rejected is not None:
+            return rejected
         if not self.is_available:
             return {
                 'status': 'OpenModelica未安装，仿真功能不可用',
@@ -138,79 +243,45 @@ class OpenModelicaManager:
                 'info': None
             }
 
+        result_key = self._result_key(modelica_code, model_name, setup)
+        if result_key is not None:
+            reused = self._reuse_result(result_key, setup)
+            if reused is not None:
+                return reused
+
+        run_id = None
+        promoted = False
         try:
-            # 创建基础temp目录
-            base_temp_dir = os.path.join(os.path.dirname(__file__), 'temp')
-            os.makedirs(base_temp_dir, exist_ok=True)
-            
-            # 创建results目录
-            results_dir = os.path.join(base_temp_dir, 'results')
-            os.makedirs(results_dir, exist_ok=True)
-            
-            # 为当前任务创建唯一的目录名
-            task_id = f"task_{model_name}_{int(time.time())}"
-            task_dir = os.path.join(base_temp_dir, task_id)
-            os.makedirs(task_dir, exist_ok=True)
+            # 为当前任务创建目录和模型文件
+            run_id, task_dir, model_file = self._create_task(modelica_code, model_name)
             
-            # 在任务目录中创建模型文件
-            model_file = os.path.join(task_dir, f"{model_name}.mo")
-            with open(model_file, 'w', encoding='utf-8') as f:
-                f.write(modelica_code)
-            
-            # 读取仿真脚本模板
-            template_path = os.path.join(os.path.dirname(__file__), 'simulation_template.mos')
-            try:
-                with open(template_path, 'r', encoding='utf-8') as f:
-                    template_content = f.read()
-            except FileNotFoundError:
-                logger.error(f"找不到仿真脚本模板文件: {template_path}")
+            # 执行仿真
+            result = self._run_simulation(task_dir, model_file, model_name, modelica_code, setup, control, session)
+            if result is None:
                 return {
                     'status': '仿真失败',
                     'error': '找不到仿真脚本模板文件',
                     'info': None
                 }
             
-            # 在任务目录中创建仿真脚本
-            sim_file = os.path.join(task_dir, f"{model_name}_sim.mos")
-            with open(sim_file, 'w', encoding='utf-8') as f:
-                # 使用转义的路径分隔符
-                safe_task_dir = task_dir.replace('\\', '/')
-                safe_model_file = model_file.replace('\\', '/')
-                f.write(template_content.format(
-                    temp_dir=safe_task_dir,
-                    model_file=safe_model_file,
-                    model_name=model_name
-                ))
-
-            # 执行仿真
-            result = subprocess.run(
-                ['omc', sim_file], 
-                capture_output=True, 
-                text=True,
-                cwd=task_dir
-            )
-            
             logger.info(f"仿真脚本输出:\n{result.stdout}")
             if result.stderr:
                 logger.error(f"仿真脚本错误:\n{result.stderr}")
             
             # 检查仿真结果文件
-            result_file = os.path.join(task_dir, f"{model_name}_res.csv")  # Change temp_dir to task_dir
+            result_file = os.path.join(task_dir, f"{model_name}_res.mat")
             
             if os.path.exists(result_file):
-                # 将结果文件复制到持久化目录
-                persistent_result_file = os.path.join(results_dir, f"{model_name}_res.csv")
-                import shutil
-                shutil.copy2(result_file, persistent_result_file)
+                # 将结果文件放入结果存储
+                result_file = self.result_store.promote(run_id, result_file)
+                promoted = True
                 
                 try:
-                    import pandas as pd
-                    
-                    # 读取CSV结果文件
-                    df = pd.read_csv(result_file)
+                    # 以内存映射方式读取MAT结果文件
+                    reader = MatResultReader(result_file)
                     
                     # 获取变量列表
-                    variables = df.columns.tolist()
+                    variables = reader.variables
                     
                     # 解析仿真输出以获取详细信息
                     simulation_info = {
@@ -239,28 +310,23 @@ class OpenModelicaManager:
                     
                     simulation_result = {
                         "status": status,
-                        "setup": {
-                            "stopTime": 10.0,
-                            "numberOfIntervals": 500,
-                            "method": "dassl",
-                            "tolerance": 1e-6
-                        },
+                        "result_id": run_id,
+                        "setup": setup,
                         "info": simulation_info,
                         "error": error_msg,
                         "variables": variables,
                         "data": {
-                            "time": df['time'].tolist(),
-                            "values": {
-                                col: df[col].tolist() 
-                                for col in df.columns 
-                                if col != 'time'
-                            }
+                            "time": reader.time,
+                            "values": reader.read()
                         }
                     }
                     
                     # 如果有错误信息，添加到结果中
                     if result.stderr:
                         simulation_result["error_details"] = result.stderr
+
+                    if status == "仿真成功" and result_key is not None:
+                        self.result_store.tag(run_id, result_key)
                     
                 except Exception as e:
                     logger.error(f"处理结果文件失败: {e}")
@@ -289,6 +355,8 @@ class OpenModelicaManager:
             
             return simulation_result
             
+        except (SimulationTimeoutError, SimulationCancelledError):
+            raise
         except Exception as e:
             logger.error(f"仿真过程出错: {e}")
             return {
@@ -297,8 +365,291 @@ class OpenModelicaManager:
                 'info': None
             }
         finally:
-            # Remove the cleanup code since we want to keep the task directory
-            pass
+            # 结果已保存时删除任务目录，失败的任务目录保留用于排查，由结果存储按期淘汰
+            if promoted:
+                self.result_store.release(run_id)
+
+    def _result_key(self, modelica_code: str, model_name: str, setup: Dict[str, Any]) -> Optional[str]:
+        """结果复用键：规范化代码的结构哈希（含参数值）、模型名称和仿真设置"""
+        if not Settings.RESULT_REUSE_ENABLED:
+            return None
+        key = json.dumps([model_name, structural_hash(modelica_code), setup], sort_keys=True)
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def load_result(self, run_id: str, setup: Optional[Dict[str, Any]] = None,
+                    result_file: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """从结果存储读取已保存的仿真结果，结果文件已淘汰或无法读取时返回None"""
+        result_file = result_file or self.result_store.result_path(run_id)
+        if result_file is None:
+            return None
+        try:
+            reader = MatResultReader(result_file)
+            return {
+                "status": "仿真成功",
+                "result_id": run_id,
+                "setup": setup,
+                "info": None,
+                "error": None,
+                "variables": reader.variables,
+                "data": {
+                    "time": reader.time,
+                    "values": reader.read()
+                }
+            }
+        except Exception as e:
+            logger.warning(f"读取仿真结果{run_id}失败: {e}")
+            return None
+
+    def _reuse_result(self, result_key: str, setup: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """相同的仿真已有成功结果时直接读取该结果，不再编译和运行"""
+        found = self.result_store.find(result_key)
+        if found is None:
+            return None
+        run_id, result_file = found
+        # 结果文件可能刚被淘汰，读取失败时重新仿真
+        simulation_result = self.load_result(run_id, setup, result_file)
+        if simulation_result is None:
+            return None
+        simulation_result["info"] = {"raw_output": "复用已有的仿真结果", "error_output": ""}
+        simulation_result["reused"] = True
+        logger.info(f"复用仿真结果: {run_id}")
+        return simulation_result
+
+    def _create_task(self, modelica_code: str, model_name: str) -> Tuple[str, str, str]:
+        """创建任务目录并写入模型文件
+
+        Returns:
+            (运行ID, 任务目录, 模型文件路径)
+        """
+        run_id, task_dir = self.result_store.create_run(model_name)
+        
+        # 在任务目录中创建模型文件
+        model_file = os.path.join(task_dir, f"{model_name}.mo")
+        with open(model_file, 'w', encoding='utf-8') as f:
+            f.write(modelica_code)
+        return run_id, task_dir, model_file
+
+    def compile_model(self, modelica_code: str, model_name: str, task_dir: str, model_file: str,
+                      setup: Dict[str, Any], control: Optional[RunControl] = None,
+                      session: Optional[PooledSession] = None) -> Optional[Tuple[Optional[CompiledModel], Dict[str, str], subprocess.CompletedProcess]]:
+        """编译模型，命中编译缓存时直接复用已编译的可执行文件
+
+        Returns:
+            (已编译模型, 需要覆盖的参数, 编译输出)，编译失败时已编译模型为None；
+            找不到仿真脚本模板时返回None
+        """
+        # 缓存的可执行文件链接到任务目录中运行，运行期间缓存条目被淘汰也不受影响
+        cached = self.compile_cache.lookup(model_name, modelica_code, task_dir)
+        if cached is not None:
+            compiled, overrides = cached
+            logger.info(f"命中编译缓存: {model_name}，覆盖参数: {overrides}")
+            if control is not None:
+                control.report('compile', cached=True)
+            return compiled, overrides, subprocess.CompletedProcess(['omc'], 0, '命中编译缓存', '')
+
+        build = self._build_model(task_dir, model_file, model_name, setup, control, session)
+        if build is None:
+            return None
+
+        stored = self.compile_cache.store(model_name, modelica_code, task_dir)
+        compiled = None
+        if os.path.exists(os.path.join(task_dir, executable_name(model_name))):
+            # 运行任务目录中刚编译的文件，缓存中的副本可能随时被淘汰
+            compiled = CompiledModel(task_dir, stored.meta if stored is not None else {'model_name': model_name})
+        return compiled, {}, build
+
+    def _run_simulation(self, task_dir: str, model_file: str, model_name: str, modelica_code: str,
+                        setup: Dict[str, Any], control: Optional[RunControl] = None,
+                        session: Optional[PooledSession] = None) -> Optional[subprocess.CompletedProcess]:
+        """执行仿真：编译（或复用缓存）后运行可执行文件"""
+        compiled_result = self.compile_model(modelica_code, model_name, task_dir, model_file, setup, control, session)
+        if compiled_result is None:
+            return None
+
+        compiled, overrides, build = compiled_result
+        if compiled is None:
+            # 编译失败，直接返回编译输出
+            return build
+
+        if control is not None:
+            control.report('simulate', result_file=os.path.join(task_dir, f"{model_name}_res.mat"))
+        run = compiled.run(task_dir, setup, overrides, control)
+        return subprocess.CompletedProcess(
+            run.args,
+            run.returncode,
+            f"{build.stdout}\n{run.stdout}",
+            f"{build.stderr}{run.stderr}"
+        )
+
+    def sweep_model(self, modelica_code: str, model_name: str, points: List[Dict[str, str]],
+                    setup: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """参数扫描：模型只编译一次，扫描点在进程池中并行运行
+
+        Yields:
+            首先是编译结果，然后按完成顺序返回每个扫描点的结果
+        """
+        rejected = rejected_references(modelica_code)
+        if rejected is not None:
+            yield rejected
+            return
+        if not self.is_available:
+            yield {'status': 'OpenModelica未安装，仿真功能不可用'}
+            return
+
+        setup = setup or resolve_setup()
+        run_id, task_dir, model_file = self._create_task(modelica_code, model_name)
+
+        # 编译在后台线程中进行，编译阶段作为进度返回；客户端在编译期间断开时
+        # 与扫描点一样结束编译，编译同样受墙钟时间限制
+        events = queue.Queue()
+        control = RunControl(
+            Settings.SIMULATION_TIMEOUT,
+            progress=lambda phase, info: events.put({'status': '正在编译', 'phase': phase})
+        )
+        outcome = {}
+
+        def build():
+            try:
+                outcome['result'] = self.compile_model(modelica_code, model_name, task_dir, model_file,
+                                                       setup, control)
+            except Exception as e:
+                outcome['error'] = e
+            finally:
+                events.put(None)
+
+        thread = threading.Thread(target=build, daemon=True)
+        thread.start()
+        try:
+            for event in iter(events.get, None):
+                yield event
+        finally:
+            if thread.is_alive():
+                control.cancel()
+
+        if isinstance(outcome.get('error'), SimulationTimeoutError):
+            yield {'status': '编译超时', 'error': str(outcome['error'])}
+            return
+        if 'error' in outcome:
+            raise outcome['error']
+        compiled_result = outcome['result']
+        if compiled_result is None:
+            yield {'status': '编译失败', 'error': '找不到仿真脚本模板文件'}
+            return
+
+        compiled, overrides, build = compiled_result
+        if compiled is None:
+            yield {
+                'status': '编译失败',
+                'error': self._analyze_simulation_error(build.stdout, build.stderr),
+                'info': build.stdout + build.stderr
+            }
+            return
+
+        yield {'status': '编译成功', 'points': len(points)}
+        try:
+            yield from run_sweep(
+                compiled,
+                task_dir,
+                setup,
+                points,
+                base_overrides=overrides,
+                max_workers=Settings.SWEEP_MAX_WORKERS,
+                timeout=Settings.SIMULATION_TIMEOUT
+            )
+        finally:
+            # 扫描结果已随响应返回，删除各扫描点的工作目录
+            self.result_store.release(run_id)
+
+    def _build_model(self, task_dir: str, model_file: str, model_name: str, setup: Dict[str, Any],
+                     control: Optional[RunControl] = None,
+                     session: Optional[PooledSession] = None) -> Optional[subprocess.CompletedProcess]:
+        """编译模型，优先使用提前借出的会话或常驻会话池，否则启动omc子进程"""
+        if self.session_pool is not None:
+            return self._build_in_session(task_dir, model_file, model_name, setup, control, session)
+        return self._build_with_script(task_dir, model_file, model_name, setup, control)
+
+    def _build_in_session(self, task_dir: str, model_file: str, model_name: str, setup: Dict[str, Any],
+                          control: Optional[RunControl] = None,
+                          session: Optional[PooledSession] = None) -> subprocess.CompletedProcess:
+        """在预加载了标准库的常驻OMC会话中编译模型，提前借出的会话由借出方负责归还"""
+        safe_task_dir = task_dir.replace('\\', '/')
+        safe_model_file = model_file.replace('\\', '/')
+        # Modelica字符串中反斜杠需要转义
+        safe_filter = setup['variableFilter'].replace('\\', '\\\\')
+        makefile = os.path.join(task_dir, f"{model_name}.makefile")
+        output = []
+
+        checkout_timeout = control.remaining() if control is not None else None
+        borrowed = nullcontext(session) if session is not None else self.session_pool.session(checkout_timeout)
+        with borrowed as session, \
+                (control.guard(session.kill) if control is not None else nullcontext()):
+            session.send(f'cd("{safe_task_dir}")')
+            if control is not None:
+                control.report('load')
+            if not session.send(f'loadFile("{safe_model_file}")'):
+                output.append("Failed to load model file: " + session.send("getErrorString()"))
+                return subprocess.CompletedProcess(['omc'], 1, '\n'.join(output), '')
+
+            # isModel对block和class返回false，这里只检查类是否存在，能否仿真由buildModel判断
+            if not session.send(f"isClass({model_name})"):
+                output.append(f"Model {model_name} does not exist after loading!")
+                output.append(session.send("getErrorString()"))
+                return subprocess.CompletedProcess(['omc'], 1, '\n'.join(output), '')
+
+            if control is not None:
+                control.report('translate')
+            with report_on_file(control, makefile, 'compile'):
+                build_result = session.send(
+                    f"buildModel({model_name}, "
+                    f"startTime={setup['startTime']}, "
+                    f"stopTime={setup['stopTime']}, "
+                    f"numberOfIntervals={setup['numberOfIntervals']}, "
+                    f"tolerance={setup['tolerance']}, "
+                    f'method="{setup["method"]}", '
+                    f'fileNamePrefix="{model_name}", '
+                    f'outputFormat="mat", '
+                    f'variableFilter="{safe_filter}")'
+                )
+            output.append(f"Build result: {build_result}")
+            error_string = session.send("getErrorString()")
+
+        return subprocess.CompletedProcess(['omc'], 0, '\n'.join(output), error_string)
+
+    def _build_with_script(self, task_dir: str, model_file: str, model_name: str, setup: Dict[str, Any],
+                           control: Optional[RunControl] = None) -> Optional[subprocess.CompletedProcess]:
+        """通过仿真脚本模板启动omc子进程编译模型"""
+        # 读取仿真脚本模板
+        template_path = os.path.join(os.path.dirname(__file__), 'simulation_template.mos')
+        try:
+            with open(template_path, 'r', encoding='utf-8') as f:
+                template_content = f.read()
+        except FileNotFoundError:
+            logger.error(f"找不到仿真脚本模板文件: {template_path}")
+            return None
+        
+        # 在任务目录中创建仿真脚本
+        sim_file = os.path.join(task_dir, f"{model_name}_sim.mos")
+        with open(sim_file, 'w', encoding='utf-8') as f:
+            # 使用转义的路径分隔符
+            safe_task_dir = task_dir.replace('\\', '/')
+            safe_model_file = model_file.replace('\\', '/')
+            f.write(template_content.format(
+                temp_dir=safe_task_dir,
+                model_file=safe_model_file,
+                model_name=model_name,
+                start_time=setup['startTime'],
+                stop_time=setup['stopTime'],
+                number_of_intervals=setup['numberOfIntervals'],
+                tolerance=setup['tolerance'],
+                method=setup['method'],
+                variable_filter=setup['variableFilter'].replace('\\', '\\\\')
+            ))
+
+        # 脚本在同一个omc进程中加载和翻译模型，生成makefile后开始编译
+        if control is not None:
+            control.report('load')
+        with report_on_file(control, os.path.join(task_dir, f"{model_name}.makefile"), 'compile'):
+            return run_process(['omc', sim_file], task_dir, control)
 
     def _analyze_simulation_error(self, stdout: str, stderr: str) -> str:
         """分析仿真错误原因"""
@@ -348,6 +699,11 @@ class OpenModelicaManager:
                         'path': lib_path
                     }
                 }
+
+                if self.session_pool is not None:
+                    status['details']['session_pool'] = self.session_pool.get_stats()
+                status['details']['compile_cache'] = self.compile_cache.get_stats()
+                status['details']['result_store'] = self.result_store.get_stats()
                 
             except Exception as e:
                 logger.error(f"健康检查时出错: {e}")
@@ -359,14 +715,26 @@ class ModelicaCodeGenerator:
     """Modelica代码生成器类"""
     
     def __init__(self, api_key: str, endpoint: str, deployment_name: str):
-        self.client = AzureOpenAI(
-            api_key=api_key,
-            api_version="2023-05-15",
-            azure_endpoint=endpoint
-        )
         self.modelica_prompts = ModelicaPrompts()
+        # 通过共享客户端和限流器调用Azure OpenAI
+        self.provider = azure_openai
 
         self.deployment_name = deployment_name
+        self.sampling_params = {'temperature': 0.7, 'max_tokens': 800}
+        self.response_cache = ResponseCache(
+            os.path.join(os.path.dirname(__file__), 'temp', 'response_cache'),
+            max_entries=Settings.RESPONSE_CACHE_SIZE,
+            ttl=Settings.RESPONSE_CACHE_TTL_HOURS * 3600
+        ) if Settings.RESPONSE_CACHE_ENABLED else None
+        # 仿真成功的生成结果按模型描述建立向量索引，相近的描述直接复用
+        self.semantic_cache = ModelicaVectorStore(
+            Settings.SEMANTIC_CACHE_DIR,
+            collection_name="generated_models",
+            description="仿真成功的生成模型"
+        ) if Settings.SEMANTIC_CACHE_ENABLED else None
+        # 生成ID -> (模型描述, 生成代码的结构哈希)，只有本服务生成的代码才能进入语义缓存
+        self._generations = OrderedDict()
+        self._generations_lock = threading.Lock()
        
         #self.system_prompt = self.modelica_prompts.get_system_prompt()
         #self.modelica_examples = self.modelica_prompts.get_modelica_examples()
@@ -375,9 +743,108 @@ class ModelicaCodeGenerator:
         """获取系统提示词"""
         return self.system_prompt.format(example=self.modelica_examples)
 
-    def generate_code(self, prompt: str) -> Tuple[str, str]:
-        """生成Modelica代码"""
+    def _cache_key(self, prompt: str) -> str:
+        return response_key(prompt, self._get_system_prompt(), self.deployment_name, self.sampling_params)
+
+    def _cached_code(self, prompt: str, use_cache: bool,
+                     use_semantic_cache: bool) -> Optional[Tuple[str, str]]:
+        """先查找响应缓存，再查找语义缓存，返回 (代码, 模型名称)，未命中时返回None"""
+        if not use_cache:
+            return None
+        if self.response_cache is not None:
+            entry = self.response_cache.get(self._cache_key(prompt))
+            if entry is not None:
+                logger.info(f"命中响应缓存: {entry['model_name']}")
+                return entry['code'], entry['model_name']
+        if self.semantic_cache is not None and use_semantic_cache:
+            return self._semantic_match(prompt)
+        return None
+
+    def _semantic_match(self, prompt: str) -> Optional[Tuple[str, str]]:
+        """在已仿真成功的生成结果中查找描述相近的模型"""
+        try:
+            matches = self.semantic_cache.search(
+                query=prompt,
+                similarity_threshold=Settings.SEMANTIC_CACHE_DISTANCE
+            )
+        except Exception as e:
+            logger.error(f"查询语义缓存失败: {e}")
+            return None
+        if not matches:
+            return None
+        match = matches[0]
+        logger.info(f"命中语义缓存: {match['metadata']['model_name']}，相似度{match['similarity_score']:.3f}")
+        # 与模型生成的代码保持相同的格式，前端据此将代码放入编辑器
+        return f"```modelica\n{match['code']}\n```", match['metadata']['model_name']
+
+    def remember_generation(self, prompt: str, modelica_code: str, model_name: str) -> None:
+        """将仿真成功的生成结果加入语义缓存，同一描述只保留最近一次
+
+        已保存的模型与新模型规范化后相同（只有注释、格式等不同）时不再重复写入。
+        """
+        if self.semantic_cache is None:
+            return
+        key = hashlib.sha256(normalize_prompt(prompt).encode('utf-8')).hexdigest()
+        code_hash = structural_hash(modelica_code)
+        try:
+            stored = self.semantic_cache.collection.get(ids=[key], include=['metadatas'])
+            if stored['metadatas'] and stored['metadatas'][0].get('structural_hash') == code_hash:
+                return
+            self.semantic_cache.update_example(
+                key, prompt, [], modelica_code, model_name,
+                metadata={'structural_hash': code_hash}
+            )
+        except Exception as e:
+            logger.error(f"写入语义缓存失败: {e}")
+
+    def new_generation(self, prompt: str, modelica_code: Optional[str] = None) -> str:
+        """登记一次生成，返回生成ID；流式生成时代码在结束后通过complete_generation补充"""
+        generation_id = uuid.uuid4().hex
+        with self._generations_lock:
+            self._generations[generation_id] = (prompt, None)
+            while len(self._generations) > GENERATION_RECORDS:
+                self._generations.popitem(last=False)
+        if modelica_code is not None:
+            self.complete_generation(generation_id, modelica_code)
+        return generation_id
+
+    def complete_generation(self, generation_id: str, modelica_code: str) -> None:
+        """记录生成ID对应的代码"""
+        code_hash = structural_hash(modelica_code)
+        with self._generations_lock:
+            if generation_id in self._generations:
+                self._generations[generation_id] = (self._generations[generation_id][0], code_hash)
+
+    def generated_prompt(self, generation_id: str, modelica_code: str) -> Optional[str]:
+        """生成ID对应的模型描述
+
+        代码规范化后与当时生成的代码不同（例如经过手工修改）或生成ID未知时返回None，
+        防止客户端把任意代码写入语义缓存。
+        """
+        with self._generations_lock:
+            prompt, code_hash = self._generations.get(generation_id, (None, None))
+        if code_hash is None or structural_hash(modelica_code) != code_hash:
+            return None
+        return prompt
+
+    def _store_code(self, prompt: str, modelica_code: str, model_name: str) -> None:
+        if self.response_cache is not None:
+            self.response_cache.put(self._cache_key(prompt), modelica_code, model_name)
+
+    def generate_code(self, prompt: str, use_cache: bool = True,
+                      use_semantic_cache: bool = True) -> Tuple[str, str]:
+        """生成Modelica代码
+
+        Args:
+            prompt: 模型描述
+            use_cache: 是否查找缓存，False时重新生成并刷新响应缓存
+            use_semantic_cache: 是否查找语义缓存
+        """
         try:
+            cached = self._cached_code(prompt, use_cache, use_semantic_cache)
+            if cached is not None:
+                return cached
+
             # 首先检查是否有匹配的示例代码
             # 创建全局实例
             #example_code = self.modelica_prompts.find_matching_example(prompt)
@@ -387,25 +854,126 @@ class ModelicaCodeGenerator:
                 return example_code, model_name
             else:
                 # 使用GPT生成代码
-                response = self._call_azure_openai(prompt)
-                modelica_code = response.choices[0].message.content
+                messages = self._messages(prompt)
+                modelica_code = self.provider.generate_completion(messages, **self.sampling_params)
+                if not modelica_code:
+                    raise ValueError("代码生成失败")
+                modelica_code, issues = self._repair_references(messages, modelica_code)
                 model_name = self._extract_model_name(modelica_code)
+                if storable_code(issues):
+                    self._store_code(prompt, modelica_code, model_name)
                 return modelica_code, model_name
         except Exception as e:
             logger.error(f"代码生成失败: {e}")
             raise
 
-    def _call_azure_openai(self, prompt: str) -> Any:
-        """调用Azure OpenAI API"""
-        return self.client.chat.completions.create(
-            model=self.deployment_name,
-            messages=[
-                {"role": "system", "content": self._get_system_prompt()},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=800
-        )
+    def _repair_references(self, messages: List[Dict[str, str]],
+                           modelica_code: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """代码引用了标准库中不存在的类或组件时，把问题发回模型修复，最多MSL_REPAIR_ATTEMPTS次
+
+        Returns:
+            (修复后的代码, 仍存在的引用问题)
+        """
+        issues = reference_issues(modelica_code)
+        for _ in range(Settings.MSL_REPAIR_ATTEMPTS):
+            if not issues:
+                break
+            messages = messages + [
+                {"role": "assistant", "content": modelica_code},
+                {"role": "user", "content": (
+                    f"代码中的以下引用在Modelica标准库{msl_index.version}中不存在，"
+                    f"请修正这些问题并返回完整的代码：\n{format_issues(issues)}"
+                )}
+            ]
+            repaired = self.provider.generate_completion(messages, **self.sampling_params)
+            if not repaired:
+                break
+            modelica_code = repaired
+            issues = reference_issues(modelica_code)
+        return modelica_code, issues
+
+    def generate_many(self, prompts: List[str], max_concurrency: int,
+                      use_cache: bool = True, use_semantic_cache: bool = True) -> Iterator[Dict[str, Any]]:
+        """并发生成多个模型，按完成顺序返回结果
+
+        Args:
+            prompts: 模型描述列表
+            max_concurrency: 同时进行的生成请求数上限
+            use_cache: 是否查找缓存
+            use_semantic_cache: 是否查找语义缓存
+
+        Yields:
+            每个模型描述的生成结果，带有其在输入中的index
+        """
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(prompts))))
+        futures = {
+            executor.submit(self.generate_code, prompt, use_cache, use_semantic_cache): index
+            for index, prompt in enumerate(prompts)
+        }
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    modelica_code, model_name = future.result()
+                    yield {
+                        'index': index,
+                        'status': '生成成功',
+                        'generation_id': self.new_generation(prompts[index], modelica_code),
+                        'model_name': model_name,
+                        'modelica_code': modelica_code
+                    }
+                except Exception as e:
+                    yield {'index': index, 'status': '生成失败', 'error': str(e)}
+        finally:
+            # 客户端断开时取消尚未开始的生成请求
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stream_code(self, prompt: str, use_cache: bool = True,
+                    use_semantic_cache: bool = True) -> Iterator[Tuple[str, Union[str, CheckedCode]]]:
+        """流式生成Modelica代码
+
+        识别出模型名称之前的文本片段先缓存，识别后与模型名称一起返回，
+        之后的片段在到达时立即返回。命中缓存时一次返回全部代码。
+        生成结束后检查完整代码的引用，有问题时请求模型修复，
+        最后返回CheckedCode，通过检查（或不拒绝引用错误）的代码才写入响应缓存。
+
+        Yields:
+            (模型名称, 文本片段)，最后一项为 (模型名称, CheckedCode)
+        """
+        cached = self._cached_code(prompt, use_cache, use_semantic_cache)
+        if cached is not None:
+            modelica_code, model_name = cached
+            yield model_name, modelica_code
+            yield model_name, CheckedCode(modelica_code, reference_issues(modelica_code))
+            return
+
+        messages = self._messages(prompt)
+        buffered = []
+        tokens = []
+        model_name = None
+        for token in self.provider.stream_completion(messages, **self.sampling_params):
+            tokens.append(token)
+            if model_name is None:
+                buffered.append(token)
+                # 类名之后出现其他记号才确认名称，避免把尚未生成完的名称截断
+                model_name = parse_outline(''.join(buffered))['name']
+                if model_name is None:
+                    continue
+                token = ''.join(buffered)
+            yield model_name, token
+
+        if model_name is None:
+            raise ValueError('无法从生成的代码中识别模型名称')
+        modelica_code, issues = self._repair_references(messages, ''.join(tokens))
+        if storable_code(issues):
+            self._store_code(prompt, modelica_code, model_name)
+        yield model_name, CheckedCode(modelica_code, issues)
+
+    def _messages(self, prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self._get_system_prompt()},
+            {"role": "user", "content": prompt}
+        ]
 
     def _get_system_prompt(self) -> str:
         """获取系统提示词"""
@@ -420,11 +988,11 @@ class ModelicaCodeGenerator:
 7. 确保导入所需的Modelica标准库"""
 
     def _extract_model_name(self, modelica_code: str) -> str:
-        """从代码中提取模型名称"""
-        model_match = re.search(r'model\s+(\w+)', modelica_code)
-        if not model_match:
+        """从代码中提取顶层类的名称"""
+        model_name = parse_outline(modelica_code)['name']
+        if not model_name:
             raise ValueError('无法从生成的代码中识别模型名称')
-        return model_match.group(1)
+        return model_name
 
 # 创建Flask应用
 app = Flask(__name__, 
@@ -433,6 +1001,13 @@ app = Flask(__name__,
 
 # 初始化管理器
 modelica_manager = OpenModelicaManager()
+simulation_jobs = SimulationJobQueue(
+    modelica_manager.simulate_model,
+    workers=Settings.SIMULATION_WORKERS,
+    max_queue=Settings.SIMULATION_QUEUE_SIZE,
+    default_timeout=Settings.SIMULATION_TIMEOUT
+)
+result_pyramids = PyramidCache(Settings.DOWNSAMPLE_CACHE_SIZE)
 code_generator = ModelicaCodeGenerator(
     api_key=Settings.AZURE_OPENAI_API_KEY,
     endpoint=Settings.AZURE_OPENAI_ENDPOINT,
@@ -451,55 +1026,220 @@ def generate_modelica():
         data = request.json
         print("Received data:", data)  # 调试日志
         prompt = data.get('prompt')
+        use_cache = not data.get('bypass_cache', False)
+        use_semantic_cache = data.get('semantic_cache', True)
         
         if not prompt:
             return jsonify({'error': '请提供模型描述'}), 400
+        # 请求带 "simulate": true 时边生成边仿真，仿真设置字段与 /api/simulate 相同
+        pipeline = None
+        if data.get('simulate', False):
+            try:
+                resolve_setup(data)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            pipeline = generation_pipeline(prompt, data)
+        # 仿真请求带上该ID，仿真成功时服务端确认代码未被修改后才写入语义缓存
+        generation_id = code_generator.new_generation(prompt)
         #ipdb.set_trace()
         def generate():
             try:
                 yield "正在生成 Modelica 模型...\n"
                 #ipdb.set_trace()
 
-                # 生成代码
-                modelica_code, model_name = code_generator.generate_code(prompt)
-                
-                # 发送生成的代码
-                yield f"```modelica:{model_name}.mo\n"
-                yield modelica_code
-                yield "```\n"
-                
-                # 执行仿真
-                # yield "正在执行仿真...\n"
-                # simulation_result = modelica_manager.simulate_model(modelica_code, model_name)
-                
-                # # 发送仿真结果
-                # yield f"simulation_result:{json.dumps(simulation_result, ensure_ascii=False)}\n"
-                
-                # if simulation_result['status'] == '仿真成功':
-                #     yield "仿真已完成！\n"
-                # else:
-                #     yield f"仿真失败: {simulation_result['status']}\n"
+                # 逐个转发生成的文本片段，识别出模型名称后先发送文件头
+                header_sent = False
+                tokens = []
+                checked = None
+                for model_name, token in code_generator.stream_code(prompt, use_cache, use_semantic_cache):
+                    if isinstance(token, CheckedCode):
+                        checked = token
+                        break
+                    if not header_sent:
+                        yield f"```modelica:{model_name}.mo\n"
+                        header_sent = True
+                    if pipeline is not None:
+                        pipeline.feed(model_name, token)
+                    tokens.append(token)
+                    yield token
+                streamed = ''.join(tokens)
+                # 结束标记需要单独成行
+                yield "```\n" if streamed.endswith("\n") else "\n```\n"
+
+                # 生成结束后检查完整代码的引用，修复后的代码整体再发送一次
+                modelica_code = checked.code
+                if modelica_code != streamed:
+                    yield "代码引用了标准库中不存在的类或组件，已请求模型修正，修正后的代码：\n"
+                    yield f"```modelica\n{extract_code(modelica_code).strip()}\n```\n"
+                if checked.issues:
+                    yield f"代码引用检查未通过:\n{format_issues(checked.issues)}\n"
+                code_generator.complete_generation(generation_id, modelica_code)
+
+                # 仿真在模型定义结束时已经开始（引用检查未通过时按检查后的代码开始），代码之后依次发送仿真事件
+                if pipeline is not None:
+                    yield "正在执行仿真...\n"
+                    for event, event_data in pipeline.finish(modelica_code):
+                        yield format_line(event, event_data)
                     
             except Exception as e:
                 logger.error(f"代码生成失败: {e}")
                 yield f"发生错误: {str(e)}\n"
+            finally:
+                if pipeline is not None:
+                    pipeline.close()
 
-        return Response(stream_with_context(generate()), mimetype='text/plain')
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/plain',
+            headers={'X-Accel-Buffering': 'no', 'X-Generation-Id': generation_id}
+        )
         
     except Exception as e:
         logger.error(f"处理请求时出错: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/generate/batch', methods=['POST'])
+def generate_modelica_batch():
+    """批量生成请求，结果以NDJSON流的形式按完成顺序返回"""
+    try:
+        data = request.json
+        prompts = data.get('prompts')
+        
+        if not isinstance(prompts, list) or not prompts:
+            return jsonify({'error': '请提供模型描述列表'}), 400
+        if not all(isinstance(prompt, str) and prompt.strip() for prompt in prompts):
+            return jsonify({'error': '模型描述必须是非空字符串'}), 400
+        if len(prompts) > Settings.GENERATE_BATCH_MAX_PROMPTS:
+            return jsonify({'error': f'模型描述数量超过上限{Settings.GENERATE_BATCH_MAX_PROMPTS}'}), 400
+
+        concurrency = data.get('concurrency', Settings.GENERATE_BATCH_CONCURRENCY)
+        if isinstance(concurrency, bool) or not isinstance(concurrency, int) or concurrency < 1:
+            return jsonify({'error': 'concurrency必须是正整数'}), 400
+        concurrency = max(1, min(concurrency, Settings.GENERATE_BATCH_CONCURRENCY))
+        use_cache = not data.get('bypass_cache', False)
+        use_semantic_cache = data.get('semantic_cache', True)
+
+        def generate():
+            try:
+                for result in code_generator.generate_many(prompts, concurrency, use_cache, use_semantic_cache):
+                    yield json.dumps(result, ensure_ascii=False) + "\n"
+            except Exception as e:
+                logger.error(f"批量生成出错: {e}")
+                yield json.dumps({'status': '生成失败', 'error': str(e)}, ensure_ascii=False) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+    except Exception as e:
+        logger.error(f"处理批量生成请求时出错: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/health')
 def check_health():
     """检查OpenModelica的健康状态"""
     try:
         health_status = modelica_manager.get_health_status()
+        if code_generator.response_cache is not None:
+            health_status['details']['response_cache'] = code_generator.response_cache.get_stats()
+        health_status['details']['msl_index'] = {
+            'loaded': msl_index is not None,
+            'version': msl_index.version if msl_index else None,
+            'classes': len(msl_index.classes) if msl_index else 0
+        }
+        health_status['details']['azure_openai'] = {
+            'chat': chat_limiter.get_stats(),
+            'embedding': embedding_limiter.get_stats(),
+            'coalesced_completions': completion_flights.get_stats(),
+            'coalesced_embeddings': embedding_flights.get_stats()
+        }
         return jsonify(health_status)
     except Exception as e:
         logger.error(f"健康检查API出错: {e}")
         return jsonify({'error': str(e)}), 500
 
+def overview_width(value: Any) -> Optional[int]:
+    """校验请求中的概览宽度（像素），未指定时返回None"""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError('概览宽度必须是正整数（像素）')
+    return min(value, Settings.DOWNSAMPLE_MAX_WIDTH)
+
+def simulation_response(simulation_result: Dict[str, Any], width: Optional[int] = None) -> Response:
+    """按Accept头返回二进制或JSON格式的仿真结果
+
+    指定width时数据替换为按该宽度降采样的概览（见downsample.overview），
+    data_points为原始采样点数，完整数据通过 /api/results/<result_id>/series 按窗口查询。
+    """
+    data = simulation_result.get('data')
+    if width is not None and data:
+        simulation_result = dict(simulation_result)
+        simulation_result['data'] = overview(data['time'], data['values'], width)
+        simulation_result['data_points'] = len(data['time'])
+    dtype = negotiate_dtype(request.headers.get('Accept'))
+    if dtype is not None:
+        return Response(encode_binary(simulation_result, dtype), mimetype=BINARY_MIMETYPE)
+    return jsonify(to_jsonable(simulation_result))
+
+def generated_prompt(data: Dict[str, Any]) -> Optional[str]:
+    """仿真请求中generation_id对应的模型描述，代码不是本服务为该描述生成的时返回None"""
+    generation_id = data.get('generation_id')
+    modelica_code = data.get('modelica_code')
+    if not isinstance(generation_id, str) or not isinstance(modelica_code, str):
+        return None
+    return code_generator.generated_prompt(generation_id, modelica_code)
+
+def remember_generation(prompt: Optional[str], modelica_code: str, model_name: str,
+                        simulation_result: Dict[str, Any]) -> Dict[str, Any]:
+    """仿真成功时在后台将 (模型描述, 代码) 加入语义缓存，原样返回仿真结果"""
+    if prompt and simulation_result.get('status') == '仿真成功':
+        threading.Thread(
+            target=code_generator.remember_generation,
+            args=(prompt, modelica_code, model_name),
+            daemon=True
+        ).start()
+    return simulation_result
+
+def generation_pipeline(prompt: str, options: Dict[str, Any]) -> SimulationPipeline:
+    """创建边生成边仿真的流水线，模型定义结束时按请求中的设置和模型的experiment注解仿真"""
+    def simulate(modelica_code: str, model_name: str, control: RunControl,
+                 session: Optional[PooledSession]) -> Dict[str, Any]:
+        setup = resolve_setup(options, parse_outline(modelica_code)['experiment'])
+        return remember_generation(
+            prompt, modelica_code, model_name,
+            modelica_manager.simulate_model(modelica_code, model_name, control, setup, session)
+        )
+
+    return SimulationPipeline(
+        simulate,
+        modelica_manager.result_store.result_path,
+        session_pool=modelica_manager.session_pool if modelica_manager.is_available else None,
+        timeout=Settings.SIMULATION_TIMEOUT,
+        interval=Settings.SIMULATION_STREAM_INTERVAL,
+        validate=reference_issues
+    )
+
+def simulation_stream(modelica_code: str, model_name: str, setup: Dict[str, Any],
+                      prompt: Optional[str] = None) -> Response:
+    """以Server-Sent Events返回仿真阶段和求解过程中逐步写出的结果数据"""
+    def generate():
+        events = simulation_events(
+            lambda control: remember_generation(
+                prompt, modelica_code, model_name,
+                modelica_manager.simulate_model(modelica_code, model_name, control, setup)
+            ),
+            modelica_manager.result_store.result_path,
+            timeout=Settings.SIMULATION_TIMEOUT,
+            interval=Settings.SIMULATION_STREAM_INTERVAL
+        )
+        for event, data in events:
+            yield format_sse(event, data)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/simulate', methods=['POST'])
 def simulate_modelica():
     """处理仿真请求"""
@@ -511,12 +1251,26 @@ def simulate_modelica():
         if not modelica_code or not model_name:
             return jsonify({'error': '缺少必要参数'}), 400
 
+        try:
+            setup = resolve_setup(data, parse_outline(modelica_code)['experiment'])
+            width = overview_width(data.get('overview_width'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if 'text/event-stream' in request.headers.get('Accept', ''):
+            return simulation_stream(modelica_code, model_name, setup, generated_prompt(data))
+
         try:
             print("===========开始仿真===========")
-            simulation_result = modelica_manager.simulate_model(modelica_code, model_name)
+            control = RunControl(Settings.SIMULATION_TIMEOUT)
+            simulation_result = modelica_manager.simulate_model(modelica_code, model_name, control, setup)
+            remember_generation(generated_prompt(data), modelica_code, model_name, simulation_result)
             print("===========仿真结束===========")
-            return jsonify(simulation_result)
+            return simulation_response(simulation_result, width)
                 
+        except SimulationTimeoutError as e:
+            logger.error(f"仿真超时: {e}")
+            return jsonify({'status': '仿真超时', 'error': str(e)}), 504
         except Exception as e:
             logger.error(f"仿真过程出错: {e}")
             return jsonify({'error': str(e)}), 500
@@ -525,6 +1279,148 @@ def simulate_modelica():
         logger.error(f"处理仿真请求时出错: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/jobs', methods=['POST'])
+def submit_simulation_job():
+    """提交异步仿真任务，立即返回任务ID"""
+    try:
+        data = request.json
+        modelica_code = data.get('modelica_code')
+        model_name = data.get('model_name')
+        
+        if not modelica_code or not model_name:
+            return jsonify({'error': '缺少必要参数'}), 400
+
+        try:
+            setup = resolve_setup(data, parse_outline(modelica_code)['experiment'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        timeout = data.get('timeout')
+        if timeout is not None:
+            if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not timeout > 0:
+                return jsonify({'error': 'timeout必须是大于0的数值（秒）'}), 400
+            timeout = min(float(timeout), Settings.SIMULATION_MAX_TIMEOUT)
+
+        job = simulation_jobs.submit(modelica_code, model_name, timeout, setup)
+        return jsonify(job.to_dict()), 202
+        
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        logger.error(f"提交仿真任务时出错: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/metrics')
+def simulation_job_metrics():
+    """获取仿真任务队列指标"""
+    return jsonify(simulation_jobs.get_metrics())
+
+@app.route('/api/jobs/<job_id>')
+def get_simulation_job(job_id):
+    """查询仿真任务状态"""
+    job = simulation_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/result')
+def get_simulation_job_result(job_id):
+    """获取仿真任务结果，任务未完成时返回202"""
+    job = simulation_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    if not job.finished:
+        return jsonify(job.to_dict()), 202
+    if job.status != SUCCEEDED or job.result_id is None:
+        return jsonify(job.to_dict()), 200
+    try:
+        width = overview_width(request.args.get('width', type=int))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    # 任务只保留结果ID，结果数据从结果存储重新读取
+    simulation_result = modelica_manager.load_result(job.result_id, job.setup)
+    if simulation_result is None:
+        return jsonify(dict(job.to_dict(), error='仿真结果已被清理')), 410
+    return simulation_response(simulation_result, width)
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_simulation_job(job_id):
+    """取消仿真任务"""
+    job = simulation_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/sweep', methods=['POST'])
+def sweep_modelica():
+    """处理参数扫描请求，结果以NDJSON流的形式按完成顺序返回"""
+    try:
+        data = request.json
+        modelica_code = data.get('modelica_code')
+        model_name = data.get('model_name')
+        
+        if not modelica_code or not model_name:
+            return jsonify({'error': '缺少必要参数'}), 400
+
+        try:
+            points = expand_points(data.get('grid'), data.get('points'))
+            setup = resolve_setup(data, parse_outline(modelica_code)['experiment'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if len(points) > Settings.SWEEP_MAX_POINTS:
+            return jsonify({'error': f'扫描点数量超过上限{Settings.SWEEP_MAX_POINTS}'}), 400
+
+        def generate():
+            try:
+                for result in modelica_manager.sweep_model(modelica_code, model_name, points, setup):
+                    yield json.dumps(to_jsonable(result), ensure_ascii=False) + "\n"
+            except Exception as e:
+                logger.error(f"参数扫描出错: {e}")
+                yield json.dumps({'status': '扫描失败', 'error': str(e)}, ensure_ascii=False) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+    except Exception as e:
+        logger.error(f"处理参数扫描请求时出错: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/results/<result_id>/series')
+def query_result_series(result_id):
+    """查询单个变量在时间窗口内的降采样结果，用于图表缩放"""
+    try:
+        variable = request.args.get('variable')
+        if not variable:
+            return jsonify({'error': '缺少变量名'}), 400
+        if not RESULT_ID_PATTERN.match(result_id):
+            return jsonify({'error': '非法的结果ID'}), 400
+
+        result_file = modelica_manager.result_store.result_path(result_id)
+        if result_file is None:
+            return jsonify({'error': '结果不存在'}), 404
+
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        width = min(request.args.get('width', 1000, type=int), Settings.DOWNSAMPLE_MAX_WIDTH)
+        method = request.args.get('method', 'minmax')
+
+        def load():
+            reader = MatResultReader(result_file)
+            return reader.time, reader.read([variable])[variable]
+
+        pyramid = result_pyramids.get(result_file, variable, load)
+        series = pyramid.query(start, end, width, method)
+        series['variable'] = variable
+        return jsonify(series)
+        
+    except KeyError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"查询仿真结果时出错: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/results/<path:filename>')
 def serve_result(filename):
     return send_from_directory('temp/results', filename)
@@ -16,6 +16,22 @@ class Settings:
     AZURE_OPENAI_EMBEDDING_DEPLOYMENT = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
     AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2023-05-15")
 
+    # Azure OpenAI 连接和配额配置，超时单位为秒，配额为0表示不限制
+    AZURE_OPENAI_TIMEOUT = float(os.getenv("AZURE_OPENAI_TIMEOUT", "60"))
+    AZURE_OPENAI_CONNECT_TIMEOUT = float(os.getenv("AZURE_OPENAI_CONNECT_TIMEOUT", "5"))
+    AZURE_OPENAI_MAX_RETRIES = int(os.getenv("AZURE_OPENAI_MAX_RETRIES", "2"))
+    AZURE_OPENAI_MAX_CONNECTIONS = int(os.getenv("AZURE_OPENAI_MAX_CONNECTIONS", "20"))
+    AZURE_OPENAI_KEEPALIVE = float(os.getenv("AZURE_OPENAI_KEEPALIVE", "60"))
+    AZURE_OPENAI_RPM = int(os.getenv("AZURE_OPENAI_RPM", "720"))
+    AZURE_OPENAI_TPM = int(os.getenv("AZURE_OPENAI_TPM", "120000"))
+    AZURE_OPENAI_EMBEDDING_RPM = int(os.getenv("AZURE_OPENAI_EMBEDDING_RPM", "720"))
+    AZURE_OPENAI_EMBEDDING_TPM = int(os.getenv("AZURE_OPENAI_EMBEDDING_TPM", "120000"))
+    AZURE_OPENAI_MAX_WAIT = float(os.getenv("AZURE_OPENAI_MAX_WAIT", "30"))
+    # 批量embedding：单次请求的输入条数和估算token数上限，以及并发请求数
+    AZURE_OPENAI_EMBEDDING_BATCH_SIZE = int(os.getenv("AZURE_OPENAI_EMBEDDING_BATCH_SIZE", "16"))
+    AZURE_OPENAI_EMBEDDING_BATCH_TOKENS = int(os.getenv("AZURE_OPENAI_EMBEDDING_BATCH_TOKENS", "8000"))
+    AZURE_OPENAI_EMBEDDING_CONCURRENCY = int(os.getenv("AZURE_OPENAI_EMBEDDING_CONCURRENCY", "4"))
+
     
     
     OPENMODELICA_PATHS = [
@@ -30,6 +46,89 @@ class Settings:
         'tolerance': 1e-6,
         'method': 'dassl'
     }
+    SIMULATION_MAX_INTERVALS = int(os.getenv("SIMULATION_MAX_INTERVALS", "1000000"))
+
+    # 标准库引用检查：reject 拒绝引用错误的代码，warn 只记录日志，off 不检查
+    MSL_VALIDATION = os.getenv("MSL_VALIDATION", "reject").lower()
+    MSL_INDEX_PATH = os.getenv(
+        "MSL_INDEX_PATH",
+        str(Path(__file__).parent.parent / 'temp' / 'msl_index.json.gz')
+    )
+    # 生成的代码引用检查未通过时请求模型修复的次数
+    MSL_REPAIR_ATTEMPTS = int(os.getenv("MSL_REPAIR_ATTEMPTS", "1"))
+
+    # OMC会话池配置
+    OMC_POOL_ENABLED = os.getenv("OMC_POOL_ENABLED", "true").lower() == "true"
+    OMC_POOL_SIZE = int(os.getenv("OMC_POOL_SIZE", "2"))
+    OMC_SESSION_MAX_USES = int(os.getenv("OMC_SESSION_MAX_USES", "50"))
+    OMC_PRELOAD_LIBRARIES = [
+        lib.strip() for lib in os.getenv("OMC_PRELOAD_LIBRARIES", "Modelica").split(",") if lib.strip()
+    ]
+
+    # 编译模型缓存磁盘上限（MB）
+    COMPILE_CACHE_MAX_MB = int(os.getenv("COMPILE_CACHE_MAX_MB", "1024"))
+
+    # 仿真任务配置，超时单位为秒
+    SIMULATION_TIMEOUT = float(os.getenv("SIMULATION_TIMEOUT", "300"))
+    SIMULATION_MAX_TIMEOUT = float(os.getenv("SIMULATION_MAX_TIMEOUT", "1800"))
+    SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", "2"))
+    SIMULATION_QUEUE_SIZE = int(os.getenv("SIMULATION_QUEUE_SIZE", "100"))
+    SIMULATION_STREAM_INTERVAL = float(os.getenv("SIMULATION_STREAM_INTERVAL", "0.2"))
+
+    # 结果存储配置：保留时间（小时）和磁盘上限（MB）
+    RESULT_MAX_AGE_HOURS = float(os.getenv("RESULT_MAX_AGE_HOURS", "168"))
+    RESULT_MAX_MB = int(os.getenv("RESULT_MAX_MB", "2048"))
+    # 规范化后代码相同、仿真设置相同的请求直接复用已保存的成功结果
+    RESULT_REUSE_ENABLED = os.getenv("RESULT_REUSE_ENABLED", "true").lower() == "true"
+
+    # 结果降采样配置
+    DOWNSAMPLE_MAX_WIDTH = int(os.getenv("DOWNSAMPLE_MAX_WIDTH", "8000"))
+    DOWNSAMPLE_CACHE_SIZE = int(os.getenv("DOWNSAMPLE_CACHE_SIZE", "64"))
+
+    # 代码生成响应缓存配置：内存条目数和有效期（小时）
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+    RESPONSE_CACHE_TTL_HOURS = float(os.getenv("RESPONSE_CACHE_TTL_HOURS", "168"))
+
+    # 批量生成配置：并发请求数上限和单次请求的模型描述数上限
+    GENERATE_BATCH_CONCURRENCY = int(os.getenv("GENERATE_BATCH_CONCURRENCY", "8"))
+    GENERATE_BATCH_MAX_PROMPTS = int(os.getenv("GENERATE_BATCH_MAX_PROMPTS", "500"))
+
+    # 向量索引后端：chroma 或 numpy（进程内矩阵索引，适合数万条以内的示例库）
+    VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "chroma")
+
+    # 示例库向量数据库和embedding缓存目录
+    VECTOR_STORE_DIR = os.getenv(
+        "VECTOR_STORE_DIR",
+        str(Path(__file__).parent.parent / 'temp' / 'vector_store')
+    )
+    EMBEDDING_CACHE_DIR = os.getenv(
+        "EMBEDDING_CACHE_DIR",
+        str(Path(__file__).parent.parent / 'temp' / 'embedding_cache')
+    )
+
+    # 示例库目录，目录中的.mo文件变化时后台增量更新向量数据库
+    EXAMPLES_DIR = os.getenv(
+        "EXAMPLES_DIR",
+        str(Path(__file__).parent.parent / 'modelica' / 'example')
+    )
+    EXAMPLE_WATCH_ENABLED = os.getenv("EXAMPLE_WATCH_ENABLED", "true").lower() == "true"
+    EXAMPLE_WATCH_DEBOUNCE = float(os.getenv("EXAMPLE_WATCH_DEBOUNCE", "0.5"))
+    # 示例匹配：本地检索分数（0-1）不低于下限且是第二名的若干倍时不再做向量检索
+    EXAMPLE_LEXICAL_MIN_SCORE = float(os.getenv("EXAMPLE_LEXICAL_MIN_SCORE", "0.3"))
+    EXAMPLE_LEXICAL_MARGIN = float(os.getenv("EXAMPLE_LEXICAL_MARGIN", "1.5"))
+
+    # 语义缓存配置：向量距离小于阈值的模型描述直接复用已仿真成功的代码
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_DISTANCE = float(os.getenv("SEMANTIC_CACHE_DISTANCE", "0.15"))
+    SEMANTIC_CACHE_DIR = os.getenv(
+        "SEMANTIC_CACHE_DIR",
+        str(Path(__file__).parent.parent / 'temp' / 'semantic_cache')
+    )
+
+    # 参数扫描配置，进程池大小默认为CPU核数
+    SWEEP_MAX_WORKERS = int(os.getenv("SWEEP_MAX_WORKERS", "0")) or os.cpu_count()
+    SWEEP_MAX_POINTS = int(os.getenv("SWEEP_MAX_POINTS", "1000"))
 
     @classmethod
     def validate_settings(cls):
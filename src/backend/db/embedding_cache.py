@@ -0,0 +1,89 @@
+import os
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Iterable
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class EmbeddingCache:
+    """embedding向量的磁盘缓存
+
+    按 (embedding部署, 文本) 的内容哈希存放，每个向量一个.npy文件，
+    文本或部署不变时重启后也不会重新调用embedding接口。
+    """
+
+    def __init__(self, cache_dir: str, deployment: str):
+        """初始化embedding缓存
+
+        Args:
+            cache_dir: 缓存目录
+            deployment: embedding部署名称，不同部署的向量互不复用
+        """
+        self.cache_dir = cache_dir
+        self.deployment = deployment
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.deployment}\0{text}".encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npy")
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """读取缓存的向量，未命中时返回None"""
+        try:
+            embedding = np.load(self._path(self.key(text))).tolist()
+        except (OSError, ValueError):
+            embedding = None
+        with self._lock:
+            if embedding is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return embedding
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, List[float]]:
+        """批量读取缓存，返回命中的 {文本: 向量}"""
+        found = {}
+        for text in texts:
+            if text not in found:
+                embedding = self.get(text)
+                if embedding is not None:
+                    found[text] = embedding
+        return found
+
+    def put(self, text: str, embedding: List[float]) -> None:
+        """写入缓存"""
+        path = self._path(self.key(text))
+        temp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_file, 'wb') as f:
+                np.save(f, np.asarray(embedding, dtype=np.float32))
+            os.replace(temp_file, path)
+        except OSError as e:
+            logger.error(f"写入embedding缓存失败: {e}")
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses}
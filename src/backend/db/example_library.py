@@ -0,0 +1,204 @@
+import re
+import json
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+import sys
+from pathlib import Path
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.utils.logger import setup_logger
+from backend.db.lexical_index import BM25Index
+from backend.modelica.outline import parse_outline
+
+logger = setup_logger(__name__)
+
+# 按大小写分割驼峰命名，作为没有元数据文件时的默认关键词
+CAMEL_CASE_PATTERN = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+
+
+class _ExampleEventHandler(FileSystemEventHandler):
+    """示例目录的文件事件处理，.mo和元数据文件变化时触发同步"""
+
+    def __init__(self, library: 'ExampleLibrary'):
+        self.library = library
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        paths = [event.src_path, getattr(event, 'dest_path', '')]
+        if any(path.endswith(('.mo', '.json')) for path in paths):
+            self.library.schedule_sync()
+
+
+class ExampleLibrary:
+    """从示例目录发现Modelica示例并同步到向量数据库
+
+    每个 <名称>.mo 是一个示例，可选的同名 <名称>.json 提供元数据：
+        {"name": 示例ID, "description": 描述, "keywords": [关键词], "model_name": 模型名称}
+    缺省时示例ID为文件名，模型名称和描述取自文件中第一个顶层类的声明。
+
+    按文件的修改时间和大小判断是否变化，未变化的文件不会重新读取；
+    新增或修改的示例重新计算embedding并写入，删除的示例从向量数据库中移除。
+    同时维护进程内的BM25索引（描述、关键词、模型名称和代码），检索不需要网络请求。
+    """
+
+    def __init__(self, examples_dir: str, vector_store, debounce: float = 0.5):
+        """初始化示例库
+
+        Args:
+            examples_dir: 示例目录
+            vector_store: ModelicaVectorStore实例
+            debounce: 文件变化后等待合并的时间（秒），编辑器保存时常连续触发多个事件
+        """
+        self.examples_dir = Path(examples_dir)
+        self.vector_store = vector_store
+        self.debounce = debounce
+
+        self._lock = threading.Lock()
+        self._timer_lock = threading.Lock()
+        self._timer = None
+        self._observer = None
+        # 文件名 -> (文件签名, 示例ID, 示例)
+        self._files = {}
+        self.lexical_index = BM25Index()
+
+    @property
+    def examples(self) -> Dict[str, Dict[str, Any]]:
+        """当前的示例字典，格式与ModelicaVectorStore.add_examples一致"""
+        # 同步时整体替换_files，读取不需要等待正在进行的同步
+        return {example_id: example for _, example_id, example in self._files.values()}
+
+    def _signature(self, stem: str) -> Optional[Tuple]:
+        """示例文件和元数据文件的 (修改时间, 大小)，.mo文件不存在时返回None"""
+        signature = []
+        for suffix in ('.mo', '.json'):
+            try:
+                stat = (self.examples_dir / f"{stem}{suffix}").stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                if suffix == '.mo':
+                    return None
+                signature.append(None)
+        return tuple(signature)
+
+    def _read_example(self, stem: str) -> Tuple[str, Dict[str, Any]]:
+        """读取示例文件和元数据"""
+        with open(self.examples_dir / f"{stem}.mo", 'r', encoding='utf-8') as f:
+            code = f.read()
+
+        metadata = {}
+        sidecar = self.examples_dir / f"{stem}.json"
+        if sidecar.exists():
+            try:
+                with open(sidecar, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+            except ValueError as e:
+                logger.error(f"示例元数据{sidecar.name}格式错误: {e}")
+
+        outline = parse_outline(code)
+        return metadata.get('name', stem), {
+            'description': metadata.get('description') or outline['description'] or stem,
+            'keywords': metadata.get('keywords') or CAMEL_CASE_PATTERN.findall(stem),
+            'code': code,
+            'model_name': metadata.get('model_name', outline['name'] or stem)
+        }
+
+    def sync(self) -> Dict[str, int]:
+        """扫描示例目录并把变化同步到向量数据库
+
+        Returns:
+            {'added': 新增或修改的示例数, 'removed': 删除的示例数}
+        """
+        with self._lock:
+            stems = {path.stem for path in self.examples_dir.glob('*.mo')}
+            files = {}
+            changed = {}
+            for stem in sorted(stems):
+                signature = self._signature(stem)
+                if signature is None:
+                    continue
+                previous = self._files.get(stem)
+                if previous is not None and previous[0] == signature:
+                    files[stem] = previous
+                    continue
+                try:
+                    example_id, example = self._read_example(stem)
+                except (OSError, UnicodeDecodeError) as e:
+                    logger.error(f"读取示例{stem}.mo失败: {e}")
+                    continue
+                files[stem] = (signature, example_id, example)
+                changed[example_id] = example
+
+            current = {example_id for _, example_id, _ in files.values()}
+            # 与向量数据库比较，同时清理目录外删除或改名留下的旧条目
+            stored = set(self.vector_store.collection.get(include=[])['ids'])
+            removed = stored - current
+
+            for example_id in set(self.examples) - current:
+                self.lexical_index.remove(example_id)
+            for example_id, example in changed.items():
+                self.lexical_index.add(example_id, self._lexical_text(example))
+
+            if changed:
+                self.vector_store.add_examples(changed)
+            for example_id in removed:
+                self.vector_store.delete_example(example_id)
+            self._files = files
+
+        if changed or removed:
+            logger.info(f"示例库同步完成: 更新{len(changed)}个，删除{len(removed)}个")
+        return {'added': len(changed), 'removed': len(removed)}
+
+    def schedule_sync(self) -> None:
+        """在debounce时间后同步，期间的重复调用合并为一次"""
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self._sync_safely)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _sync_safely(self) -> None:
+        try:
+            self.sync()
+        except Exception as e:
+            logger.error(f"示例库同步失败: {e}")
+
+    def start_watching(self) -> None:
+        """启动后台文件监听"""
+        if self._observer is not None:
+            return
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._observer.schedule(_ExampleEventHandler(self), str(self.examples_dir), recursive=False)
+        self._observer.start()
+        logger.info(f"开始监听示例目录: {self.examples_dir}")
+
+    def stop_watching(self) -> None:
+        """停止后台文件监听"""
+        if self._observer is None:
+            return
+        self._observer.stop()
+        self._observer.join()
+        self._observer = None
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    @staticmethod
+    def _lexical_text(example: Dict[str, Any]) -> str:
+        """BM25索引的文本，描述和关键词重复一次以提高其权重"""
+        summary = f"{example['description']} {' '.join(example['keywords'])} {example['model_name']}"
+        return f"{summary} {summary} {example['code']}"
+
+    def lexical_search(self, query: str, n_results: int = 5) -> List[Tuple[str, float]]:
+        """本地BM25检索，返回 [(示例ID, 0到1之间的分数)]"""
+        return self.lexical_index.search(query, n_results)
@@ -0,0 +1,119 @@
+import re
+import math
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+# 中日韩字符连续片段、英文标识符
+CJK_RUN_PATTERN = re.compile(r'[\u3400-\u9fff\uf900-\ufaff]+')
+WORD_PATTERN = re.compile(r'[A-Za-z][A-Za-z0-9_]*')
+# 按大小写和下划线分割标识符
+IDENTIFIER_PART_PATTERN = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+')
+
+# Modelica关键字和几乎每个模型都会出现的词，对区分示例没有帮助
+STOP_WORDS = {
+    'model', 'block', 'class', 'end', 'equation', 'algorithm', 'parameter', 'constant',
+    'real', 'integer', 'boolean', 'string', 'import', 'modelica', 'connect', 'der',
+    'start', 'fixed', 'annotation', 'experiment', 'if', 'then', 'else', 'for', 'in',
+    'and', 'or', 'not', 'the', 'of', 'a', 'an', 'to', 'with'
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """把中英文混合文本切分为检索词
+
+    中文片段切分为相邻两字的二元组（单字片段保留单字），英文标识符取整体的小写形式，
+    驼峰或下划线命名再拆成各部分，例如 FallingMarble -> fallingmarble, falling, marble。
+    """
+    tokens = []
+    for run in CJK_RUN_PATTERN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+
+    for word in WORD_PATTERN.findall(text):
+        lowered = word.lower()
+        if lowered not in STOP_WORDS and len(lowered) > 1:
+            tokens.append(lowered)
+        parts = [part.lower() for part in IDENTIFIER_PART_PATTERN.findall(word)]
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part not in STOP_WORDS and len(part) > 1)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[str]:
+    """倒数排名融合：按各排名列表中 1/(k+名次) 之和合并排序"""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] += 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda doc_id: scores[doc_id], reverse=True)
+
+
+class BM25Index:
+    """进程内BM25倒排索引，支持按文档增删"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._lengths = {}
+        self._postings = defaultdict(dict)
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, doc_id: str, text: str) -> None:
+        """添加或替换文档"""
+        counts = Counter(tokenize(text))
+        with self._lock:
+            self._remove(doc_id)
+            for term, tf in counts.items():
+                self._postings[term][doc_id] = tf
+            self._lengths[doc_id] = sum(counts.values())
+            self._total_length += self._lengths[doc_id]
+
+    def remove(self, doc_id: str) -> None:
+        """删除文档"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in [term for term, docs in self._postings.items() if doc_id in docs]:
+            del self._postings[term][doc_id]
+            if not self._postings[term]:
+                del self._postings[term]
+
+    def _idf(self, term: str) -> float:
+        n = len(self._postings.get(term, ()))
+        return math.log(1 + (len(self._lengths) - n + 0.5) / (n + 0.5))
+
+    def search(self, query: str, n_results: int = 5) -> List[Tuple[str, float]]:
+        """检索文档
+
+        Returns:
+            [(文档ID, 分数)]，按分数降序。分数为BM25得分除以查询词全部高频命中时的上限，
+            取值在0到1之间，便于设置与文档数量无关的阈值
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            if not terms or not self._lengths:
+                return []
+            average_length = self._total_length / len(self._lengths)
+            scores = defaultdict(float)
+            upper_bound = 0.0
+            for term in terms:
+                idf = self._idf(term)
+                upper_bound += idf * (self.k1 + 1)
+                for doc_id, tf in self._postings.get(term, {}).items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:n_results]
+        return [(doc_id, score / upper_bound) for doc_id, score in ranked]
@@ -0,0 +1,303 @@
+import os
+import json
+import base64
+import threading
+from typing import Dict, Any, List, Optional
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 日志中的条目数超过该值且超过当前条目数时合并为新的快照
+COMPACT_MIN_RECORDS = 1000
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """按行L2归一化"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _encode(vectors: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(vectors, dtype='<f4').tobytes()).decode('ascii')
+
+
+def _decode(text: str, rows: int) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(text), dtype='<f4').reshape(rows, -1)
+
+
+class NumpyCollection:
+    """基于NumPy的进程内向量索引，接口与ModelicaVectorStore用到的Chroma集合方法一致
+
+    向量经L2归一化后存放在连续的float32矩阵中，查询为一次矩阵乘法加argpartition，
+    返回的距离与Chroma默认的平方L2距离一致（归一化向量上等于 2 - 2·余弦相似度）。
+
+    写入不修改查询可能正在使用的数组和列表：新条目写入矩阵末尾预留的空行（查询只读取
+    当时的条目数对应的行），修改已有的行时先复制矩阵，ids/documents/metadatas总是新建后
+    与矩阵一起在锁内替换。
+
+    持久化为快照 <名称>.npy（启动时内存映射读取）和记录ids/documents/metadatas的 <名称>.json，
+    以及只追加的 <名称>.log：每次写入只在日志末尾追加一行，启动时在快照之上按顺序重放，
+    日志中的条目数超过当前条目数时合并为新的快照。
+    """
+
+    def __init__(self, name: str, persist_directory: Optional[str] = None):
+        """初始化向量索引
+
+        Args:
+            name: 集合名称
+            persist_directory: 持久化目录，None表示只保存在内存中
+        """
+        self.name = name
+        self.persist_directory = persist_directory
+        self._lock = threading.Lock()
+        # 矩阵的行数可能多于条目数，多出的行预留给新条目
+        self._matrix = None
+        self._ids = []
+        self._documents = []
+        self._metadatas = []
+        self._positions = {}
+        self._log_records = 0
+
+        if persist_directory:
+            os.makedirs(persist_directory, exist_ok=True)
+            self._load()
+
+    def _paths(self):
+        base = os.path.join(self.persist_directory, self.name)
+        return f"{base}.npy", f"{base}.json", f"{base}.log"
+
+    def _load(self) -> None:
+        matrix_file, meta_file, log_file = self._paths()
+        try:
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            matrix = np.load(matrix_file, mmap_mode='r')
+        except (OSError, ValueError):
+            meta = None
+        if meta is not None and matrix.shape[0] != len(meta['ids']):
+            logger.error(f"向量索引{self.name}的矩阵与元数据不一致，忽略已保存的快照")
+        elif meta is not None:
+            self._matrix = matrix
+            self._ids = meta['ids']
+            self._documents = meta['documents']
+            self._metadatas = meta['metadatas']
+            self._positions = {id_: i for i, id_ in enumerate(self._ids)}
+        self._replay(log_file)
+
+    def _replay(self, log_file: str) -> None:
+        """在快照之上按顺序重放写入日志"""
+        try:
+            with open(log_file, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        if not lines:
+            return
+
+        # 条目ID -> (快照中的行号或向量, 文档, 元数据)，删除后再次写入的条目排在最后
+        entries = {
+            id_: (i, document, metadata)
+            for i, (id_, document, metadata) in enumerate(zip(self._ids, self._documents, self._metadatas))
+        }
+        dim = self._matrix.shape[1] if self._matrix is not None and self._ids else None
+        records = 0
+        torn = False
+        for line in lines:
+            try:
+                record = json.loads(line)
+                records += len(record['ids'])
+                if record['op'] == 'delete':
+                    for id_ in record['ids']:
+                        entries.pop(id_, None)
+                    continue
+                vectors = _decode(record['vectors'], len(record['ids']))
+            except (ValueError, KeyError):
+                # 写入时进程退出留下的不完整记录，之后的内容无法使用
+                logger.warning(f"向量索引{self.name}的写入日志不完整，忽略最后的记录")
+                torn = True
+                break
+            if dim is None:
+                dim = vectors.shape[1]
+            if vectors.shape[1] != dim:
+                logger.error(f"向量索引{self.name}的写入日志中向量维度不一致，忽略该记录")
+                continue
+            for id_, vector, document, metadata in zip(record['ids'], vectors, record['documents'], record['metadatas']):
+                entries[id_] = (vector, document, metadata)
+
+        matrix = np.empty((len(entries), dim or 0), dtype=np.float32)
+        for i, (row, _, _) in enumerate(entries.values()):
+            matrix[i] = self._matrix[row] if isinstance(row, int) else row
+        self._matrix = matrix
+        self._ids = list(entries)
+        self._documents = [document for _, document, _ in entries.values()]
+        self._metadatas = [metadata for _, _, metadata in entries.values()]
+        self._positions = {id_: i for i, id_ in enumerate(self._ids)}
+        self._log_records = records
+        if torn:
+            self._compact()
+
+    def _append_log(self, record: Dict[str, Any]) -> None:
+        """追加一行写入日志，日志中的条目数超过当前条目数时合并为快照，调用方需持有锁"""
+        if not self.persist_directory:
+            return
+        with open(self._paths()[2], 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._log_records += len(record['ids'])
+        # 合并的代价与条目数成正比，日志至少积累同样多的条目后才合并，均摊到每个条目为常数
+        if self._log_records > max(len(self._ids), COMPACT_MIN_RECORDS):
+            self._compact()
+
+    def _compact(self) -> None:
+        """写入快照后清空日志，快照写入临时文件后替换，避免读到写了一半的索引
+
+        快照替换后、日志清空前进程退出时，重放日志只会重复已经包含在快照中的写入。
+        """
+        matrix_file, meta_file, log_file = self._paths()
+        count = len(self._ids)
+        matrix = self._matrix[:count] if self._matrix is not None else np.zeros((0, 0), dtype=np.float32)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(matrix_file + suffix, 'wb') as f:
+            np.save(f, matrix)
+        with open(meta_file + suffix, 'w', encoding='utf-8') as f:
+            json.dump({
+                'ids': self._ids,
+                'documents': self._documents,
+                'metadatas': self._metadatas
+            }, f, ensure_ascii=False)
+        os.replace(matrix_file + suffix, matrix_file)
+        os.replace(meta_file + suffix, meta_file)
+        open(log_file, 'w').close()
+        self._log_records = 0
+
+    def _writable(self, rows: int, dim: int, copy: bool) -> np.ndarray:
+        """返回至少有rows行、可以写入的矩阵，调用方需持有锁
+
+        只追加新条目时写入当前矩阵末尾的空行；需要修改已有的行、容量不足或矩阵为只读的
+        内存映射时复制到新的矩阵，容量按倍数增长。
+        """
+        matrix = self._matrix
+        count = len(self._ids)
+        if matrix is not None and matrix.shape[1] != dim:
+            matrix = None
+        if matrix is not None and not copy and matrix.flags.writeable and matrix.shape[0] >= rows:
+            return matrix
+        capacity = matrix.shape[0] if matrix is not None and matrix.shape[0] >= rows else max(rows, 2 * count)
+        writable = np.empty((capacity, dim), dtype=np.float32)
+        if count:
+            writable[:count] = matrix[:count]
+        return writable
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None) -> Dict[str, List[Any]]:
+        """按id获取条目，不存在的id不出现在结果中"""
+        with self._lock:
+            positions = (
+                [self._positions[id_] for id_ in ids if id_ in self._positions]
+                if ids is not None else list(range(len(self._ids)))
+            )
+            return {
+                'ids': [self._ids[i] for i in positions],
+                'documents': [self._documents[i] for i in positions],
+                'metadatas': [self._metadatas[i] for i in positions]
+            }
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]],
+               documents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """插入或更新条目"""
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            count = len(self._ids)
+            # 没有条目时接受任意维度
+            dim = self._matrix.shape[1] if count else vectors.shape[1]
+            if vectors.shape[1] != dim:
+                raise ValueError(f"向量维度不一致: 索引为{dim}，输入为{vectors.shape[1]}")
+
+            new_ids, new_documents, new_metadatas = list(self._ids), list(self._documents), list(self._metadatas)
+            positions = dict(self._positions)
+            rows = {}
+            for id_, vector, document, metadata in zip(ids, vectors, documents, metadatas):
+                position = positions.get(id_)
+                if position is None:
+                    position = positions[id_] = len(new_ids)
+                    new_ids.append(id_)
+                    new_documents.append(document)
+                    new_metadatas.append(metadata)
+                else:
+                    new_documents[position] = document
+                    new_metadatas[position] = metadata
+                rows[position] = vector
+
+            matrix = self._writable(len(new_ids), dim, copy=any(position < count for position in rows))
+            for position, vector in rows.items():
+                matrix[position] = vector
+            self._matrix = matrix
+            self._ids, self._documents, self._metadatas = new_ids, new_documents, new_metadatas
+            self._positions = positions
+            self._append_log({
+                'op': 'upsert',
+                'ids': list(ids),
+                'documents': list(documents),
+                'metadatas': list(metadatas),
+                'vectors': _encode(vectors)
+            })
+
+    # 与Chroma集合保持一致，add与upsert行为相同
+    add = upsert
+
+    def delete(self, ids: List[str]) -> None:
+        """删除条目"""
+        with self._lock:
+            removed = {self._positions[id_] for id_ in ids if id_ in self._positions}
+            if not removed:
+                return
+            keep = [i for i in range(len(self._ids)) if i not in removed]
+            self._matrix = np.array(self._matrix[keep], dtype=np.float32)
+            self._ids = [self._ids[i] for i in keep]
+            self._documents = [self._documents[i] for i in keep]
+            self._metadatas = [self._metadatas[i] for i in keep]
+            self._positions = {id_: i for i, id_ in enumerate(self._ids)}
+            self._append_log({'op': 'delete', 'ids': list(ids)})
+
+    def query(self, query_embeddings: List[List[float]], n_results: int = 1,
+              include: Optional[List[str]] = None) -> Dict[str, List[List[Any]]]:
+        """批量查询最近邻，每个查询向量返回按距离升序的n_results个结果"""
+        with self._lock:
+            matrix, ids = self._matrix, self._ids
+            documents, metadatas = self._documents, self._metadatas
+        if matrix is not None:
+            # 之后追加的条目写入快照之外的行
+            matrix = matrix[:len(ids)]
+
+        results = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        if matrix is None or len(ids) == 0:
+            for key in results:
+                results[key] = [[] for _ in query_embeddings]
+            return results
+
+        queries = _normalize(np.asarray(query_embeddings, dtype=np.float32))
+        scores = queries @ matrix.T
+        k = min(n_results, len(ids))
+        for row in scores:
+            if k < len(ids):
+                top = np.argpartition(-row, k - 1)[:k]
+            else:
+                top = np.arange(len(ids))
+            top = top[np.argsort(-row[top])]
+            results['ids'].append([ids[i] for i in top])
+            results['documents'].append([documents[i] for i in top])
+            results['metadatas'].append([metadatas[i] for i in top])
+            results['distances'].append((2.0 - 2.0 * row[top]).clip(min=0.0).tolist())
+        return results
@@ -0,0 +1,173 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """规范化提示词：合并空白、去除首尾空白并忽略大小写"""
+    return re.sub(r'\s+', ' ', prompt).strip().casefold()
+
+
+def prompt_version(system_prompt: str) -> str:
+    """系统提示词的版本号，提示词修改后自动失效旧的缓存"""
+    return hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:12]
+
+
+def response_key(prompt: str, system_prompt: str, deployment: str, params: Dict[str, Any]) -> str:
+    """计算缓存键：规范化提示词 + 系统提示词版本 + 部署名称 + 采样参数"""
+    payload = json.dumps({
+        'prompt': normalize_prompt(prompt),
+        'system_prompt': prompt_version(system_prompt),
+        'deployment': deployment,
+        'params': params
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """提示词到生成代码的两级缓存
+
+    内存中保留最近使用的条目（LRU），所有条目同时写入磁盘，服务重启后仍然有效。
+    条目超过TTL后视为失效。
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 256, ttl: float = 7 * 24 * 3600):
+        """初始化响应缓存
+
+        Args:
+            cache_dir: 磁盘缓存目录
+            max_entries: 内存中保留的条目数
+            ttl: 条目有效期（秒）
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.purge()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get('created', 0) > self.ttl
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """查找缓存，未命中或已过期时返回None
+
+        Returns:
+            {'code': 生成的代码, 'model_name': 模型名称, 'created': 写入时间}
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry):
+                self._entries.move_to_end(key)
+                self._memory_hits += 1
+                return entry
+            self._entries.pop(key, None)
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+
+        if entry is None or self._expired(entry):
+            if entry is not None:
+                self._remove(path)
+            with self._lock:
+                self._misses += 1
+            return None
+
+        self._remember(key, entry)
+        with self._lock:
+            self._disk_hits += 1
+        return entry
+
+    def put(self, key: str, code: str, model_name: str) -> None:
+        """写入缓存"""
+        entry = {'code': code, 'model_name': model_name, 'created': time.time()}
+        self._remember(key, entry)
+
+        path = self._path(key)
+        temp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_file, path)
+        except OSError as e:
+            logger.error(f"写入响应缓存失败: {e}")
+            self._remove(temp_file)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def purge(self) -> int:
+        """删除磁盘上已过期的条目
+
+        Returns:
+            删除的条目数
+        """
+        removed = 0
+        now = time.time()
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    # 文件修改时间即写入时间，不需要解析内容
+                    if now - os.path.getmtime(path) > self.ttl:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+        if removed:
+            logger.info(f"响应缓存清理{removed}个过期条目")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            total = hits + self._misses
+            return {
+                'memory_entries': len(self._entries),
+                'memory_hits': self._memory_hits,
+                'disk_hits': self._disk_hits,
+                'misses': self._misses,
+                'hit_rate': hits / total if total else 0.0,
+                'ttl': self.ttl
+            }
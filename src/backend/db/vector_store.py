@@ -1,27 +1,63 @@
 from typing import List, Dict, Optional
+import hashlib
 import chromadb
 from chromadb.config import Settings
+from ..config.settings import Settings as AppSettings
 from ..providers.azure_openai import azure_openai
+from .embedding_cache import EmbeddingCache
+from .numpy_index import NumpyCollection
 import time
 import backoff  # 需要安装: pip install backoff
 
+
+def _content_hash(*parts: str) -> str:
+    """示例内容的哈希，用于判断已入库的示例是否需要更新"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def embedding_text(description: str, keywords: List[str]) -> str:
+    """条目的embedding文本：描述和关键词；没有关键词时与按同一描述查询的文本完全相同"""
+    return ' '.join([description, *keywords])
+
 class ModelicaVectorStore:
-    def __init__(self, persist_directory: Optional[str] = None):
+    def __init__(self, persist_directory: Optional[str] = None,
+                 collection_name: str = "modelica_examples",
+                 description: str = "Modelica示例代码库",
+                 backend: Optional[str] = None):
         """初始化向量数据库
         
         Args:
             persist_directory: 持久化存储目录，如果为None则使用内存存储
+            collection_name: 集合名称，示例库和已生成模型的语义缓存使用不同的集合
+            description: 集合描述
+            backend: 向量索引后端，"chroma"或"numpy"，None时使用配置VECTOR_STORE_BACKEND
         """
-        # 初始化ChromaDB客户端
-        chroma_settings = Settings(
-            persist_directory=persist_directory,
-            anonymized_telemetry=False
-        ) if persist_directory else Settings(anonymized_telemetry=False)
-        
-        self.chroma_client = chromadb.Client(chroma_settings)
+        backend = (backend or AppSettings.VECTOR_STORE_BACKEND).lower()
+        self.embedding_cache = EmbeddingCache(
+            AppSettings.EMBEDDING_CACHE_DIR,
+            AppSettings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+        )
+
+        if backend == "numpy":
+            # 进程内NumPy索引，与Chroma集合接口一致
+            self.chroma_client = None
+            self.collection = NumpyCollection(collection_name, persist_directory)
+            return
+        if backend != "chroma":
+            raise ValueError(f"不支持的向量索引后端: {backend}")
+
+        # 初始化ChromaDB客户端，指定目录时持久化到磁盘
+        chroma_settings = Settings(anonymized_telemetry=False)
+        if persist_directory:
+            self.chroma_client = chromadb.PersistentClient(path=persist_directory, settings=chroma_settings)
+        else:
+            self.chroma_client = chromadb.Client(chroma_settings)
         self.collection = self.chroma_client.get_or_create_collection(
-            name="modelica_examples",
-            metadata={"description": "Modelica示例代码库"}
+            name=collection_name,
+            metadata={"description": description}
         )
 
     @backoff.on_exception(
@@ -36,15 +72,34 @@ class ModelicaVectorStore:
             # 确保文本不为空
             if not text or not text.strip():
                 return None
-            import ipdb
-            #ipdb.set_trace()    
-            return azure_openai.get_embedding(text)
+            embedding = self.embedding_cache.get(text)
+            if embedding is not None:
+                return embedding
+            embedding = azure_openai.get_embedding(text)
+            if embedding:
+                self.embedding_cache.put(text, embedding)
+            return embedding
         except Exception as e:
             print(f"获取embedding失败: {str(e)}")
             raise  # 让backoff处理重试
 
+    def _get_embeddings(self, texts: List[str]) -> Dict[str, List[float]]:
+        """批量获取文本的embedding向量，先查缓存，未命中的文本批量请求
+
+        Returns:
+            {文本: 向量}，获取失败的文本不在结果中
+        """
+        vectors = self.embedding_cache.get_many(texts)
+        missing = list(dict.fromkeys(text for text in texts if text not in vectors and text.strip()))
+        if missing:
+            for text, embedding in zip(missing, azure_openai.get_embeddings(missing)):
+                if embedding:
+                    self.embedding_cache.put(text, embedding)
+                    vectors[text] = embedding
+        return vectors
+
     def add_examples(self, examples: Dict[str, Dict]):
-        """批量添加示例到向量数据库
+        """批量添加示例到向量数据库，已入库且内容未变化的示例直接跳过
         
         Args:
             examples: 示例字典，格式为 {
@@ -60,11 +115,23 @@ class ModelicaVectorStore:
         documents = []
         metadatas = []
         ids = []
+
+        existing = {}
+        if examples:
+            stored = self.collection.get(ids=list(examples.keys()), include=["metadatas"])
+            existing = dict(zip(stored["ids"], stored["metadatas"]))
         
+        pending = []
         for name, example in examples.items():
             # 合并描述和关键词作为文本
-            text = f"{example['description']} {' '.join(example['keywords'])}"
-            embedding = self._get_embedding(text)
+            text = embedding_text(example['description'], example['keywords'])
+            content_hash = _content_hash(text, example["code"], example.get("model_name", ""))
+            if (existing.get(name) or {}).get("content_hash") != content_hash:
+                pending.append((name, example, text, content_hash))
+
+        vectors = self._get_embeddings([text for _, _, text, _ in pending])
+        for name, example, text, content_hash in pending:
+            embedding = vectors.get(text)
             
             if embedding:
                 embeddings.append(embedding)
@@ -72,12 +139,13 @@ class ModelicaVectorStore:
                 metadatas.append({
                     "description": example["description"],
                     "model_name": example.get("model_name", ""),
-                    "keywords": ",".join(example["keywords"])
+                    "keywords": ",".join(example["keywords"]),
+                    "content_hash": content_hash
                 })
                 ids.append(name)
         
         if embeddings:
-            self.collection.add(
+            self.collection.upsert(
                 embeddings=embeddings,
                 documents=documents,
                 metadatas=metadatas,
@@ -94,7 +162,7 @@ class ModelicaVectorStore:
             similarity_threshold: 相似度阈值
             
         Returns:
-            匹配的示例列表，每个示例包含code和metadata
+            匹配的示例列表，每个示例包含id、code和metadata
         """
         query_embedding = self._get_embedding(query)
         if not query_embedding:
@@ -105,15 +173,46 @@ class ModelicaVectorStore:
             n_results=n_results,
             include=["documents", "metadatas", "distances"]
         )
-        
+        return self._matches(results, 0, similarity_threshold)
+
+    def search_many(self, queries: List[str], n_results: int = 1,
+                    similarity_threshold: float = 0.3) -> List[List[Dict]]:
+        """批量搜索，所有查询的embedding批量获取，并在一次索引查询中完成
+
+        Args:
+            queries: 查询文本列表
+            n_results: 每个查询返回的结果数量
+            similarity_threshold: 相似度阈值
+
+        Returns:
+            与queries一一对应的匹配列表，获取embedding失败的查询对应空列表
+        """
+        vectors = self._get_embeddings(queries)
+        found = [query for query in queries if query in vectors]
+        matches = {}
+        if found:
+            results = self.collection.query(
+                query_embeddings=[vectors[query] for query in found],
+                n_results=n_results,
+                include=["documents", "metadatas", "distances"]
+            )
+            for i, query in enumerate(found):
+                matches[query] = self._matches(results, i, similarity_threshold)
+        return [matches.get(query, []) for query in queries]
+
+    @staticmethod
+    def _matches(results: Dict, index: int, similarity_threshold: float) -> List[Dict]:
+        """把第index个查询的结果转换为匹配列表"""
         matches = []
-        for i, (doc, meta, distance) in enumerate(zip(
-            results["documents"][0],
-            results["metadatas"][0],
-            results["distances"][0]
-        )):
+        for example_id, doc, meta, distance in zip(
+            results["ids"][index],
+            results["documents"][index],
+            results["metadatas"][index],
+            results["distances"][index]
+        ):
             if distance < similarity_threshold:
                 matches.append({
+                    "id": example_id,
                     "code": doc,
                     "metadata": meta,
                     "similarity_score": 1 - distance  # 转换距离为相似度分数
@@ -133,7 +232,8 @@ class ModelicaVectorStore:
                       description: str, 
                       keywords: List[str],
                       code: str,
-                      model_name: str = ""):
+                      model_name: str = "",
+                      metadata: Optional[Dict] = None):
         """更新指定示例
         
         Args:
@@ -142,22 +242,21 @@ class ModelicaVectorStore:
             keywords: 关键词列表
             code: 示例代码
             model_name: 模型名称
+            metadata: 额外的元数据
         """
-        # 先删除旧数据
-        self.delete_example(example_id)
-        
-        # 添加新数据
-        text = f"{description} {' '.join(keywords)}"
+        text = embedding_text(description, keywords)
         embedding = self._get_embedding(text)
         
         if embedding:
-            self.collection.add(
+            self.collection.upsert(
                 embeddings=[embedding],
                 documents=[code],
                 metadatas=[{
                     "description": description,
                     "model_name": model_name,
-                    "keywords": ",".join(keywords)
+                    "keywords": ",".join(keywords),
+                    "content_hash": _content_hash(text, code, model_name),
+                    **(metadata or {})
                 }],
                 ids=[example_id]
             ) 
\ No newline at end of file
@@ -0,0 +1,210 @@
+import hashlib
+from typing import Dict, List, Tuple
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.modelica.outline import (
+    Token, tokenize, extract_code, closing_index, split_top_level,
+    BLOCK_ENDS, CLASS_KINDS, CLASS_PREFIXES, CLASS_START, DECLARATION_PREFIXES, SECTION_KEYWORDS
+)
+
+# 参数值的占位符
+PLACEHOLDER = '?'
+# 可以通过-override在运行时修改的参数类型：Real及标准库中的SI单位类型（均为Real的派生类型）
+OVERRIDABLE_TYPE_PREFIXES = ('SI.', 'Modelica.Units.SI.', 'Modelica.SIunits.')
+
+
+def _number(text: str) -> str:
+    """数值字面量的规范形式：整数去掉前导零，实数统一为Python的repr（1.0、1.5e-06）"""
+    if any(char in text for char in '.eE'):
+        return repr(float(text))
+    return str(int(text))
+
+
+def _canonical(tokens: List[Token]) -> List[str]:
+    """记号的规范文本，注解中的命名修改项按文本排序"""
+    texts = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.kind == 'number':
+            texts.append(_number(token.text))
+        elif token.text == 'annotation' and i + 1 < len(tokens) and tokens[i + 1].text == '(':
+            end = closing_index(tokens, i + 1)
+            texts.extend(['annotation', '('])
+            texts.extend(_modifications(tokens[i + 2:end]))
+            texts.append(')')
+            i = end + 1
+            continue
+        else:
+            texts.append(token.text)
+        i += 1
+    return texts
+
+
+def _modifications(tokens: List[Token]) -> List[str]:
+    """规范化注解中的修改项列表
+
+    每一项为 名称=值 或 名称(修改项)，顺序不影响含义，按规范文本排序；
+    嵌套的修改项同样排序。数组 {...} 和位置参数的顺序有意义，保持原样。
+    """
+    items = []
+    for item in split_top_level(tokens, ','):
+        if not item:
+            continue
+        if len(item) >= 2 and item[0].kind == 'ident' and item[1].text == '(' and closing_index(item, 1) == len(item) - 1:
+            items.append([item[0].text, '('] + _modifications(item[2:-1]) + [')'])
+        else:
+            items.append(_canonical(item))
+
+    named = all(
+        len(item) >= 2 and item[0] not in ('each', 'final') and item[1] in ('=', '(')
+        or len(item) >= 3 and item[0] in ('each', 'final')
+        for item in items
+    )
+    if named:
+        items.sort(key=' '.join)
+
+    texts = []
+    for index, item in enumerate(items):
+        if index:
+            texts.append(',')
+        texts.extend(item)
+    return texts
+
+
+def _overridable(statement: List[Token]) -> Tuple[str, int]:
+    """判断语句是否为可覆盖的参数声明
+
+    Returns:
+        (参数名, 数值字面量在语句中的起始位置)，不是可覆盖的参数时返回 ('', -1)
+    """
+    i = 0
+    while i < len(statement) and statement[i].text in DECLARATION_PREFIXES:
+        if statement[i].text == 'final':
+            return '', -1
+        i += 1
+    if i >= len(statement) or statement[i].text != 'parameter':
+        return '', -1
+    i += 1
+
+    type_name = []
+    while i < len(statement) and (statement[i].kind == 'ident' or statement[i].text == '.'):
+        if type_name and statement[i].kind == 'ident' and type_name[-1] != '.':
+            break
+        type_name.append(statement[i].text)
+        i += 1
+    type_name = ''.join(type_name)
+    if type_name != 'Real' and not type_name.startswith(OVERRIDABLE_TYPE_PREFIXES):
+        return '', -1
+    if i >= len(statement) or statement[i].kind != 'ident':
+        return '', -1
+    name = statement[i].text
+    i += 1
+    if i < len(statement) and statement[i].text == '(':
+        i = closing_index(statement, i) + 1
+    if i >= len(statement) or statement[i].text != '=':
+        return '', -1
+    start = i + 1
+
+    # 值只能是可带符号的数值字面量，之后只允许描述字符串和注解；Evaluate=true的参数在编译时已求值
+    i = start + (start < len(statement) and statement[start].text in ('-', '+'))
+    if i >= len(statement) or statement[i].kind != 'number':
+        return '', -1
+    rest = statement[i + 1:]
+    if rest and rest[0].kind == 'string':
+        rest = rest[1:]
+    if rest and (rest[0].text != 'annotation' or any(token.text == 'Evaluate' for token in rest)):
+        return '', -1
+    return name, start
+
+
+def _class_header(tokens: List[Token], i: int) -> int:
+    """tokens[i]处为类声明时返回类名之后的位置，否则返回-1"""
+    j = i
+    while j < len(tokens) and tokens[j].text in CLASS_PREFIXES:
+        j += 1
+    if j >= len(tokens) or tokens[j].text not in CLASS_KINDS:
+        return -1
+    while j + 1 < len(tokens) and tokens[j + 1].text in CLASS_KINDS:
+        j += 1
+    if j + 1 >= len(tokens) or tokens[j + 1].kind != 'ident':
+        return -1
+    return j + 2
+
+
+def split_parameters(code: str) -> Tuple[str, Dict[str, str]]:
+    """规范化代码并拆分出可覆盖的参数值
+
+    顶层类中带数值字面量绑定的Real参数（不含final和Evaluate=true）可以在运行时通过
+    -override修改，其值替换为占位符。
+
+    Returns:
+        (参数值替换为占位符的规范文本, {参数名: 规范化的数值文本})
+    """
+    tokens = list(tokenize(extract_code(code)))
+    texts = []
+    parameters = {}
+    depth = 0
+    statement = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if not statement and token.text in CLASS_START:
+            end = _class_header(tokens, i)
+            if end >= 0:
+                if end < len(tokens) and tokens[end].kind == 'string':
+                    end += 1
+                # 短类定义 type X = Real(...); 没有类体
+                if not (end < len(tokens) and tokens[end].text == '='):
+                    depth += 1
+                texts.extend(_canonical(tokens[i:end]))
+                i = end
+                continue
+        if not statement and token.text in SECTION_KEYWORDS:
+            texts.append(token.text)
+            i += 1
+            continue
+        if token.text != ';':
+            statement.append(token)
+            i += 1
+            continue
+
+        name, start = _overridable(statement) if depth == 1 else ('', -1)
+        if name:
+            value_end = start + 1 + (statement[start].text in ('-', '+'))
+            value = ''.join(token.text for token in statement[start:value_end])
+            parameters[name] = repr(float(value))
+            statement = statement[:start] + [Token('placeholder', PLACEHOLDER, 0, 0)] + statement[value_end:]
+        elif statement and statement[0].text == 'end' and (len(statement) < 2 or statement[1].text not in BLOCK_ENDS):
+            depth -= 1
+        texts.extend(_canonical(statement))
+        texts.append(';')
+        statement = []
+        i += 1
+    texts.extend(_canonical(statement))
+    return ' '.join(texts), parameters
+
+
+def canonicalize(code: str) -> str:
+    """代码的规范文本：去掉注释，统一空白和数值字面量写法，注解中的修改项按文本排序
+
+    仅在这些方面不同的代码（例如模型多次生成时注释和格式不同）得到相同的文本。
+    """
+    return ' '.join(_canonical(list(tokenize(extract_code(code)))))
+
+
+def structural_hash(code: str, include_parameters: bool = True) -> str:
+    """代码规范文本的SHA-256
+
+    Args:
+        code: 模型代码，可以带markdown代码块标记
+        include_parameters: False时可覆盖的参数值替换为占位符，只有这些参数值不同的代码哈希相同
+    """
+    text = canonicalize(code) if include_parameters else split_parameters(code)[0]
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
@@ -0,0 +1,296 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+import subprocess
+from typing import Dict, Any, Optional, Tuple, List
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.modelica.canonical import split_parameters
+from backend.modelica.process import RunControl, run_process
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+META_FILE = 'meta.json'
+
+
+def executable_name(model_name: str) -> str:
+    """获取模型可执行文件名"""
+    return f"{model_name}.exe" if os.name == 'nt' else model_name
+
+
+def artifact_names(model_name: str) -> List[str]:
+    """运行已编译模型所需的文件：可执行文件、初始化文件和模型信息"""
+    return [
+        executable_name(model_name),
+        f"{model_name}_init.xml",
+        f"{model_name}_info.json"
+    ]
+
+
+def structure_key(model_name: str, modelica_code: str) -> str:
+    """计算忽略注释、格式和可覆盖参数值的模型结构哈希"""
+    structure, _ = split_parameters(modelica_code)
+    digest = hashlib.sha256()
+    digest.update(model_name.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(structure.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def settings_overrides(settings: Dict[str, Any]) -> Dict[str, str]:
+    """将仿真设置转换为可执行文件的覆盖项"""
+    start = float(settings['startTime'])
+    stop = float(settings['stopTime'])
+    intervals = max(1, int(settings['numberOfIntervals']))
+    return {
+        'startTime': repr(start),
+        'stopTime': repr(stop),
+        'stepSize': repr((stop - start) / intervals),
+        'tolerance': repr(float(settings['tolerance'])),
+        'outputFormat': 'mat',
+        'variableFilter': settings.get('variableFilter', '.*')
+    }
+
+
+class CompiledModel:
+    """缓存中的已编译模型"""
+
+    def __init__(self, directory: str, meta: Dict[str, Any]):
+        self.directory = directory
+        self.model_name = meta['model_name']
+        self.parameters = meta.get('parameters', {})
+        self.meta = meta
+
+    @property
+    def executable(self) -> str:
+        return os.path.join(self.directory, executable_name(self.model_name))
+
+    def link_into(self, directory: str) -> 'CompiledModel':
+        """把运行所需的文件硬链接（不支持时复制）到directory
+
+        缓存条目在运行期间可能被淘汰删除，硬链接保证文件在运行结束前一直存在。
+
+        Returns:
+            位于directory中的已编译模型
+        """
+        for name in artifact_names(self.model_name):
+            source = os.path.join(self.directory, name)
+            target = os.path.join(directory, name)
+            if not os.path.exists(source) or os.path.exists(target):
+                continue
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+        return CompiledModel(directory, self.meta)
+
+    def parameter_overrides(self, modelica_code: str) -> Dict[str, str]:
+        """计算相对于编译时参数值需要覆盖的参数"""
+        _, parameters = split_parameters(modelica_code)
+        return {
+            name: value for name, value in parameters.items()
+            if self.parameters.get(name) != value
+        }
+
+    def command(self, task_dir: str, settings: Dict[str, Any],
+                overrides: Optional[Dict[str, str]] = None) -> List[str]:
+        """构建运行可执行文件的命令行
+
+        仿真设置和参数写入覆盖文件，避免variableFilter中的字符与-override的分隔符冲突
+        """
+        values = settings_overrides(settings)
+        values.update(overrides or {})
+        override_file = os.path.join(task_dir, f"{self.model_name}_override.txt")
+        with open(override_file, 'w', encoding='utf-8') as f:
+            f.writelines(f"{k}={v}\n" for k, v in values.items())
+
+        result_file = os.path.join(task_dir, f"{self.model_name}_res.mat")
+        return [
+            self.executable,
+            f"-inputPath={self.directory}",
+            f"-outputPath={task_dir}",
+            f"-r={result_file}",
+            f"-s={settings['method']}",
+            f"-overrideFile={override_file}"
+        ]
+
+    def run(self, task_dir: str, settings: Dict[str, Any],
+            overrides: Optional[Dict[str, str]] = None,
+            control: Optional[RunControl] = None) -> subprocess.CompletedProcess:
+        """在任务目录中运行已编译的模型，超时或取消时结束进程"""
+        result = run_process(self.command(task_dir, settings, overrides), task_dir, control)
+        if result.returncode != 0:
+            result.stdout += f"\nSimulation execution failed for model: {self.model_name}\n"
+        return result
+
+
+class CompiledModelCache:
+    """按源码哈希寻址的已编译模型缓存
+
+    缓存键基于规范化的代码（见canonical），忽略注释、空白、数值写法和注解顺序，
+    以及Real参数的数值；只有参数值变化时直接复用可执行文件，通过-override传入新的参数值。按最近使用时间淘汰以控制磁盘占用。
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024):
+        """初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 磁盘占用上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def lookup(self, model_name: str, modelica_code: str,
+               target_dir: Optional[str] = None) -> Optional[Tuple[CompiledModel, Dict[str, str]]]:
+        """查找已编译模型
+
+        Args:
+            model_name: 模型名称
+            modelica_code: 模型代码
+            target_dir: 运行目录，提供时把运行所需的文件链接到该目录，返回的模型在该目录中运行，
+                不受之后缓存淘汰的影响
+
+        Returns:
+            (已编译模型, 需要覆盖的参数)，未命中时返回None
+        """
+        entry_dir = self._entry_dir(structure_key(model_name, modelica_code))
+        meta_file = os.path.join(entry_dir, META_FILE)
+        try:
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            self._count(False)
+            return None
+
+        compiled = CompiledModel(entry_dir, meta)
+        try:
+            if target_dir is not None:
+                compiled = compiled.link_into(target_dir)
+            # 更新访问时间用于LRU淘汰
+            os.utime(meta_file, None)
+        except OSError:
+            # 条目恰好被淘汰
+            self._count(False)
+            return None
+        if not os.path.exists(compiled.executable):
+            self._count(False)
+            return None
+
+        self._count(True)
+        return compiled, compiled.parameter_overrides(modelica_code)
+
+    def store(self, model_name: str, modelica_code: str, build_dir: str) -> Optional[CompiledModel]:
+        """将构建目录中的可执行文件及初始化文件放入缓存"""
+        key = structure_key(model_name, modelica_code)
+        entry_dir = self._entry_dir(key)
+        staging_dir = f"{entry_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        artifacts = artifact_names(model_name)
+        if not os.path.exists(os.path.join(build_dir, artifacts[0])):
+            return None
+
+        _, parameters = split_parameters(modelica_code)
+        meta = {
+            'model_name': model_name,
+            'parameters': parameters,
+            'created': time.time()
+        }
+
+        try:
+            os.makedirs(staging_dir, exist_ok=True)
+            for name in artifacts:
+                source = os.path.join(build_dir, name)
+                if os.path.exists(source):
+                    shutil.copy2(source, os.path.join(staging_dir, name))
+            with open(os.path.join(staging_dir, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+
+            try:
+                os.rename(staging_dir, entry_dir)
+            except OSError:
+                # 其他请求已经写入同一条目
+                shutil.rmtree(staging_dir, ignore_errors=True)
+        except Exception as e:
+            logger.error(f"写入编译缓存失败: {e}")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return None
+
+        self.evict()
+        try:
+            with open(os.path.join(entry_dir, META_FILE), 'r', encoding='utf-8') as f:
+                return CompiledModel(entry_dir, json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """列出缓存条目 (最近访问时间, 大小, 目录)"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            meta_file = os.path.join(entry_dir, META_FILE)
+            if name.endswith('.tmp') or not os.path.exists(meta_file):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(entry_dir, f))
+                for f in os.listdir(entry_dir)
+            )
+            entries.append((os.path.getmtime(meta_file), size, entry_dir))
+        return entries
+
+    def evict(self) -> int:
+        """按最近最少使用淘汰条目，直到磁盘占用低于上限
+
+        Returns:
+            淘汰的条目数
+        """
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            for _, size, entry_dir in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= size
+                evicted += 1
+            if evicted:
+                logger.info(f"编译缓存淘汰{evicted}个条目")
+            return evicted
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        entries = self._entries()
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        return {
+            'entries': len(entries),
+            'size_bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'misses': misses
+        }
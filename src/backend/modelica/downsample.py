@@ -0,0 +1,200 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Tuple, Optional
+
+import numpy as np
+
+# 每一级分辨率的桶大小是上一级的LEVEL_FACTOR倍
+LEVEL_FACTOR = 4
+# 最粗一级至少保留的桶数
+MIN_LEVEL_BUCKETS = 256
+
+
+class ResolutionPyramid:
+    """单个变量的多分辨率min/max金字塔
+
+    第k级把原始采样按 LEVEL_FACTOR**k 个一组分桶，记录每个桶的最小值、最大值
+    及其原始下标。查询时按每像素采样数选择合适的一级，只在少量桶上聚合。
+    """
+
+    def __init__(self, time: np.ndarray, values: np.ndarray):
+        self.time = np.asarray(time, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.levels = []  # [(桶大小, 最小值, 最小值下标, 最大值, 最大值下标)]
+
+        bucket = LEVEL_FACTOR
+        count = len(self.values)
+        while count // bucket >= MIN_LEVEL_BUCKETS:
+            self.levels.append((bucket,) + self._build_level(bucket))
+            bucket *= LEVEL_FACTOR
+
+    def _build_level(self, bucket: int) -> Tuple[np.ndarray, ...]:
+        starts = np.arange(0, len(self.values), bucket)
+        mins = np.minimum.reduceat(self.values, starts)
+        maxs = np.maximum.reduceat(self.values, starts)
+        min_idx = self._arg_reduce(self.values, bucket, np.argmin)
+        max_idx = self._arg_reduce(self.values, bucket, np.argmax)
+        return mins, min_idx, maxs, max_idx
+
+    @staticmethod
+    def _arg_reduce(values: np.ndarray, bucket: int, arg_func) -> np.ndarray:
+        """计算每个桶内极值的原始下标"""
+        full = len(values) // bucket * bucket
+        result = np.empty(-(-len(values) // bucket), dtype=np.int64)
+        if full:
+            blocks = values[:full].reshape(-1, bucket)
+            result[:len(blocks)] = arg_func(blocks, axis=1) + np.arange(0, full, bucket)
+        if full < len(values):
+            result[-1] = full + arg_func(values[full:])
+        return result
+
+    def _window(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        """将时间窗口转换为原始下标范围 [i0, i1)"""
+        i0 = 0 if start is None else int(np.searchsorted(self.time, start, side='left'))
+        i1 = len(self.time) if end is None else int(np.searchsorted(self.time, end, side='right'))
+        return max(0, i0 - 1), min(len(self.time), i1 + 1)
+
+    def minmax(self, start: Optional[float], end: Optional[float], width: int) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """min/max分桶降采样，每个像素桶保留最小值和最大值两个点
+
+        Returns:
+            (按时间排序的原始下标, 查询信息)
+        """
+        i0, i1 = self._window(start, end)
+        count = i1 - i0
+        width = max(1, width)
+        if count <= 2 * width:
+            return np.arange(i0, i1), {'level': 0, 'points_in_window': count}
+
+        # 选择桶大小不超过每像素采样数的最粗一级
+        samples_per_pixel = count / width
+        level = 0
+        for index, entry in enumerate(self.levels):
+            if entry[0] <= samples_per_pixel:
+                level = index + 1
+
+        if level == 0:
+            bucket = 1
+            mins = maxs = self.values[i0:i1]
+            min_idx = max_idx = np.arange(i0, i1)
+        else:
+            bucket, level_mins, level_min_idx, level_maxs, level_max_idx = self.levels[level - 1]
+            j0, j1 = i0 // bucket, -(-i1 // bucket)
+            mins, min_idx = level_mins[j0:j1], level_min_idx[j0:j1]
+            maxs, max_idx = level_maxs[j0:j1], level_max_idx[j0:j1]
+
+        # 将该级的桶平均分配到width个像素桶中
+        groups = min(width, len(mins))
+        edges = np.linspace(0, len(mins), groups + 1).astype(np.int64)[:-1]
+        group_ids = np.repeat(np.arange(groups), np.diff(np.append(edges, len(mins))))
+        # 按 (像素桶, 取值) 排序后，每个像素桶的第一个元素即为极值
+        min_order = np.lexsort((mins, group_ids))
+        max_order = np.lexsort((-maxs, group_ids))
+        selected = np.concatenate([min_idx[min_order[edges]], max_idx[max_order[edges]]])
+
+        indices = np.unique(selected)
+        return indices, {'level': level, 'bucket': int(bucket), 'points_in_window': count}
+
+    def lttb(self, start: Optional[float], end: Optional[float], width: int) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """先用min/max预选候选点，再用LTTB选出width个点"""
+        candidates, info = self.minmax(start, end, 2 * width)
+        if len(candidates) <= width:
+            return candidates, info
+        return candidates[largest_triangle_three_buckets(
+            self.time[candidates], self.values[candidates], width
+        )], info
+
+    def query(self, start: Optional[float], end: Optional[float], width: int,
+              method: str = 'minmax') -> Dict[str, Any]:
+        """查询时间窗口内的降采样结果"""
+        if method == 'lttb':
+            indices, info = self.lttb(start, end, width)
+        elif method == 'minmax':
+            indices, info = self.minmax(start, end, width)
+        else:
+            raise ValueError(f"不支持的降采样方法: {method}")
+        info.update({
+            'method': method,
+            'time': self.time[indices].tolist(),
+            'values': self.values[indices].tolist()
+        })
+        return info
+
+
+def largest_triangle_three_buckets(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """LTTB降采样，返回被选中点的下标"""
+    count = len(x)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, count - 1
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+
+    previous = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_lo, next_hi = hi, max(edges[i + 2] if i + 2 < len(edges) else count, hi + 1)
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (avg_y - y[previous])
+        )
+        previous = lo + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+
+def overview(time, values: Dict[str, Any], width: int) -> Dict[str, Any]:
+    """多个变量共用时间轴的概览
+
+    每个变量按width个桶做min/max分桶，选出的下标取并集，保留每个变量在每个桶内的极值
+    以及首尾两点，概览最多约 2 * width * 变量数 个时间点。
+
+    Returns:
+        {'time': 时间, 'values': {变量名: 取值}}，采样点不多于2*width时原样返回
+    """
+    time = np.asarray(time, dtype=np.float64)
+    count = len(time)
+    width = max(1, width)
+    if count <= 2 * width:
+        return {'time': time, 'values': values}
+
+    bucket = -(-count // width)
+    selected = [np.array([0, count - 1])]
+    for series in values.values():
+        series = np.asarray(series, dtype=np.float64)
+        selected.append(ResolutionPyramid._arg_reduce(series, bucket, np.argmin))
+        selected.append(ResolutionPyramid._arg_reduce(series, bucket, np.argmax))
+    indices = np.unique(np.concatenate(selected))
+    return {
+        'time': time[indices],
+        'values': {name: np.asarray(series)[indices] for name, series in values.items()}
+    }
+
+
+class PyramidCache:
+    """按 (结果文件, 修改时间, 变量) 缓存分辨率金字塔的LRU缓存"""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, result_file: str, variable: str, loader) -> ResolutionPyramid:
+        """获取金字塔，未命中时调用loader()读取 (时间, 取值) 并构建"""
+        key = (result_file, os.path.getmtime(result_file), variable)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        time, values = loader()
+        pyramid = ResolutionPyramid(time, values)
+        with self._lock:
+            self._entries[key] = pyramid
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return pyramid
@@ -1,6 +1,5 @@
 from typing import Tuple, Optional
 import os
-import re
 from ..providers.azure_openai import azure_openai
 import sys
 from pathlib import Path
@@ -11,6 +10,7 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 from backend.utils.logger import setup_logger
+from backend.modelica.outline import parse_outline
 
 logger = setup_logger(__name__)
 
@@ -58,9 +58,9 @@ class ModelicaCodeGenerator:
         if not isinstance(modelica_code, str):
             raise ValueError("模型代码必须是字符串类型")
             
-        model_match = re.search(r'model\s+(\w+)', modelica_code)
-        if not model_match:
+        model_name = parse_outline(modelica_code)['name']
+        if not model_name:
             raise ValueError('无法从生成的代码中识别模型名称')
-        return model_match.group(1)
+        return model_name
 
     # ... 其他方法移动到这个文件中 
\ No newline at end of file
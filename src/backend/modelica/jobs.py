@@ -0,0 +1,200 @@
+import time
+import uuid
+import queue
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.modelica.process import RunControl, SimulationTimeoutError, SimulationCancelledError
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+TIMEOUT = 'timeout'
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED, TIMEOUT)
+
+
+class QueueFullError(Exception):
+    """任务队列已满"""
+
+
+class SimulationJob:
+    """一个异步仿真任务
+
+    完成后只保留结果ID、状态和错误信息，仿真结果在获取时从结果存储重新读取，
+    保留的已完成任务不占用结果数据的内存。
+    """
+
+    def __init__(self, modelica_code: str, model_name: str, timeout: Optional[float],
+                 setup: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.modelica_code = modelica_code
+        self.model_name = model_name
+        self.timeout = timeout
+        self.setup = setup
+        self.status = QUEUED
+        self.result_id = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.control = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        """任务状态，不包含仿真结果"""
+        return {
+            'job_id': self.id,
+            'model_name': self.model_name,
+            'status': self.status,
+            'error': self.error,
+            'result_id': self.result_id,
+            'timeout': self.timeout,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class SimulationJobQueue:
+    """有界的异步仿真任务队列
+
+    固定数量的工作线程从队列中取任务执行，每个任务有独立的墙钟时间限制，
+    超时或取消时结束omc子进程，避免慢仿真长期占用HTTP工作线程。
+    """
+
+    def __init__(self, runner: Callable[[str, str, RunControl, Optional[Dict[str, Any]]], Dict[str, Any]],
+                 workers: int = 2, max_queue: int = 100,
+                 default_timeout: Optional[float] = 300.0,
+                 retention: int = 1000):
+        """初始化任务队列
+
+        Args:
+            runner: 执行仿真的函数，参数为(代码, 模型名, 运行控制, 仿真设置)
+            workers: 工作线程数
+            max_queue: 排队任务数上限
+            default_timeout: 默认墙钟时间限制（秒）
+            retention: 保留的已完成任务数
+        """
+        self.runner = runner
+        self.default_timeout = default_timeout
+        self.retention = retention
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {state: 0 for state in FINISHED_STATES}
+        self._running = 0
+
+        self._workers = []
+        for i in range(max(1, workers)):
+            worker = threading.Thread(target=self._work, name=f"simulation-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, modelica_code: str, model_name: str, timeout: Optional[float] = None,
+               setup: Optional[Dict[str, Any]] = None) -> SimulationJob:
+        """提交仿真任务，队列已满时抛出QueueFullError"""
+        job = SimulationJob(modelica_code, model_name, self.default_timeout if timeout is None else timeout, setup)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            raise QueueFullError("仿真任务队列已满，请稍后重试")
+        return job
+
+    def get(self, job_id: str) -> Optional[SimulationJob]:
+        """按ID获取任务"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[SimulationJob]:
+        """取消任务，排队中的任务不再执行，运行中的任务结束其子进程"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            if job.status == QUEUED:
+                self._finish(job, CANCELLED, error="任务已取消")
+            elif job.control is not None:
+                job.control.cancel()
+        return job
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                with self._lock:
+                    if job.finished:
+                        continue
+                    job.status = RUNNING
+                    job.started_at = time.time()
+                    job.control = RunControl(job.timeout)
+                    self._running += 1
+                self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job: SimulationJob) -> None:
+        try:
+            result = self.runner(job.modelica_code, job.model_name, job.control, job.setup)
+            state, error = SUCCEEDED, None
+            # "仿真成功但处理结果失败"等状态也算失败
+            if result.get('status') != '仿真成功':
+                state, error = FAILED, result.get('error') or result.get('status')
+        except SimulationTimeoutError as e:
+            result, state, error = None, TIMEOUT, str(e)
+        except SimulationCancelledError as e:
+            result, state, error = None, CANCELLED, str(e)
+        except Exception as e:
+            logger.error(f"仿真任务{job.id}出错: {e}")
+            result, state, error = None, FAILED, str(e)
+
+        with self._lock:
+            self._running -= 1
+            job.result_id = result.get('result_id') if result else None
+            self._finish(job, state, error)
+
+    def _finish(self, job: SimulationJob, state: str, error: Optional[str] = None) -> None:
+        """标记任务完成并清理过多的已完成任务，调用方需持有锁"""
+        job.status = state
+        job.error = error
+        job.finished_at = time.time()
+        job.control = None
+        job.modelica_code = None
+        self._counters[state] += 1
+
+        finished = [job_id for job_id, item in self._jobs.items() if item.finished]
+        for job_id in finished[:max(0, len(finished) - self.retention)]:
+            del self._jobs[job_id]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取队列指标"""
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self._queue.maxsize,
+                'running': self._running,
+                'workers': len(self._workers),
+                'default_timeout': self.default_timeout,
+                'completed': dict(self._counters)
+            }
@@ -0,0 +1,188 @@
+import struct
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+import numpy as np
+
+# MAT v4 矩阵头部：type, mrows, ncols, imagf, namelen（均为int32）
+HEADER_SIZE = 20
+
+# type = M*1000 + O*100 + P*10 + T 中P对应的数据类型
+PRECISIONS = {
+    0: 'f8',
+    1: 'f4',
+    2: 'i4',
+    3: 'i2',
+    4: 'u2',
+    5: 'u1'
+}
+
+
+class MatResultReader:
+    """OpenModelica MAT v4结果文件读取器
+
+    通过内存映射访问数据矩阵，根据name/description/dataInfo解析变量名和别名，
+    只读取调用方需要的变量列，不做全文解析，也不复制所有列。
+    """
+
+    def __init__(self, path: str):
+        """打开结果文件并解析矩阵目录
+
+        Args:
+            path: .mat结果文件路径
+        """
+        self.path = path
+        self._buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        self._matrices = self._scan()
+
+        aclass = self._strings('Aclass', transposed=False)
+        # binTrans格式中矩阵按变量转置存放，binNormal则相反
+        self.transposed = len(aclass) > 3 and aclass[3].startswith('binTrans')
+
+        self._names = None
+        self._descriptions = None
+        self._index = None
+        self._info = self._matrix('dataInfo')
+        if not self.transposed:
+            self._info = self._info.T
+
+    def _scan(self) -> Dict[str, Tuple[np.dtype, int, int, int]]:
+        """扫描文件中的所有矩阵，记录 {名称: (数据类型, 行数, 列数, 数据偏移)}"""
+        matrices = {}
+        offset = 0
+        size = len(self._buffer)
+        while offset + HEADER_SIZE <= size:
+            header = bytes(self._buffer[offset:offset + HEADER_SIZE])
+            matrix_type = struct.unpack_from('<i', header)[0]
+            byte_order = '>' if matrix_type // 1000 == 1 else '<'
+            matrix_type, mrows, ncols, imagf, namelen = struct.unpack_from(f'{byte_order}5i', header)
+
+            precision = (matrix_type % 100) // 10
+            if precision not in PRECISIONS or imagf:
+                raise ValueError(f"不支持的MAT矩阵类型: {matrix_type}")
+            dtype = np.dtype(byte_order + PRECISIONS[precision])
+
+            name_start = offset + HEADER_SIZE
+            name = bytes(self._buffer[name_start:name_start + namelen]).rstrip(b'\0').decode('ascii')
+            data_offset = name_start + namelen
+            if name == 'data_2':
+                # data_2是最后一个矩阵。仿真进行中头部的列数尚未回写，
+                # 按已写入的字节数计算完整的时间点数（binTrans格式每个时间点连续存放）
+                complete = max(0, size - data_offset) // max(1, mrows * dtype.itemsize)
+                if ncols == 0 or ncols > complete:
+                    ncols = complete
+                matrices[name] = (dtype, mrows, ncols, data_offset)
+                break
+            matrices[name] = (dtype, mrows, ncols, data_offset)
+            offset = data_offset + mrows * ncols * dtype.itemsize
+        return matrices
+
+    def _matrix(self, name: str) -> np.ndarray:
+        """获取矩阵的内存映射视图，形状为 (列数, 行数)，即文件中的存储顺序"""
+        if name not in self._matrices:
+            raise KeyError(f"结果文件中缺少矩阵: {name}")
+        dtype, mrows, ncols, offset = self._matrices[name]
+        return np.ndarray((ncols, mrows), dtype=dtype, buffer=self._buffer, offset=offset)
+
+    def _strings(self, name: str, transposed: bool) -> List[str]:
+        """读取字符矩阵为字符串列表"""
+        chars = self._matrix(name)
+        if not transposed:
+            chars = chars.T
+        return [
+            bytes(row.astype(np.uint8)).rstrip(b'\0 ').decode('utf-8', errors='replace')
+            for row in chars
+        ]
+
+    @property
+    def variables(self) -> List[str]:
+        """所有变量名（包括参数和别名）"""
+        if self._names is None:
+            self._names = self._strings('name', self.transposed)
+        return self._names
+
+    @property
+    def descriptions(self) -> Dict[str, str]:
+        """变量描述"""
+        if self._descriptions is None:
+            self._descriptions = dict(zip(self.variables, self._strings('description', self.transposed)))
+        return self._descriptions
+
+    def _lookup(self, name: str) -> Tuple[int, int, int]:
+        """解析变量所在的数据矩阵、列号和符号（负号表示取反的别名）"""
+        if self._index is None:
+            self._index = {variable: i for i, variable in enumerate(self.variables)}
+        if name not in self._index:
+            raise KeyError(f"结果文件中没有变量: {name}")
+        matrix, column = int(self._info[self._index[name], 0]), int(self._info[self._index[name], 1])
+        # dataInfo中0表示横坐标（时间），存放在data_2中
+        return (2 if matrix == 0 else matrix), abs(column) - 1, (-1 if column < 0 else 1)
+
+    def _data(self, matrix: int) -> np.ndarray:
+        """获取数据矩阵，形状统一为 (时间点, 变量)"""
+        data = self._matrix(f'data_{matrix}')
+        return data if self.transposed else data.T
+
+    @property
+    def time(self) -> np.ndarray:
+        """时间序列"""
+        return self._data(2)[:, 0]
+
+    def read(self, names: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """读取指定变量的时间序列
+
+        Args:
+            names: 变量名列表，None表示除time外的所有变量
+
+        Returns:
+            {变量名: 数组}，data_2中的变量返回内存映射视图，不复制数据
+        """
+        if names is None:
+            names = [name for name in self.variables if name != 'time']
+
+        length = len(self.time)
+        series = {}
+        for name in names:
+            matrix, column, sign = self._lookup(name)
+            values = self._data(matrix)[:, column]
+            if matrix == 1:
+                # 参数在data_1中只有首末两个值，展开为常数序列
+                values = np.full(length, values[0], dtype=np.float64)
+            series[name] = values if sign > 0 else -values
+        return series
+
+
+class MatResultTail:
+    """增量读取仿真进行中的结果文件
+
+    求解器按时间点向data_2追加数据，每次poll返回上次之后新写入的完整时间点。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.position = 0
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """读取新写入的时间点
+
+        Returns:
+            {'start': 起始时间点序号, 'data': {'time': 数组, 'values': {变量名: 数组}}}，
+            没有新数据或文件尚未写出头部时返回None
+        """
+        try:
+            reader = MatResultReader(self.path)
+            time = reader.time
+            if len(time) <= self.position:
+                return None
+            values = reader.read()
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            # 文件尚未创建或头部尚未写完整
+            return None
+
+        start, self.position = self.position, len(time)
+        return {
+            'start': start,
+            'data': {
+                'time': time[start:].copy(),
+                'values': {name: series[start:].copy() for name, series in values.items()}
+            }
+        }
@@ -0,0 +1,202 @@
+import os
+import gzip
+import json
+import time
+import argparse
+from typing import Any, Callable, Dict, List, Optional
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 索引文件格式版本，格式变化时旧索引需要重新生成
+INDEX_FORMAT = 1
+
+
+def _scopes(name: str) -> List[str]:
+    """类名由内向外的查找作用域，例如 A.B.C -> [A.B.C, A.B, A, '']"""
+    parts = name.split('.')
+    return ['.'.join(parts[:i]) for i in range(len(parts), -1, -1)]
+
+
+class MslIndex:
+    """Modelica标准库类树的索引
+
+    记录每个类的种类（model / block / connector / package ...）、组件
+    （名称、类型、可变性、输入输出）和继承的基类，用于在调用omc之前检查代码中的引用。
+    """
+
+    def __init__(self, classes: Dict[str, List[Any]], version: str = ''):
+        """初始化索引
+
+        Args:
+            classes: {全限定类名: [种类, [[组件名, 类型, 可变性, 输入输出], ...], [基类, ...]]}
+            version: 标准库版本
+        """
+        self.classes = classes
+        self.version = version
+        self.roots = {name.split('.')[0] for name in classes}
+        self._members = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.classes
+
+    def kind(self, name: str) -> Optional[str]:
+        entry = self.classes.get(name)
+        return entry[0] if entry else None
+
+    def resolve(self, name: str, scope: str = '') -> Optional[str]:
+        """按Modelica的查找规则在scope及其外层中解析类名，找不到时返回None"""
+        first = name.split('.')[0]
+        for prefix in _scopes(scope):
+            candidate = f"{prefix}.{first}" if prefix else first
+            if candidate in self.classes:
+                full_name = f"{prefix}.{name}" if prefix else name
+                return full_name if full_name in self.classes else None
+        return None
+
+    def components(self, name: str) -> Dict[str, Dict[str, str]]:
+        """类的全部组件，包括继承得到的组件
+
+        Returns:
+            {组件名: {'type': 类型, 'variability': 可变性, 'direction': 输入输出}}
+        """
+        members = self._members.get(name)
+        if members is not None:
+            return members
+
+        members = {}
+        entry = self.classes.get(name)
+        if entry is not None:
+            # 先占位，防止错误的继承关系导致无限递归
+            self._members[name] = members
+            for base in entry[2]:
+                resolved = self.resolve(base, name.rsplit('.', 1)[0]) or base
+                members.update(self.components(resolved))
+            for component, type_name, variability, direction in entry[1]:
+                members[component] = {
+                    'type': type_name,
+                    'variability': variability,
+                    'direction': direction
+                }
+        self._members[name] = members
+        return members
+
+    def parameters(self, name: str) -> List[str]:
+        """类的参数名称"""
+        return [
+            component for component, info in self.components(name).items()
+            if info['variability'] == 'parameter'
+        ]
+
+    def connectors(self, name: str) -> List[str]:
+        """类中类型为connector的组件名称"""
+        return [
+            component for component, info in self.components(name).items()
+            if 'connector' in (self.kind(info['type']) or '')
+        ]
+
+    def save(self, path: str) -> None:
+        """写入压缩的JSON文件"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_file = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(temp_file, 'wt', encoding='utf-8') as f:
+            json.dump({
+                'format': INDEX_FORMAT,
+                'version': self.version,
+                'classes': self.classes
+            }, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_file, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'MslIndex':
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('format') != INDEX_FORMAT:
+            raise ValueError(f"索引格式版本{data.get('format')}与当前版本{INDEX_FORMAT}不一致，请重新生成")
+        return cls(data['classes'], data.get('version', ''))
+
+
+def load_msl_index(path: str) -> Optional[MslIndex]:
+    """加载标准库索引，文件不存在或无法读取时返回None"""
+    if not os.path.exists(path):
+        logger.info(f"未找到标准库索引{path}，跳过代码引用检查；可运行 python -m backend.modelica.msl_index 生成")
+        return None
+    try:
+        start = time.time()
+        index = MslIndex.load(path)
+        logger.info(f"已加载标准库索引（{len(index.classes)}个类），耗时{time.time() - start:.2f}秒")
+        return index
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"加载标准库索引失败: {e}")
+        return None
+
+
+def extract_library(send: Callable[[str], Any], library: str = 'Modelica') -> MslIndex:
+    """通过omc的API提取已加载库的类树
+
+    Args:
+        send: 发送表达式到omc并返回解析结果的函数，例如 OMCSessionZMQ.sendExpression
+        library: 顶层库名称
+    """
+    names = [str(name) for name in send(f"getClassNames({library}, recursive=true, qualified=true, sort=true)") or ()]
+    known = set(names)
+    classes = {}
+    for name in names:
+        kind = str(send(f"getClassRestriction({name})") or '')
+        components = []
+        if kind != 'package':
+            # 每项为 {类型, 名称, 注释, 可见性, final, flow, stream, replaceable, 可变性, inner/outer, 输入输出, 维度}
+            for item in send(f"getComponents({name})") or ():
+                if len(item) < 11 or item[3] == 'protected':
+                    continue
+                components.append([str(item[1]), str(item[0]), str(item[8]), str(item[10])])
+        bases = [str(base) for base in send(f"getInheritedClasses({name})") or ()]
+        classes[name] = [kind, components, bases]
+
+    # 类型和基类按定义所在的作用域解析为全限定名
+    index = MslIndex(classes, str(send(f"getVersion({library})") or ''))
+    for name, (_, components, bases) in classes.items():
+        scope = name.rsplit('.', 1)[0]
+        for component in components:
+            if component[1] not in known:
+                component[1] = index.resolve(component[1], scope) or component[1]
+        classes[name][2] = [base if base in known else index.resolve(base, scope) or base for base in bases]
+    return index
+
+
+def build_index(path: str, library: str = 'Modelica') -> MslIndex:
+    """启动omc加载标准库并生成索引文件"""
+    from OMPython import OMCSessionZMQ
+
+    omc = OMCSessionZMQ()
+    try:
+        if not omc.sendExpression(f"loadModel({library})"):
+            raise RuntimeError(f"加载{library}失败: {omc.sendExpression('getErrorString()')}")
+        start = time.time()
+        index = extract_library(omc.sendExpression, library)
+        index.save(path)
+        logger.info(f"已生成{library} {index.version}的索引（{len(index.classes)}个类），耗时{time.time() - start:.1f}秒")
+        return index
+    finally:
+        try:
+            omc.sendExpression("quit()")
+        except Exception:
+            pass
+
+
+if __name__ == '__main__':
+    from backend.config.settings import Settings
+
+    parser = argparse.ArgumentParser(description='生成Modelica标准库索引')
+    parser.add_argument('--output', default=Settings.MSL_INDEX_PATH, help='索引文件路径')
+    parser.add_argument('--library', default='Modelica', help='顶层库名称')
+    args = parser.parse_args()
+    build_index(args.output, args.library)
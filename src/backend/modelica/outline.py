@@ -0,0 +1,240 @@
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple
+
+# 单次扫描的词法规则，按顺序匹配；未闭合的注释和字符串一直延伸到文本末尾（流式生成时常见）
+TOKEN_PATTERN = re.compile(r'''
+    (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>"(?:\\.|[^"\\])*(?:"|\Z))
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+  | (?P<ident>[A-Za-z_]\w*|'(?:\\.|[^'\\])*')
+  | (?P<operator>\.[*^/+-]|==|<>|<=|>=|:=|[-+*/^=<>()\[\]{},;:.])
+  | (?P<space>\s+)
+  | (?P<other>.)
+''', re.DOTALL | re.VERBOSE)
+
+# 代码块：允许没有结束标记，流式生成时代码块尚未结束
+FENCED_CODE_PATTERN = re.compile(r'```[ \t]*(?:modelica|mo)?[ \t]*\n(.*?)(?:```|\Z)', re.DOTALL | re.IGNORECASE)
+
+CLASS_KINDS = {'model', 'block', 'class', 'connector', 'record', 'package', 'function', 'type', 'operator'}
+CLASS_PREFIXES = {'partial', 'encapsulated', 'expandable', 'final', 'replaceable', 'redeclare', 'inner', 'outer', 'pure', 'impure'}
+# end之后跟这些关键字时结束的是语句块而不是类
+BLOCK_ENDS = {'if', 'for', 'when', 'while'}
+DECLARATION_PREFIXES = {'final', 'inner', 'outer', 'replaceable', 'redeclare', 'discrete', 'input', 'output', 'flow', 'stream', 'each'}
+SECTION_KEYWORDS = {'equation', 'algorithm', 'initial', 'public', 'protected'}
+CLASS_START = CLASS_KINDS | CLASS_PREFIXES
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    line: int
+    start: int
+
+
+def tokenize(code: str, comments: bool = False) -> Iterator[Token]:
+    """把Modelica代码切分为记号
+
+    Args:
+        code: 代码
+        comments: 是否保留注释记号
+
+    Yields:
+        Token(种类, 文本, 行号, 起始位置)，种类为 comment / string / number / ident / operator / other，空白不返回
+    """
+    line = 1
+    for match in TOKEN_PATTERN.finditer(code):
+        kind = match.lastgroup
+        text = match.group()
+        if kind != 'space' and (kind != 'comment' or comments):
+            yield Token(kind, text, line, match.start())
+        line += text.count('\n')
+
+
+def extract_code(text: str) -> str:
+    """去掉模型回复中的markdown代码块标记，没有代码块时原样返回"""
+    match = FENCED_CODE_PATTERN.search(text)
+    return match.group(1) if match else text
+
+
+def _unquote(text: str) -> str:
+    return text[1:-1] if len(text) >= 2 and text.endswith('"') else text[1:]
+
+
+def _value(text: str) -> Any:
+    """数值字面量转换为数字，其余保留表达式文本"""
+    compact = text.replace(' ', '')
+    if re.fullmatch(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?', compact):
+        return float(compact)
+    return text
+
+
+def _join(tokens: List[Token]) -> str:
+    """把记号拼接为紧凑的表达式文本"""
+    return ' '.join(token.text for token in tokens).replace(' . ', '.').replace(' .', '.').replace('. ', '.')
+
+
+def split_top_level(tokens: List[Token], separator: str) -> List[List[Token]]:
+    """按最外层括号外的分隔符切分记号"""
+    parts, depth, current = [], 0, []
+    for token in tokens:
+        if token.text in ('(', '[', '{'):
+            depth += 1
+        elif token.text in (')', ']', '}'):
+            depth -= 1
+        if token.text == separator and depth == 0:
+            parts.append(current)
+            current = []
+        else:
+            current.append(token)
+    parts.append(current)
+    return parts
+
+
+def closing_index(tokens: List[Token], start: int) -> int:
+    """tokens[start]处左括号对应的右括号位置，未闭合时返回len(tokens)"""
+    depth = 0
+    for i in range(start, len(tokens)):
+        if tokens[i].text in ('(', '[', '{'):
+            depth += 1
+        elif tokens[i].text in (')', ']', '}'):
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(tokens)
+
+
+def _parse_experiment(tokens: List[Token]) -> Dict[str, Any]:
+    """从类注解中提取experiment(...)的设置"""
+    for i, token in enumerate(tokens):
+        if token.text == 'experiment' and i + 1 < len(tokens) and tokens[i + 1].text == '(':
+            body = tokens[i + 2:closing_index(tokens, i + 1)]
+            experiment = {}
+            for item in split_top_level(body, ','):
+                if len(item) >= 3 and item[0].kind == 'ident' and item[1].text == '=':
+                    experiment[item[0].text] = _value(_join(item[2:]))
+            return experiment
+    return {}
+
+
+def _parse_parameters(tokens: List[Token]) -> List[Dict[str, Any]]:
+    """解析 parameter 声明语句（不含结尾的分号）"""
+    i = 0
+    while i < len(tokens) and tokens[i].text in DECLARATION_PREFIXES:
+        i += 1
+    if i >= len(tokens) or tokens[i].text != 'parameter':
+        return []
+    i += 1
+    type_tokens = []
+    while i < len(tokens) and (tokens[i].kind == 'ident' or tokens[i].text == '.'):
+        if type_tokens and tokens[i].kind == 'ident' and type_tokens[-1].kind == 'ident':
+            break
+        type_tokens.append(tokens[i])
+        i += 1
+    if i < len(tokens) and tokens[i].text == '[':
+        i = closing_index(tokens, i) + 1
+
+    parameters = []
+    for item in split_top_level(tokens[i:], ','):
+        if not item or item[0].kind != 'ident':
+            continue
+        j = 1
+        while j < len(item) and item[j].text in ('[', '('):
+            j = closing_index(item, j) + 1
+        default = []
+        if j < len(item) and item[j].text == '=':
+            j += 1
+            while j < len(item) and item[j].kind != 'string' and item[j].text != 'annotation':
+                default.append(item[j])
+                j += 1
+        description = next((token for token in item[j:] if token.kind == 'string'), None)
+        parameters.append({
+            'name': item[0].text,
+            'type': _join(type_tokens),
+            'default': _value(_join(default)) if default else None,
+            'description': _unquote(description.text) if description else None
+        })
+    return parameters
+
+
+def parse_outline(code: str) -> Dict[str, Any]:
+    """解析代码的结构概要，注释和字符串中的内容不会被误认为代码
+
+    Args:
+        code: 模型代码，可以带markdown代码块标记，也可以是尚未生成完的代码
+
+    Returns:
+        {
+            'name': 第一个顶层类的名称，类名之后还没有其他记号时（名称可能还没生成完）为None,
+            'kind': 类的种类（model / block / package ...）,
+            'description': 类的描述字符串,
+            'classes': [{'kind': 种类, 'name': 名称}]，所有顶层类,
+            'imports': 顶层类中的import（如 "Modelica.Blocks.*"、"SI = Modelica.Units.SI"）,
+            'parameters': [{'name', 'type', 'default', 'description'}]，顶层类中的参数，数值默认值转换为float,
+            'experiment': 顶层类注解中experiment(...)的设置，如 {'StopTime': 10.0},
+            'end': 第一个顶层类结束语句 end 名称; 之后在去掉代码块标记的代码中的位置，类尚未结束时为None
+        }
+    """
+    tokens = list(tokenize(extract_code(code)))
+    outline = {
+        'name': None,
+        'kind': None,
+        'description': None,
+        'classes': [],
+        'imports': [],
+        'parameters': [],
+        'experiment': {},
+        'end': None
+    }
+
+    depth = 0
+    statement = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        # 语句开头的类声明
+        if not statement and token.text in CLASS_START:
+            j = i
+            while j < len(tokens) and tokens[j].text in CLASS_PREFIXES:
+                j += 1
+            if j < len(tokens) and tokens[j].text in CLASS_KINDS:
+                while j + 1 < len(tokens) and tokens[j + 1].text in CLASS_KINDS:
+                    j += 1  # operator record、expandable connector 等组合
+                if j + 2 < len(tokens) and tokens[j + 1].kind == 'ident':
+                    depth += 1
+                    if depth == 1:
+                        outline['classes'].append({'kind': tokens[j].text, 'name': tokens[j + 1].text})
+                        if len(outline['classes']) == 1:
+                            outline['name'] = tokens[j + 1].text
+                            outline['kind'] = tokens[j].text
+                            if tokens[j + 2].kind == 'string':
+                                outline['description'] = _unquote(tokens[j + 2].text)
+                    i = j + 2
+                    if i < len(tokens) and tokens[i].kind == 'string':
+                        i += 1
+                    # 短类定义 type X = Real(...); 没有类体
+                    if i < len(tokens) and tokens[i].text == '=':
+                        depth -= 1
+                    continue
+
+        if token.text == ';':
+            if statement and statement[0].text == 'end':
+                if len(statement) < 2 or statement[1].text not in BLOCK_ENDS:
+                    depth -= 1
+                    if depth == 0 and len(outline['classes']) == 1 and outline['end'] is None:
+                        outline['end'] = token.start + 1
+            elif depth == 1 and len(outline['classes']) == 1:
+                first = statement[0].text if statement else ''
+                if first == 'import':
+                    outline['imports'].append(_join(statement[1:]))
+                elif first == 'annotation':
+                    outline['experiment'] = _parse_experiment(statement) or outline['experiment']
+                else:
+                    outline['parameters'].extend(_parse_parameters(statement))
+            statement = []
+        elif token.text in SECTION_KEYWORDS and not statement:
+            pass
+        else:
+            statement.append(token)
+        i += 1
+
+    return outline
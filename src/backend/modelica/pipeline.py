@@ -0,0 +1,146 @@
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.modelica.outline import parse_outline, extract_code
+from backend.modelica.process import RunControl
+from backend.modelica.progress import simulation_events
+from backend.modelica.session_pool import OMCSessionPool, PooledSession, SessionReservation
+
+
+def import_libraries(imports: List[str]) -> List[str]:
+    """import语句引用的顶层库，例如 "SI = Modelica.Units.SI" -> Modelica"""
+    return [item.split('=')[-1].strip().split('.')[0] for item in imports]
+
+
+class SimulationPipeline:
+    """边生成边仿真
+
+    代码生成的文本片段依次传入feed：识别出模型名称后立即在后台借出OMC会话，
+    出现import时在会话中加载引用的库；顶层模型的 end 名称; 到达时开始仿真，
+    不必等待模型回复结束。仿真事件在后台收集，由finish按发生顺序返回。
+    提前识别出的模型引用检查未通过时不提前仿真，由finish按检查（和修复）后的代码仿真。
+    """
+
+    def __init__(self, simulate: Callable[[str, str, RunControl, Optional[PooledSession]], Dict[str, Any]],
+                 locate_result: Callable[[str], Optional[str]],
+                 session_pool: Optional[OMCSessionPool] = None,
+                 timeout: Optional[float] = None,
+                 interval: float = 0.2,
+                 validate: Optional[Callable[[str], List[Dict[str, Any]]]] = None):
+        """初始化
+
+        Args:
+            simulate: 执行仿真的函数，参数为 (代码, 模型名称, 运行控制, 提前借出的会话或None)
+            locate_result: 根据结果ID返回已保存结果文件路径的函数
+            session_pool: 会话池，None时不提前借出会话
+            timeout: 仿真的墙钟时间限制（秒）
+            interval: 读取结果文件新数据的间隔（秒）
+            validate: 检查代码引用的函数，返回问题列表，None时不检查
+        """
+        self.simulate = simulate
+        self.locate_result = locate_result
+        self.session_pool = session_pool
+        self.timeout = timeout
+        self.interval = interval
+        self.validate = validate
+        self.reservation = None
+        self.started = False
+        self.deferred = False
+        self._text = ''
+        self._events = queue.Queue()
+        self._control = None
+        self._closed = False
+
+    def feed(self, model_name: str, token: str) -> None:
+        """传入识别出模型名称之后的一个文本片段（第一个片段包含之前缓存的全部文本）"""
+        self._text += token
+        if self.started or self.deferred:
+            return
+        if self.reservation is None and self.session_pool is not None:
+            self.reservation = SessionReservation(self.session_pool, self.timeout)
+        # import语句和类的结束都以分号结尾
+        if ';' not in token:
+            return
+
+        outline = parse_outline(self._text)
+        if self.reservation is not None:
+            self.reservation.preload(import_libraries(outline['imports']))
+        if outline['end'] is not None:
+            modelica_code = extract_code(self._text)[:outline['end']]
+            if self.validate is not None and self.validate(modelica_code):
+                # 代码生成结束后可能被修复，等待finish传入最终的代码
+                self.deferred = True
+                return
+            self._start(modelica_code, model_name)
+
+    def _start(self, modelica_code: str, model_name: str) -> None:
+        self.started = True
+
+        def run(control: RunControl) -> Dict[str, Any]:
+            self._control = control
+            if self._closed:
+                control.cancel()
+            session = None
+            if self.reservation is not None:
+                session = self.reservation.acquire(control.remaining())
+            failed = False
+            try:
+                return self.simulate(modelica_code, model_name, control, session)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                if self.reservation is not None:
+                    self.reservation.release(failed)
+
+        def pump():
+            events = simulation_events(run, self.locate_result, timeout=self.timeout, interval=self.interval)
+            try:
+                for event in events:
+                    if self._closed:
+                        break
+                    self._events.put(event)
+            finally:
+                # 关闭事件流时结束仍在运行的仿真
+                events.close()
+                self._events.put(None)
+
+        threading.Thread(target=pump, daemon=True).start()
+
+    def finish(self, modelica_code: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """代码生成结束后调用，按发生顺序返回已收集和之后产生的仿真事件
+
+        Args:
+            modelica_code: 生成结束后检查（和修复）过的完整代码，尚未开始仿真时按该代码仿真
+
+        Yields:
+            (事件名, 事件数据)，事件与simulation_events相同
+        """
+        if not self.started and modelica_code is not None:
+            outline = parse_outline(modelica_code)
+            if outline['name'] and outline['end'] is not None:
+                self._start(extract_code(modelica_code)[:outline['end']], outline['name'])
+        if not self.started:
+            yield 'error', {'status': '仿真失败', 'error': '生成的代码中没有完整的模型定义'}
+            return
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            yield event
+
+    def close(self) -> None:
+        """结束流水线：归还尚未使用的会话，结束仍在运行的仿真"""
+        self._closed = True
+        if self._control is not None:
+            self._control.cancel()
+        if not self.started and self.reservation is not None:
+            self.reservation.release()
@@ -0,0 +1,137 @@
+import os
+import time
+import threading
+import subprocess
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, List, Optional
+
+
+class SimulationTimeoutError(Exception):
+    """仿真超过墙钟时间限制"""
+
+
+class SimulationCancelledError(Exception):
+    """仿真被取消"""
+
+
+class RunControl:
+    """一次仿真的运行控制：墙钟时间限制、取消信号和进度回调"""
+
+    def __init__(self, timeout: Optional[float] = None,
+                 progress: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        """初始化运行控制
+
+        Args:
+            timeout: 墙钟时间限制（秒），None表示不限制
+            progress: 进度回调，参数为(阶段, 附加信息)
+        """
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.cancel_event = threading.Event()
+        self.progress = progress
+
+    def report(self, phase: str, **info) -> None:
+        """报告仿真进入新的阶段（load/translate/compile/simulate）"""
+        if self.progress is not None:
+            self.progress(phase, info)
+
+    def cancel(self) -> None:
+        """发出取消信号"""
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self) -> Optional[float]:
+        """剩余时间（秒），不限制时返回None"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self) -> None:
+        """已取消或超时时抛出异常"""
+        if self.cancelled:
+            raise SimulationCancelledError("仿真已取消")
+        if self.expired:
+            raise SimulationTimeoutError(f"仿真超时（{self.timeout}秒）")
+
+    @contextmanager
+    def guard(self, kill: Callable[[], None], poll_interval: float = 0.2):
+        """在代码块执行期间监视取消和超时，触发时调用kill结束子进程"""
+        self.check()
+        done = threading.Event()
+        fired = threading.Event()
+
+        def watch():
+            while not done.wait(poll_interval):
+                if self.cancelled or self.expired:
+                    fired.set()
+                    try:
+                        kill()
+                    except Exception:
+                        pass
+                    return
+
+        watcher = threading.Thread(target=watch, daemon=True)
+        watcher.start()
+        try:
+            yield
+        except Exception:
+            if fired.is_set():
+                self.check()
+            raise
+        finally:
+            done.set()
+            watcher.join()
+        if fired.is_set():
+            self.check()
+
+
+@contextmanager
+def report_on_file(control: Optional[RunControl], path: str, phase: str, poll_interval: float = 0.2):
+    """在代码块执行期间等待文件出现，出现时报告进入指定阶段
+
+    omc在一次调用中完成翻译和C代码编译，生成makefile即表示翻译结束、开始编译。
+    """
+    if control is None or control.progress is None:
+        yield
+        return
+
+    done = threading.Event()
+
+    def watch():
+        while not done.wait(poll_interval):
+            if os.path.exists(path):
+                control.report(phase)
+                return
+
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    try:
+        yield
+    finally:
+        done.set()
+        watcher.join()
+
+
+def run_process(args: List[str], cwd: str,
+                control: Optional[RunControl] = None) -> subprocess.CompletedProcess:
+    """运行子进程，超时或取消时结束子进程并抛出异常"""
+    process = subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        cwd=cwd
+    )
+    if control is None:
+        stdout, stderr = process.communicate()
+    else:
+        with control.guard(process.kill):
+            stdout, stderr = process.communicate()
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
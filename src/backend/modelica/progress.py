@@ -0,0 +1,112 @@
+import json
+import queue
+import threading
+from typing import Dict, Any, Callable, Iterator, Optional, Tuple
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.modelica.mat_reader import MatResultTail
+from backend.modelica.process import RunControl, SimulationTimeoutError, SimulationCancelledError
+from backend.modelica.wire import to_jsonable
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def simulation_events(simulate: Callable[[RunControl], Dict[str, Any]],
+                      locate_result: Callable[[str], Optional[str]],
+                      timeout: Optional[float] = None,
+                      interval: float = 0.2) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """在后台线程中运行仿真，按发生顺序产生进度事件
+
+    事件依次为：
+        phase  仿真阶段（load/translate/compile/simulate）
+        chunk  求解过程中结果文件新写入的时间点
+        result 仿真结果，数据已全部通过chunk发送时不再重复包含data
+        error  超时、取消或其他异常
+
+    Args:
+        simulate: 接收运行控制并执行仿真的函数
+        locate_result: 根据结果ID返回已保存结果文件路径的函数
+        timeout: 墙钟时间限制（秒）
+        interval: 读取结果文件新数据的间隔（秒）
+
+    Yields:
+        (事件名, 事件数据)
+    """
+    events = queue.Queue()
+    control = RunControl(timeout, progress=lambda phase, info: events.put(dict(info, phase=phase)))
+    outcome = {}
+
+    def worker():
+        try:
+            outcome['result'] = simulate(control)
+        except Exception as e:
+            outcome['error'] = e
+        finally:
+            events.put(None)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+
+    tail = None
+    try:
+        while True:
+            try:
+                event = events.get(timeout=interval)
+            except queue.Empty:
+                event = {}
+            if event is None:
+                break
+            if event:
+                result_file = event.pop('result_file', None)
+                if result_file:
+                    tail = MatResultTail(result_file)
+                yield 'phase', event
+            if tail is not None:
+                chunk = tail.poll()
+                if chunk:
+                    yield 'chunk', to_jsonable(chunk)
+
+        error = outcome.get('error')
+        if isinstance(error, SimulationTimeoutError):
+            yield 'error', {'status': '仿真超时', 'error': str(error)}
+            return
+        if isinstance(error, SimulationCancelledError):
+            yield 'error', {'status': '仿真已取消', 'error': str(error)}
+            return
+        if error is not None:
+            logger.error(f"仿真过程出错: {error}")
+            yield 'error', {'status': '仿真失败', 'error': str(error)}
+            return
+
+        result = outcome['result']
+        result_file = locate_result(result['result_id']) if result.get('result_id') else None
+        if tail is not None and result.get('data') and result_file:
+            # 运行目录已删除，从结果存储中的同一文件读取剩余的时间点
+            tail.path = result_file
+            chunk = tail.poll()
+            if chunk:
+                yield 'chunk', to_jsonable(chunk)
+            result = {key: value for key, value in result.items() if key != 'data'}
+            result['rows'] = tail.position
+        yield 'result', to_jsonable(result)
+    finally:
+        # 客户端断开时结束仍在运行的仿真
+        if thread.is_alive():
+            control.cancel()
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """格式化为Server-Sent Events消息"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def format_line(event: str, data: Dict[str, Any]) -> str:
+    """格式化为单行文本，用于在代码生成的文本流中附带仿真事件，如 simulation_phase:{...}"""
+    return f"simulation_{event}:{json.dumps(data, ensure_ascii=False)}\n"
@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+LOCK_FILE = 'store.lock'
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def _file_lock(path: str):
+    """跨进程的排他锁，不支持fcntl的平台上只依赖进程内的锁"""
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class ResultStore:
+    """仿真运行目录和结果文件的管理
+
+    每次运行分配唯一的运行ID和独立的工作目录，结果文件通过硬链接或重命名
+    放入results目录，每次运行的记录单独保存在meta/下，按保留时间和磁盘上限淘汰。
+    成功的结果可以记录复用键，相同的仿真请求直接返回已有的结果。
+
+    运行记录和复用键在内存中索引，更新时只写入对应运行的元数据文件；
+    其他进程写入的记录在淘汰时重新读取，淘汰通过文件锁在进程间互斥。
+    """
+
+    def __init__(self, root: str, max_age: float = 7 * 24 * 3600,
+                 max_bytes: int = 2 * 1024 * 1024 * 1024, evict_interval: float = 60.0):
+        """初始化结果存储
+
+        Args:
+            root: 存储根目录，运行目录位于runs/，结果文件位于results/，运行记录位于meta/
+            max_age: 运行的保留时间（秒）
+            max_bytes: 运行目录和结果文件的磁盘上限（字节）
+            evict_interval: 两次自动淘汰的最小间隔（秒）
+        """
+        self.root = root
+        self.runs_dir = os.path.join(root, 'runs')
+        self.results_dir = os.path.join(root, 'results')
+        self.meta_dir = os.path.join(root, 'meta')
+        self.lock_file = os.path.join(root, LOCK_FILE)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.evict_interval = evict_interval
+
+        self._lock = threading.Lock()
+        self._last_evict = 0.0
+        # 运行ID -> 运行记录；复用键 -> 最近一次的运行ID
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._keys: Dict[str, str] = {}
+        os.makedirs(self.runs_dir, exist_ok=True)
+        os.makedirs(self.results_dir, exist_ok=True)
+        os.makedirs(self.meta_dir, exist_ok=True)
+
+        with self._lock, _file_lock(self.lock_file):
+            self._reload()
+
+    def _meta_file(self, run_id: str) -> str:
+        return os.path.join(self.meta_dir, f"{run_id}.json")
+
+    def _write_meta(self, run_id: str, entry: Dict[str, Any]) -> None:
+        meta_file = self._meta_file(run_id)
+        temp_file = f"{meta_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temp_file, meta_file)
+
+    def _reload(self) -> None:
+        """从meta/重新读取全部运行记录，包括其他进程写入的记录"""
+        entries = {}
+        for name in os.listdir(self.meta_dir):
+            if not name.endswith('.json'):
+                continue
+            entry = _read_json(os.path.join(self.meta_dir, name))
+            if entry is not None:
+                entries[name[:-len('.json')]] = entry
+        self._entries = entries
+        self._keys = {}
+        for run_id, entry in sorted(entries.items(), key=lambda item: item[1].get('created', 0)):
+            if entry.get('result_key'):
+                self._keys[entry['result_key']] = run_id
+
+    def _entry(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """内存中的运行记录，没有时读取元数据文件（可能由其他进程创建，不缓存以免过期）"""
+        entry = self._entries.get(run_id)
+        if entry is None:
+            entry = _read_json(self._meta_file(run_id))
+        return entry
+
+    def _update(self, run_id: str, **fields) -> None:
+        with self._lock:
+            entry = self._entry(run_id) or {}
+            entry.update(fields)
+            self._entries[run_id] = entry
+            if fields.get('result_key'):
+                self._keys[fields['result_key']] = run_id
+            self._write_meta(run_id, entry)
+
+    def create_run(self, model_name: str) -> Tuple[str, str]:
+        """创建新的运行
+
+        Returns:
+            (运行ID, 运行目录)
+        """
+        self.maybe_evict()
+        run_id = f"{model_name}_{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        run_dir = os.path.join(self.runs_dir, run_id)
+        os.makedirs(run_dir)
+        self._update(run_id, model_name=model_name, created=time.time(), run_dir=run_dir)
+        return run_id, run_dir
+
+    def promote(self, run_id: str, source_file: str) -> str:
+        """将运行目录中的结果文件放入results目录，优先硬链接，否则重命名
+
+        Returns:
+            结果文件路径
+        """
+        extension = os.path.splitext(source_file)[1]
+        target = os.path.join(self.results_dir, f"{run_id}{extension}")
+        try:
+            os.link(source_file, target)
+        except OSError:
+            os.replace(source_file, target)
+        self._update(run_id, result_file=target, size=os.path.getsize(target))
+        return target
+
+    def tag(self, run_id: str, result_key: str) -> None:
+        """为已放入results目录的结果记录复用键，之后可通过find按该键查找"""
+        self._update(run_id, result_key=result_key)
+
+    def find(self, result_key: str) -> Optional[Tuple[str, str]]:
+        """按复用键查找最近一次的结果
+
+        Returns:
+            (运行ID, 结果文件路径)，没有记录或结果文件已淘汰时返回None
+        """
+        with self._lock:
+            run_id = self._keys.get(result_key)
+            entry = self._entries.get(run_id) if run_id else None
+            if entry and entry.get('result_file') and os.path.exists(entry['result_file']):
+                return run_id, entry['result_file']
+            self._keys.pop(result_key, None)
+            return None
+
+    def result_path(self, run_id: str) -> Optional[str]:
+        """获取运行的结果文件路径，不存在时返回None"""
+        with self._lock:
+            entry = self._entry(run_id)
+        if not entry or not entry.get('result_file'):
+            return None
+        return entry['result_file'] if os.path.exists(entry['result_file']) else None
+
+    def release(self, run_id: str) -> None:
+        """删除运行目录，只保留已放入results目录的结果文件"""
+        with self._lock:
+            entry = self._entry(run_id) or {}
+        run_dir = entry.get('run_dir', os.path.join(self.runs_dir, run_id))
+        shutil.rmtree(run_dir, ignore_errors=True)
+        self._update(run_id, run_dir=None)
+
+    def maybe_evict(self) -> None:
+        """距离上次淘汰超过间隔时执行淘汰"""
+        if time.time() - self._last_evict >= self.evict_interval:
+            self.evict()
+
+    def _remove(self, entry: Dict[str, Any]) -> None:
+        if entry.get('run_dir'):
+            shutil.rmtree(entry['run_dir'], ignore_errors=True)
+        if entry.get('result_file'):
+            try:
+                os.remove(entry['result_file'])
+            except OSError:
+                pass
+
+    def evict(self) -> int:
+        """淘汰过期的运行，并按创建时间从旧到新淘汰直到磁盘占用低于上限
+
+        Returns:
+            淘汰的运行数
+        """
+        with self._lock, _file_lock(self.lock_file):
+            self._last_evict = time.time()
+            self._reload()
+            now = time.time()
+            evicted = 0
+
+            # 清理没有运行记录的运行目录（例如进程异常退出时遗留的目录）
+            for name in os.listdir(self.runs_dir):
+                path = os.path.join(self.runs_dir, name)
+                if name not in self._entries and now - os.path.getmtime(path) > self.max_age:
+                    shutil.rmtree(path, ignore_errors=True)
+
+            sizes = {}
+            for run_id, entry in self._entries.items():
+                size = entry.get('size', 0)
+                if entry.get('run_dir') and os.path.exists(entry['run_dir']):
+                    size += _dir_size(entry['run_dir'])
+                sizes[run_id] = size
+
+            total = sum(sizes.values())
+            for run_id, entry in sorted(self._entries.items(), key=lambda item: item[1].get('created', 0)):
+                expired = now - entry.get('created', 0) > self.max_age
+                if not expired and total <= self.max_bytes:
+                    break
+                self._remove(entry)
+                try:
+                    os.remove(self._meta_file(run_id))
+                except OSError:
+                    pass
+                total -= sizes[run_id]
+                evicted += 1
+
+            if evicted:
+                self._reload()
+                logger.info(f"结果存储淘汰{evicted}个运行")
+            return evicted
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取存储统计信息"""
+        with self._lock:
+            return {
+                'runs': len(self._entries),
+                'result_bytes': sum(entry.get('size', 0) for entry in self._entries.values()),
+                'max_bytes': self.max_bytes,
+                'max_age': self.max_age
+            }
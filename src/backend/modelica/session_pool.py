@@ -0,0 +1,268 @@
+import re
+import threading
+import queue
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Any, Dict
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.utils.logger import setup_logger
+
+try:
+    from OMPython import OMCSessionZMQ
+except ImportError:  # OMPython未安装时退回到omc子进程方式
+    OMCSessionZMQ = None
+
+logger = setup_logger(__name__)
+
+
+class PooledSession:
+    """池化的OMC会话，封装一个常驻的omc进程"""
+
+    def __init__(self, preload_libraries: List[str]):
+        self.omc = OMCSessionZMQ()
+        self.uses = 0
+        self.created_at = time.time()
+        self.baseline_classes = set()
+        self._preload(preload_libraries)
+
+    def _preload(self, libraries: List[str]) -> None:
+        """预加载标准库，并记录加载后的顶层类作为基线"""
+        for library in libraries:
+            if not self.send(f"loadModel({library})"):
+                raise RuntimeError(f"预加载{library}失败: {self.send('getErrorString()')}")
+        self.send("getErrorString()")
+        self.baseline_classes = set(self._class_names())
+
+    def _class_names(self) -> List[str]:
+        names = self.send("getClassNames()") or ()
+        return [str(name) for name in names]
+
+    def send(self, expression: str) -> Any:
+        """发送表达式到omc并返回解析后的结果"""
+        return self.omc.sendExpression(expression)
+
+    def reset(self) -> None:
+        """删除本次使用中加载的用户模型，恢复到预加载后的状态"""
+        for name in self._class_names():
+            if name not in self.baseline_classes:
+                self.send(f"deleteClass({name})")
+        self.send("getErrorString()")
+
+    def kill(self) -> None:
+        """强制结束omc进程"""
+        process = getattr(self.omc, '_omc_process', None)
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def close(self) -> None:
+        """关闭会话"""
+        try:
+            self.send("quit()")
+        except Exception:
+            pass
+        self.kill()
+
+
+class OMCSessionPool:
+    """常驻OMC会话池
+
+    会话在首次需要时创建并预加载标准库，之后反复借出归还，
+    使用次数达到上限或出错时销毁重建，热请求无需再启动编译器和加载库。
+    """
+
+    def __init__(self, size: int = 2, max_uses: int = 50,
+                 preload_libraries: Optional[List[str]] = None,
+                 checkout_timeout: float = 120.0):
+        """初始化会话池
+
+        Args:
+            size: 最大会话数
+            max_uses: 单个会话的最大使用次数，超过后回收
+            preload_libraries: 每个会话预加载的库
+            checkout_timeout: 借出会话的最长等待时间（秒）
+        """
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.preload_libraries = preload_libraries or ['Modelica']
+        self.checkout_timeout = checkout_timeout
+
+        # 空闲会话按后进先出借出；会话归还或销毁时通知等待的线程
+        self._idle = []
+        self._condition = threading.Condition()
+        self._created = 0
+        self._recycled = 0
+        self._closed = False
+
+    @staticmethod
+    def is_supported() -> bool:
+        """OMPython是否可用"""
+        return OMCSessionZMQ is not None
+
+    def checkout(self, timeout: Optional[float] = None) -> PooledSession:
+        """借出一个会话，没有空闲会话且已达上限时阻塞等待，等待期间有会话被销毁时由本线程创建替代的会话"""
+        wait = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + wait
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("OMC会话池已关闭")
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    created = self._created
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"等待OMC会话超时（{wait}秒）")
+                self._condition.wait(remaining)
+
+        try:
+            session = PooledSession(self.preload_libraries)
+        except Exception:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+        logger.info(f"创建OMC会话，当前会话数: {created}")
+        return session
+
+    def checkin(self, session: PooledSession, failed: bool = False) -> None:
+        """归还会话，出错或使用次数达到上限时回收"""
+        session.uses += 1
+        if not failed and not self._closed and session.uses < self.max_uses:
+            try:
+                session.reset()
+                with self._condition:
+                    self._idle.append(session)
+                    self._condition.notify()
+                return
+            except Exception as e:
+                logger.warning(f"重置OMC会话失败，将回收该会话: {e}")
+
+        self._discard(session)
+
+    def _discard(self, session: PooledSession) -> None:
+        session.close()
+        with self._condition:
+            self._created -= 1
+            self._recycled += 1
+            self._condition.notify()
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None):
+        """以上下文管理器的方式借用会话"""
+        session = self.checkout(timeout)
+        failed = False
+        try:
+            yield session
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.checkin(session, failed=failed)
+
+    def close(self) -> None:
+        """关闭所有空闲会话"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for session in idle:
+            self._discard(session)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取会话池状态"""
+        with self._condition:
+            return {
+                'size': self.size,
+                'max_uses': self.max_uses,
+                'created': self._created,
+                'idle': len(self._idle),
+                'recycled': self._recycled,
+                'preload_libraries': self.preload_libraries
+            }
+
+
+class SessionReservation:
+    """提前借出的OMC会话
+
+    在后台线程中借出会话并按需加载额外的库，模型代码尚未生成完时就可以开始准备，
+    编译时通过acquire取得已准备好的会话，用完后release归还到会话池。
+    """
+
+    def __init__(self, pool: OMCSessionPool, timeout: Optional[float] = None):
+        """初始化并立即在后台借出会话
+
+        Args:
+            pool: 会话池
+            timeout: 借出会话的最长等待时间（秒），None时使用会话池的设置
+        """
+        self.pool = pool
+        self._session = None
+        self._failed = False
+        self._released = False
+        self._loaded = set(pool.preload_libraries)
+        # 任务依次为：库名（加载库）、Event（之前的任务完成后置位）、None（归还会话并结束）
+        self._tasks = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(timeout,), daemon=True)
+        self._thread.start()
+
+    def _run(self, timeout: Optional[float]) -> None:
+        try:
+            self._session = self.pool.checkout(timeout)
+        except Exception as e:
+            logger.warning(f"提前借出OMC会话失败: {e}")
+
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            if isinstance(task, threading.Event):
+                task.set()
+            elif self._session is not None:
+                self._load(task)
+
+        if self._session is not None:
+            self.pool.checkin(self._session, failed=self._failed)
+
+    def _load(self, library: str) -> None:
+        try:
+            if not self._session.send(f"loadModel({library})"):
+                logger.warning(f"加载{library}失败: {self._session.send('getErrorString()')}")
+        except Exception as e:
+            logger.warning(f"加载{library}失败: {e}")
+
+    def preload(self, libraries: List[str]) -> None:
+        """在会话中加载库，已加载或名称不合法的库跳过"""
+        for library in libraries:
+            if library not in self._loaded and re.fullmatch(r'[A-Za-z_]\w*', library) and not self._released:
+                self._loaded.add(library)
+                self._tasks.put(library)
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[PooledSession]:
+        """等待会话借出且之前请求的库加载完成
+
+        Returns:
+            会话，超时或借出失败时返回None
+        """
+        ready = threading.Event()
+        self._tasks.put(ready)
+        if not ready.wait(timeout):
+            return None
+        return self._session
+
+    def release(self, failed: bool = False) -> None:
+        """归还会话，出错时会话池回收该会话"""
+        if self._released:
+            return
+        self._released = True
+        self._failed = failed
+        self._tasks.put(None)
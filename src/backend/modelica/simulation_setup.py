@@ -0,0 +1,113 @@
+import re
+import math
+from typing import Dict, Any, Optional, List
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.config.settings import Settings
+
+# 变量名只允许标识符、成员访问、下标和der()等函数调用形式，防止注入仿真脚本
+VARIABLE_PATTERN = re.compile(r'^[A-Za-z_][\w.\[\](),]*$')
+
+# experiment注解中的键与仿真设置的对应关系
+EXPERIMENT_KEYS = {
+    'StartTime': 'startTime',
+    'StopTime': 'stopTime',
+    'Interval': 'interval',
+    'Tolerance': 'tolerance'
+}
+
+SOLVER_METHODS = {
+    'dassl', 'ida', 'cvode', 'euler', 'heun', 'rungekutta', 'impeuler',
+    'trapezoid', 'imprungekutta', 'gbode', 'irksco', 'symSolver', 'qss'
+}
+
+
+def variable_filter(variables: Optional[List[str]]) -> str:
+    """根据变量列表生成OpenModelica的variableFilter正则表达式"""
+    if variables is None:
+        return '.*'
+    # 字符串也可迭代，不检查时 "height" 会被当作逐个字符的变量列表
+    if not isinstance(variables, list):
+        raise ValueError(f"variables必须是变量名列表: {variables!r}")
+    if not variables:
+        return '.*'
+    for name in variables:
+        if not isinstance(name, str) or not VARIABLE_PATTERN.match(name):
+            raise ValueError(f"非法的变量名: {name!r}")
+    names = ['time'] + [name for name in variables if name != 'time']
+    return '|'.join(re.sub(r'([.\[\]()])', r'\\\1', name) for name in names)
+
+
+def _finite(key: str, value: Any) -> float:
+    """转换为有限的浮点数，nan和inf无法用于仿真设置"""
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{key}必须是有限的数值")
+    return number
+
+
+def experiment_options(experiment: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """把模型experiment注解中的数值设置转换为resolve_setup的参数，引用其他常量的表达式忽略"""
+    options = {}
+    for annotation_key, key in EXPERIMENT_KEYS.items():
+        value = (experiment or {}).get(annotation_key)
+        if isinstance(value, (int, float)):
+            options[key] = value
+    return options
+
+
+def resolve_setup(options: Optional[Dict[str, Any]] = None,
+                  experiment: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """合并请求中的仿真设置、模型experiment注解和默认设置，优先级依次降低
+
+    Args:
+        options: 请求参数，可包含startTime、stopTime、numberOfIntervals或interval、
+            tolerance、method以及需要输出的variables
+        experiment: 模型的experiment注解（见outline.parse_outline）
+
+    Returns:
+        完整的仿真设置，包括variableFilter
+    """
+    options = options or {}
+    defaults = experiment_options(experiment)
+    # 请求中指定了输出间隔数或步长时，注解中的两者都不再使用
+    if options.get('interval') is not None or options.get('numberOfIntervals') is not None:
+        defaults.pop('interval', None)
+    options = {**defaults, **{key: value for key, value in options.items() if value is not None}}
+    setup = dict(Settings.SIMULATION_SETTINGS)
+
+    try:
+        for key in ('startTime', 'stopTime', 'tolerance'):
+            if options.get(key) is not None:
+                setup[key] = _finite(key, options[key])
+        if setup['stopTime'] <= setup['startTime']:
+            raise ValueError("stopTime必须大于startTime")
+        if setup['tolerance'] <= 0:
+            raise ValueError("tolerance必须大于0")
+
+        if options.get('interval') is not None:
+            interval = _finite('interval', options['interval'])
+            if interval <= 0:
+                raise ValueError("interval必须大于0")
+            setup['numberOfIntervals'] = max(1, round((setup['stopTime'] - setup['startTime']) / interval))
+        elif options.get('numberOfIntervals') is not None:
+            setup['numberOfIntervals'] = int(options['numberOfIntervals'])
+    except (TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f"仿真设置无效: {e}")
+
+    if not 1 <= setup['numberOfIntervals'] <= Settings.SIMULATION_MAX_INTERVALS:
+        raise ValueError(f"numberOfIntervals必须在1到{Settings.SIMULATION_MAX_INTERVALS}之间")
+
+    if options.get('method') is not None:
+        if options['method'] not in SOLVER_METHODS:
+            raise ValueError(f"不支持的求解方法: {options['method']}")
+        setup['method'] = options['method']
+
+    setup['variableFilter'] = variable_filter(options.get('variables'))
+    return setup
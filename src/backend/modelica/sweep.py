@@ -0,0 +1,182 @@
+import os
+import re
+import itertools
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, Iterator
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.modelica.compile_cache import CompiledModel
+from backend.modelica.mat_reader import MatResultReader
+from backend.modelica.process import RunControl, SimulationTimeoutError, SimulationCancelledError
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PARAMETER_NAME_PATTERN = re.compile(r'^[A-Za-z_][\w.]*$')
+# 扫描目录中出现该文件时，工作进程结束正在运行的扫描点
+CANCEL_FILE = 'sweep.cancel'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _format_value(name: str, value: Any) -> str:
+    """校验并格式化参数值，只接受数值以免注入-override参数"""
+    if not PARAMETER_NAME_PATTERN.match(str(name)):
+        raise ValueError(f"非法的参数名: {name}")
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"参数{name}的取值必须是数值: {value!r}")
+    return repr(float(value))
+
+
+def expand_points(grid: Optional[Dict[str, List[Any]]] = None,
+                  points: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, str]]:
+    """展开参数扫描点
+
+    Args:
+        grid: 参数网格，格式为 {参数名: [取值, ...]}，按笛卡尔积展开
+        points: 参数组列表，格式为 [{参数名: 取值}, ...]
+
+    Returns:
+        参数组列表，取值已格式化为-override可用的字符串
+    """
+    if grid and points:
+        raise ValueError("grid和points只能提供一个")
+
+    if grid:
+        names = list(grid.keys())
+        values = []
+        for name in names:
+            if not isinstance(grid[name], list) or not grid[name]:
+                raise ValueError(f"参数{name}的取值必须是非空列表")
+            values.append(grid[name])
+        points = [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+    if not points:
+        raise ValueError("请提供grid或points")
+
+    return [
+        {name: _format_value(name, value) for name, value in point.items()}
+        for point in points
+    ]
+
+
+def _watch_cancel(control: RunControl, cancel_file: str, done: threading.Event,
+                  poll_interval: float = 0.2) -> None:
+    """取消文件出现时取消运行"""
+    while not control.cancelled:
+        if os.path.exists(cancel_file):
+            control.cancel()
+            return
+        if done.wait(poll_interval):
+            return
+
+
+def run_point(compiled: CompiledModel, output_dir: str, settings: Dict[str, Any],
+              index: int, overrides: Dict[str, str], timeout: Optional[float] = None,
+              cancel_file: Optional[str] = None) -> Dict[str, Any]:
+    """在工作进程中运行单个扫描点
+
+    Args:
+        timeout: 墙钟时间限制（秒），超时时结束进程，避免发散的扫描点一直占用工作进程
+        cancel_file: 取消文件路径，该文件出现时结束进程
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    control = RunControl(timeout)
+    done = threading.Event()
+    if cancel_file is not None:
+        if os.path.exists(cancel_file):
+            control.cancel()
+        threading.Thread(target=_watch_cancel, args=(control, cancel_file, done), daemon=True).start()
+    try:
+        result = compiled.run(output_dir, settings, overrides, control)
+    except SimulationTimeoutError as e:
+        return {'index': index, 'parameters': overrides, 'status': '仿真超时', 'error': str(e)}
+    except SimulationCancelledError as e:
+        return {'index': index, 'parameters': overrides, 'status': '仿真已取消', 'error': str(e)}
+    finally:
+        done.set()
+    result_file = os.path.join(output_dir, f"{compiled.model_name}_res.mat")
+
+    if result.returncode != 0 or not os.path.exists(result_file):
+        return {
+            'index': index,
+            'parameters': overrides,
+            'status': '仿真失败',
+            'error': result.stdout + result.stderr
+        }
+
+    reader = MatResultReader(result_file)
+    return {
+        'index': index,
+        'parameters': overrides,
+        'status': '仿真成功',
+        'data': {
+            'time': reader.time.copy(),
+            'values': {name: values.copy() for name, values in reader.read().items()}
+        }
+    }
+
+
+def get_executor(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """获取进程共享的扫描进程池"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count())
+        return _executor
+
+
+def _reset_executor() -> None:
+    global _executor
+    with _executor_lock:
+        _executor = None
+
+
+def run_sweep(compiled: CompiledModel, task_dir: str, settings: Dict[str, Any],
+              points: List[Dict[str, str]], base_overrides: Optional[Dict[str, str]] = None,
+              max_workers: Optional[int] = None, timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """在进程池中并行运行扫描点，按完成顺序返回结果
+
+    Args:
+        timeout: 单个扫描点的墙钟时间限制（秒）
+    """
+    executor = get_executor(max_workers)
+    cancel_file = os.path.join(task_dir, CANCEL_FILE)
+    futures = {}
+    try:
+        for index, point in enumerate(points):
+            overrides = dict(base_overrides or {})
+            overrides.update(point)
+            output_dir = os.path.join(task_dir, f"point_{index}")
+            future = executor.submit(run_point, compiled, output_dir, settings, index, overrides,
+                                     timeout, cancel_file)
+            futures[future] = (index, overrides)
+
+        for future in as_completed(futures):
+            index, overrides = futures[future]
+            try:
+                yield future.result()
+            except BrokenProcessPool as e:
+                _reset_executor()
+                logger.error(f"扫描进程池异常: {e}")
+                yield {'index': index, 'parameters': overrides, 'status': '仿真失败', 'error': str(e)}
+            except Exception as e:
+                logger.error(f"扫描点{index}运行失败: {e}")
+                yield {'index': index, 'parameters': overrides, 'status': '仿真失败', 'error': str(e)}
+    finally:
+        # 客户端断开时取消尚未开始的扫描点，结束正在运行的扫描点，
+        # 并等待它们退出后再由调用方删除扫描目录
+        running = [future for future in futures if not future.cancel() and not future.done()]
+        if running:
+            with open(cancel_file, 'w'):
+                pass
+            wait(running)
@@ -0,0 +1,244 @@
+import re
+from typing import Dict, List, Optional
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from backend.modelica.msl_index import MslIndex
+from backend.modelica.outline import tokenize, extract_code
+
+# 语句开头的类声明（redeclare修改项中的package等不是新的类）
+CLASS_HEADER_PATTERN = re.compile(
+    r'^\s*(?:(?:partial|encapsulated|expandable|operator|replaceable|final|inner|outer)\s+)*'
+    r'(model|block|class|connector|record|package|function|type)\s+(\w+)'
+)
+SECTION_PATTERN = re.compile(r'\b(?:initial\s+)?(equation|algorithm)\b|\b(public|protected)\b')
+IMPORT_PATTERN = re.compile(r'^import\s+(?:(\w+)\s*=\s*)?([\w.]+?)(\.\*|\.\{([\w\s,]*)\})?\s*$')
+DECLARATION_PATTERN = re.compile(r'^([A-Za-z_][\w.]*)\s*(?:\[[^\]]*\])?\s+([A-Za-z_]\w*)')
+CONNECT_PATTERN = re.compile(r'\bconnect\s*\(\s*([\w.\[\]\s,:]+?)\s*,\s*([\w.\[\]\s:]+?)\s*\)')
+MODIFIER_START_PATTERN = re.compile(r'\s*(?:\[[^\]]*\])?\s*\(')
+SUBSCRIPT_PATTERN = re.compile(r'\[[^\]]*\]')
+# 声明前可能出现的前缀
+PREFIX_PATTERN = re.compile(
+    r'^(?:(?:redeclare|final|inner|outer|replaceable|parameter|constant|discrete|'
+    r'input|output|flow|stream|each)\s+)+'
+)
+BUILTIN_TYPES = {
+    'Real', 'Integer', 'Boolean', 'String', 'StateSelect', 'AssertionLevel',
+    'ExternalObject', 'Clock', 'Connections'
+}
+
+
+def _blank(code: str) -> str:
+    """把注释和字符串内容替换为空格，保留换行和字符串两端的引号"""
+    pieces = []
+    position = 0
+    for token in tokenize(code, comments=True):
+        if token.kind in ('comment', 'string'):
+            blanked = re.sub(r'[^\n]', ' ', token.text)
+            if token.kind == 'string':
+                blanked = f'"{blanked[1:-1]}"'
+            pieces.append(code[position:token.start])
+            pieces.append(blanked)
+            position = token.start + len(token.text)
+    pieces.append(code[position:])
+    return ''.join(pieces)
+
+
+def _balanced(text: str, start: int) -> str:
+    """返回text[start]处左括号对应的括号内文本"""
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == '(':
+            depth += 1
+        elif text[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return text[start + 1:i]
+    return text[start + 1:]
+
+
+def _split_top_level(text: str) -> List[str]:
+    """按最外层的逗号分割修改项"""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+class ReferenceValidator:
+    """根据标准库索引检查代码中的import、组件类型、修改项和connect引用
+
+    只报告能够确定的错误：引用标准库中不存在的类、类中不存在的组件或参数，
+    以及既不是内置类型也不在本文件中定义、又无法通过import解析的类型。
+    """
+
+    def __init__(self, index: MslIndex):
+        self.index = index
+
+    def validate(self, code: str) -> List[Dict[str, object]]:
+        """检查代码
+
+        Returns:
+            问题列表，每项为 {'line': 行号, 'reference': 引用, 'message': 说明}，为空表示未发现问题
+        """
+        code = _blank(extract_code(code))
+        statements = code.split(';')
+        self._issues = []
+        self._imports = {}
+        self._wildcards = []
+        self._broken_imports = set()
+        # 本文件中定义的类可能在使用之后才声明，先收集
+        self._local_classes = {
+            header.group(2) for header in map(CLASS_HEADER_PATTERN.match, statements) if header
+        }
+        components = {}
+
+        in_equations = False
+        position = 0
+        for statement in statements:
+            offset = position
+            position += len(statement) + 1
+
+            # 类声明开始新的声明区，类名后的描述字符串一并跳过
+            header = CLASS_HEADER_PATTERN.match(statement)
+            if header is not None:
+                in_equations = False
+                description = re.match(r'\s*"[^"]*"', statement[header.end():])
+                skip = header.end() + (description.end() if description else 0)
+                offset += skip
+                statement = statement[skip:]
+
+            section = None
+            for section in SECTION_PATTERN.finditer(statement):
+                pass
+            if section is not None:
+                in_equations = section.group(1) is not None
+                offset += section.end()
+                statement = statement[section.end():]
+
+            text = statement.strip()
+            if not text or re.match(r'^end\b', text):
+                continue
+            line = code.count('\n', 0, offset + len(statement) - len(statement.lstrip())) + 1
+
+            if in_equations:
+                self._check_connect(text, components, line)
+            elif text.startswith('import'):
+                self._check_import(text, line)
+            elif text.startswith('extends'):
+                self._check_type(text[len('extends'):].strip().split('(')[0].strip(), line)
+            elif not text.startswith(('annotation', 'within')):
+                text = PREFIX_PATTERN.sub('', text)
+                declaration = DECLARATION_PATTERN.match(text)
+                if declaration is None:
+                    continue
+                type_name, component = declaration.groups()
+                resolved = self._check_type(type_name, line)
+                if resolved is None:
+                    continue
+                components[component] = resolved
+                modifiers = MODIFIER_START_PATTERN.match(text, declaration.end())
+                if modifiers is not None:
+                    self._check_modifiers(resolved, _balanced(text, modifiers.end() - 1), line)
+        return self._issues
+
+    def _report(self, line: int, reference: str, message: str) -> None:
+        self._issues.append({'line': line, 'reference': reference, 'message': message})
+
+    def _check_import(self, text: str, line: int) -> None:
+        match = IMPORT_PATTERN.match(' '.join(text.split()))
+        if match is None:
+            return
+        alias, path, suffix, names = match.groups()
+        if path.split('.')[0] not in self.index.roots:
+            return
+        if path not in self.index:
+            self._report(line, path, f"标准库中不存在{path}")
+            # 通过该import引用的类型不再重复报告
+            self._broken_imports.add(alias or path.rsplit('.', 1)[-1])
+            return
+        if suffix == '.*':
+            self._wildcards.append(path)
+        elif names is not None:
+            for name in (name.strip() for name in names.split(',')):
+                if name:
+                    self._check_imported_member(f"{path}.{name}", name, line)
+        else:
+            self._imports[alias or path.rsplit('.', 1)[-1]] = path
+
+    def _check_imported_member(self, path: str, name: str, line: int) -> None:
+        if path in self.index:
+            self._imports[name] = path
+        else:
+            self._report(line, path, f"标准库中不存在{path}")
+
+    def _check_type(self, type_name: str, line: int) -> Optional[str]:
+        """检查类型引用，返回标准库中的全限定名；本文件定义的类或无法确定时返回None"""
+        first, _, rest = type_name.partition('.')
+        if first in BUILTIN_TYPES or first in self._local_classes or first in self._broken_imports:
+            return None
+
+        if first in self._imports:
+            full_name = self._imports[first] + (f".{rest}" if rest else '')
+        elif first in self.index.roots:
+            full_name = type_name
+        else:
+            for package in self._wildcards:
+                if f"{package}.{first}" in self.index:
+                    full_name = f"{package}.{type_name}"
+                    break
+            else:
+                self._report(line, type_name, f"无法解析类型{type_name}：既不是内置类型，也没有在本文件中定义或通过import引入")
+                return None
+
+        if full_name not in self.index:
+            self._report(line, type_name, f"标准库中不存在{full_name}")
+            return None
+        if self.index.kind(full_name) in ('package', 'function'):
+            self._report(line, type_name, f"{full_name}是{self.index.kind(full_name)}，不能用于声明组件")
+            return None
+        return full_name
+
+    def _check_modifiers(self, type_name: str, modifiers: str, line: int) -> None:
+        members = self.index.components(type_name)
+        for modifier in _split_top_level(modifiers):
+            if re.match(r'^(?:(?:each|final)\s+)*(?:redeclare|replaceable)\b', modifier):
+                continue
+            modifier = PREFIX_PATTERN.sub('', modifier)
+            name = re.match(r'^(\w+)', modifier)
+            if name and name.group(1) not in members:
+                self._report(line, f"{type_name}.{name.group(1)}", f"{type_name}中没有参数或组件{name.group(1)}")
+
+    def _check_connect(self, text: str, components: Dict[str, str], line: int) -> None:
+        for match in CONNECT_PATTERN.finditer(text):
+            for reference in match.groups():
+                parts = SUBSCRIPT_PATTERN.sub('', reference).replace(' ', '').split('.')
+                if len(parts) < 2 or parts[0] not in components:
+                    continue
+                type_name = components[parts[0]]
+                if parts[1] not in self.index.components(type_name):
+                    self._report(line, reference.strip(), f"{type_name}中没有连接器{parts[1]}")
+
+
+def validate_references(code: str, index: MslIndex) -> List[Dict[str, object]]:
+    """根据标准库索引检查代码中的引用，返回问题列表"""
+    return ReferenceValidator(index).validate(code)
+
+
+def format_issues(issues: List[Dict[str, object]]) -> str:
+    """把问题列表格式化为文本，用于错误信息和修复提示"""
+    return '\n'.join(f"第{issue['line']}行: {issue['message']}" for issue in issues)
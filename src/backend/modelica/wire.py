@@ -0,0 +1,90 @@
+import json
+import struct
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+# 二进制结果格式：
+#   4字节魔数 b'SIMR' | uint32 小端头部长度 | UTF-8 JSON头部 | 填充到8字节对齐 | 数据区
+# 数据区按头部columns的顺序依次存放每个变量的小端浮点数组，
+# 每列的offset相对数据区起点且按8字节对齐，前端可以直接创建Float64Array/Float32Array视图
+BINARY_MIMETYPE = 'application/x-simtalk-result'
+MAGIC = b'SIMR'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+DTYPES = {
+    'float64': '<f8',
+    'float32': '<f4'
+}
+
+
+def _align(size: int) -> int:
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def negotiate_dtype(accept_header: Optional[str]) -> Optional[str]:
+    """根据Accept头判断客户端是否接受二进制格式
+
+    Returns:
+        接受二进制时返回数据类型（float64/float32），否则返回None
+    """
+    for item in (accept_header or '').split(','):
+        parts = [part.strip() for part in item.split(';')]
+        if parts[0] != BINARY_MIMETYPE:
+            continue
+        dtype = 'float64'
+        for param in parts[1:]:
+            key, _, value = param.partition('=')
+            if key.strip() == 'dtype' and value.strip() in DTYPES:
+                dtype = value.strip()
+        return dtype
+    return None
+
+
+def to_jsonable(result: Dict[str, Any]) -> Dict[str, Any]:
+    """将结果中的数组转换为列表，用于JSON响应"""
+    data = result.get('data')
+    if not data:
+        return result
+    converted = dict(result)
+    converted['data'] = {
+        'time': np.asarray(data['time']).tolist(),
+        'values': {name: np.asarray(values).tolist() for name, values in data['values'].items()}
+    }
+    return converted
+
+
+def encode_binary(result: Dict[str, Any], dtype: str = 'float64') -> bytes:
+    """将仿真结果编码为二进制格式"""
+    numpy_dtype = np.dtype(DTYPES[dtype])
+    data = result.get('data') or {'time': [], 'values': {}}
+
+    columns = [('time', data['time'])] + list(data['values'].items())
+    arrays = [np.ascontiguousarray(values, dtype=numpy_dtype) for _, values in columns]
+    length = len(arrays[0])
+
+    layout = []
+    offset = 0
+    for (name, _), array in zip(columns, arrays):
+        layout.append({'name': name, 'offset': offset})
+        offset = _align(offset + array.nbytes)
+
+    header = {
+        'version': FORMAT_VERSION,
+        'dtype': dtype,
+        'length': length,
+        'columns': layout,
+        'result': {key: value for key, value in result.items() if key != 'data'}
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    data_start = _align(len(MAGIC) + 4 + len(header_bytes))
+
+    buffer = bytearray(data_start + offset)
+    buffer[0:4] = MAGIC
+    struct.pack_into('<I', buffer, 4, len(header_bytes))
+    buffer[8:8 + len(header_bytes)] = header_bytes
+    for column, array in zip(layout, arrays):
+        start = data_start + column['offset']
+        buffer[start:start + array.nbytes] = array.tobytes()
+    return bytes(buffer)
@@ -1,9 +1,12 @@
 import os
 from typing import Optional, List
-from openai import AzureOpenAI
 from ..db.vector_store import ModelicaVectorStore
+from ..db.example_library import ExampleLibrary
+from ..db.lexical_index import reciprocal_rank_fusion
 from pathlib import Path
+import numpy as np
 from ..config.settings import Settings
+from ..providers.azure_openai import get_client
 import ipdb
 
 class ModelicaPrompts:
@@ -11,30 +14,30 @@ class ModelicaPrompts:
         """初始化ModelicaPrompts
         
         Args:
-            persist_directory: 向量数据库持久化目录
+            persist_directory: 向量数据库持久化目录，默认为Settings.VECTOR_STORE_DIR
         """
-        self.examples = self._get_example_models()
-        self.vector_store = ModelicaVectorStore(persist_directory)
-        # 初始化时加载示例到向量数据库
+        self.examples_dir = Path(Settings.EXAMPLES_DIR)
+        self.vector_store = ModelicaVectorStore(persist_directory or Settings.VECTOR_STORE_DIR)
+        # 初始化时把示例目录同步到向量数据库，之后由后台监听增量更新
         #ipdb.set_trace()
-        self.vector_store.add_examples(self.examples)
-        self.examples_dir = Path(__file__).parent.parent / 'modelica' / 'example'
+        self.library = ExampleLibrary(
+            self.examples_dir,
+            self.vector_store,
+            debounce=Settings.EXAMPLE_WATCH_DEBOUNCE
+        )
+        self.library.sync()
+        if Settings.EXAMPLE_WATCH_ENABLED:
+            self.library.start_watching()
         
         
-        # 初始化Azure OpenAI客户端
-        self.client = AzureOpenAI(
-            api_key=Settings.AZURE_OPENAI_API_KEY,
-            api_version="2023-05-15",
-            azure_endpoint=Settings.AZURE_OPENAI_ENDPOINT
-        )
+        # 使用进程共享的Azure OpenAI客户端
+        self.client = get_client()
 
 
     def read_mo_file(self, filepath: str) -> str:
         """读取 .mo 文件内容"""
-        # 获取当前文件的目录
-        current_dir = os.path.dirname(os.path.abspath(__file__))
         # 构建到 example 目录的路径
-        example_dir = os.path.join(os.path.dirname(current_dir), "modelica", "example")
+        example_dir = Settings.EXAMPLES_DIR
         # 构建完整的文件路径
         full_path = os.path.join(example_dir, filepath)
         
@@ -45,42 +48,43 @@ class ModelicaPrompts:
 
     def _get_example_models(self) -> dict:
         """获取示例模型字典"""
-        return {
-            "空白模板": {
-                "keywords": ["空白", "模板", "基础"],
-                "description": "基础的空白Modelica模型模板",
-                "code": ('""""""', '""""""'),  # 返回空元组供GPT生成
-                "model_name": "EmptyModel"
-            },
-            "染缸温控": {
-                "keywords": ["染缸", "温度控制", "PID", "热传导", "对流"],
-                "description": "染缸温度PID控制系统，包含热传导和对流",
-                "code": self.read_mo_file("DyeVatSimulation.mo"),
-                "model_name": "DyeingVat"
-            },
-            "小球掉落": {
-                "keywords": ["小球", "掉落", "重力", "自由落体", "运动"],
-                "description": "小球自由落体运动仿真",
-                "code": self.read_mo_file("FallingMarble.mo"),
-                "model_name": "FallingMarble"
-            }
-        }
+        return self.library.examples
 
     def get_examples(self):
         """获取缓存的示例代码"""
-        return self.examples
+        return self.library.examples
       
     def find_matching_example(self, prompt: str) -> str:
-        """查找最匹配的示例代码"""
+        """查找最匹配的示例代码
+
+        先用本地BM25检索，最高分足够高且明显领先第二名时直接采用，不调用embedding接口；
+        否则再做向量检索，两路结果按倒数排名融合。
+        """
+        examples = self.library.examples
+        lexical = self.library.lexical_search(prompt)
+        if lexical and lexical[0][1] >= Settings.EXAMPLE_LEXICAL_MIN_SCORE and (
+                len(lexical) == 1 or lexical[0][1] >= Settings.EXAMPLE_LEXICAL_MARGIN * lexical[1][1]):
+            return examples[lexical[0][0]]["code"]
+
         try:
             matches = self.vector_store.search(
                 query=prompt,
+                n_results=5,
                 similarity_threshold=0.5
             )
-            return matches[0]["code"] if matches else self._fallback_matching(prompt)
         except Exception as e:
             print(f"示例匹配失败: {str(e)}")
-            return self._fallback_matching(prompt)
+            matches = []
+
+        # 只有个别常见词命中的本地结果不参与融合，避免把不相关的示例当作匹配
+        ranked = reciprocal_rank_fusion([
+            [example_id for example_id, score in lexical if score >= Settings.EXAMPLE_LEXICAL_MIN_SCORE / 2],
+            [match["id"] for match in matches]
+        ])
+        for example_id in ranked:
+            if example_id in examples:
+                return examples[example_id]["code"]
+        return ''
 
     # def _get_embedding(self, text: str) -> Optional[List[float]]:
     #     """获取文本的embedding向量"""
@@ -96,30 +100,14 @@ class ModelicaPrompts:
 
     def _cosine_similarity(self, vec1: list, vec2: list) -> float:
         """计算余弦相似度"""
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        norm1 = sum(a * a for a in vec1) ** 0.5
-        norm2 = sum(b * b for b in vec2) ** 0.5
-        return dot_product / (norm1 * norm2)
+        vec1 = np.asarray(vec1, dtype=np.float32)
+        vec2 = np.asarray(vec2, dtype=np.float32)
+        return float(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)))
 
     def _fallback_matching(self, prompt: str) -> str:
-        """简单的关键词匹配作为备用方案"""
-        keywords = {
-            'falling': 'FallingMarble.mo',
-            'marble': 'FallingMarble.mo',
-            'dye': 'DyeVatSimulation.mo',
-            'vat': 'DyeVatSimulation.mo',
-            'boiler': 'BoilerCombustion.mo',
-            'combustion': 'BoilerCombustion.mo'
-        }
-        
-        prompt = prompt.lower()
-        for key, filename in keywords.items():
-            if key in prompt:
-                file_path = self.examples_dir / filename
-                if file_path.exists():
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        return f.read()
-        return ''
+        """本地BM25检索作为备用方案"""
+        lexical = self.library.lexical_search(prompt, n_results=1)
+        return self.library.examples[lexical[0][0]]["code"] if lexical else ''
 
     # def calculate_similarity(self, text1: str, text2: str) -> float:
     #     """计算两段文本的相似度
@@ -1,6 +1,90 @@
-from typing import List, Optional, Dict, Any
-from openai import AzureOpenAI
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+import backoff
+import httpx
+from openai import AzureOpenAI, BadRequestError
 from ..config.settings import Settings
+from .rate_limiter import RateLimiter, estimate_tokens, estimate_request_tokens
+from .single_flight import SingleFlight
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_client = None
+_client_lock = threading.Lock()
+
+# 对话补全和embedding使用不同的部署，各自有独立的配额
+chat_limiter = RateLimiter(
+    Settings.AZURE_OPENAI_RPM,
+    Settings.AZURE_OPENAI_TPM,
+    max_wait=Settings.AZURE_OPENAI_MAX_WAIT
+)
+embedding_limiter = RateLimiter(
+    Settings.AZURE_OPENAI_EMBEDDING_RPM,
+    Settings.AZURE_OPENAI_EMBEDDING_TPM,
+    max_wait=Settings.AZURE_OPENAI_MAX_WAIT
+)
+
+# 相同请求同时到达时只调用一次上游
+completion_flights = SingleFlight()
+embedding_flights = SingleFlight()
+
+# embedding请求遇到限流、超时等错误时指数退避重试；请求本身有误（如文本过长）时重试没有意义
+_retry_embedding = backoff.on_exception(
+    backoff.expo,
+    Exception,
+    max_tries=3,
+    max_time=60,
+    giveup=lambda e: isinstance(e, BadRequestError)
+)
+
+
+def _completion_key(messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+    """对话请求的合并键，消息内容只做空白规范化"""
+    payload = json.dumps({
+        'messages': [
+            {'role': message['role'], 'content': ' '.join(message['content'].split())}
+            for message in messages
+        ],
+        'temperature': temperature,
+        'max_tokens': max_tokens
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_client() -> AzureOpenAI:
+    """获取进程共享的Azure OpenAI客户端
+
+    所有调用共用一个HTTP连接池并保持长连接，避免每个组件各自建立连接。
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            timeout = httpx.Timeout(
+                Settings.AZURE_OPENAI_TIMEOUT,
+                connect=Settings.AZURE_OPENAI_CONNECT_TIMEOUT
+            )
+            _client = AzureOpenAI(
+                api_key=Settings.AZURE_OPENAI_API_KEY,
+                api_version=Settings.AZURE_OPENAI_API_VERSION,
+                azure_endpoint=Settings.AZURE_OPENAI_ENDPOINT,
+                timeout=timeout,
+                # 限流器已按配额排队，SDK只需对偶发错误做少量重试
+                max_retries=Settings.AZURE_OPENAI_MAX_RETRIES,
+                http_client=httpx.Client(
+                    timeout=timeout,
+                    limits=httpx.Limits(
+                        max_connections=Settings.AZURE_OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=Settings.AZURE_OPENAI_MAX_CONNECTIONS,
+                        keepalive_expiry=Settings.AZURE_OPENAI_KEEPALIVE
+                    )
+                )
+            )
+        return _client
+
 
 class AzureOpenAIProvider:
     """Azure OpenAI服务提供者"""
@@ -9,61 +93,160 @@ class AzureOpenAIProvider:
         """初始化Azure OpenAI客户端"""
         Settings.validate_settings()  # 验证配置
         
-        # self.client = AzureOpenAI(
-        #     api_key=Settings.AZURE_OPENAI_API_KEY,
-        #     api_version=Settings.AZURE_OPENAI_API_VERSION,
-        #     azure_endpoint=Settings.AZURE_OPENAI_ENDPOINT,
-        #     timeout=30.0,
-        #     max_retries=3
-        # )
-
-    
-        self.client = AzureOpenAI(
-            api_key=Settings.AZURE_OPENAI_API_KEY,
-            api_version="2023-05-15",
-            azure_endpoint=Settings.AZURE_OPENAI_ENDPOINT
-        )
+        self.client = get_client()
         self.deployment_name = Settings.AZURE_OPENAI_DEPLOYMENT_NAME
 
 
-    def _call_azure_openai(self, prompt: str) -> Any:
-        """调用Azure OpenAI API"""
-        return self.client.chat.completions.create(
+    def _call_azure_openai(self,
+                           messages: List[Dict[str, str]],
+                           temperature: float = 0.7,
+                           max_tokens: int = 800,
+                           stream: bool = False) -> Any:
+        """调用Azure OpenAI API，按估算的token数从限流器取得配额后再发送请求"""
+        reserved = estimate_request_tokens(messages, max_tokens)
+        chat_limiter.acquire(reserved)
+        response = self.client.chat.completions.create(
             model=self.deployment_name,
-            messages=[
-                {"role": "system", "content": self._get_system_prompt()},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=800
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=stream
         )
+        if not stream and response.usage is not None:
+            chat_limiter.settle(reserved, response.usage.total_tokens)
+        return response
         
     def get_embedding(self, text: str) -> Optional[List[float]]:
         """获取文本的embedding向量"""
         try:
             if not text or not text.strip():
                 return None
-                
-            response = self.client.embeddings.create(
-                input=text,
-                model=Settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT
-            )
-            return response.data[0].embedding if response.data else None
+
+            # 合并键与实际请求使用相同的文本，首尾空白不同的请求得到同一个向量
+            text = text.strip()
+            return embedding_flights.do(text, lambda: self._embed(text))
         except Exception as e:
             print(f"获取embedding失败: {str(e)}")
             return None
 
+    @_retry_embedding
+    def _embed(self, text: str) -> Optional[List[float]]:
+        embedding_limiter.acquire(estimate_tokens(text))
+        response = self.client.embeddings.create(
+            input=text,
+            model=Settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+        )
+        return response.data[0].embedding if response.data else None
+
+    def get_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """批量获取embedding向量
+
+        按部署的单次输入条数和token数上限分块，多个分块并发请求。请求本身有误（如文本过长）的分块
+        拆分为两半分别重试以隔离无法处理的文本；限流、超时等其他错误在重试后整个分块返回None。
+
+        Returns:
+            与texts一一对应的向量列表
+        """
+        results = [None] * len(texts)
+        items = [(index, text.strip()) for index, text in enumerate(texts) if text and text.strip()]
+        chunks = self._embedding_chunks(items)
+        if not chunks:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(Settings.AZURE_OPENAI_EMBEDDING_CONCURRENCY, len(chunks))) as executor:
+            for chunk_result in executor.map(self._embed_chunk, chunks):
+                for index, embedding in chunk_result:
+                    results[index] = embedding
+        return results
+
+    def _embedding_chunks(self, items: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+        """按输入条数和估算的token数将文本分块"""
+        chunks = []
+        current = []
+        tokens = 0
+        for index, text in items:
+            count = estimate_tokens(text)
+            if current and (len(current) >= Settings.AZURE_OPENAI_EMBEDDING_BATCH_SIZE
+                            or tokens + count > Settings.AZURE_OPENAI_EMBEDDING_BATCH_TOKENS):
+                chunks.append(current)
+                current = []
+                tokens = 0
+            current.append((index, text))
+            tokens += count
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _embed_chunk(self, chunk: List[Tuple[int, str]]) -> List[Tuple[int, Optional[List[float]]]]:
+        """获取一个分块的向量，请求被拒绝时拆分重试以隔离无法处理的文本"""
+        try:
+            embeddings = self._embed_batch([text for _, text in chunk])
+            return [(index, embedding) for (index, _), embedding in zip(chunk, embeddings)]
+        except BadRequestError as e:
+            if len(chunk) == 1:
+                logger.error(f"获取embedding失败: {e}")
+                return [(chunk[0][0], None)]
+            middle = len(chunk) // 2
+            return self._embed_chunk(chunk[:middle]) + self._embed_chunk(chunk[middle:])
+        except Exception as e:
+            # 限流、超时或服务不可用时拆分只会增加请求数，_embed_batch已经重试过
+            logger.error(f"获取{len(chunk)}条文本的embedding失败: {e}")
+            return [(index, None) for index, _ in chunk]
+
+    # 请求本身有误时不重试，由_embed_chunk拆分分块
+    @_retry_embedding
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        embedding_limiter.acquire(sum(estimate_tokens(text) for text in texts))
+        response = self.client.embeddings.create(
+            input=texts,
+            model=Settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+        )
+        data = sorted(response.data, key=lambda item: item.index)
+        if len(data) != len(texts):
+            raise ValueError(f"embedding返回{len(data)}条，输入{len(texts)}条")
+        return [item.embedding for item in data]
+
+    def _complete(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> Optional[str]:
+        response = self._call_azure_openai(messages, temperature, max_tokens)
+        return response.choices[0].message.content if response.choices else None
+
     def generate_completion(self, 
                           messages: List[Dict[str, str]], 
                           temperature: float = 0.7,
                           max_tokens: int = 800) -> Optional[str]:
-        """生成文本补全"""
+        """生成文本补全，与正在进行的相同请求共享同一次调用"""
         try:
-            response = self._call_azure_openai(messages)
-            return response.choices[0].message.content if response.choices else None
+            return completion_flights.do(
+                _completion_key(messages, temperature, max_tokens),
+                lambda: self._complete(messages, temperature, max_tokens)
+            )
         except Exception as e:
             print(f"生成补全失败: {str(e)}")
             return None
 
+    def stream_completion(self,
+                          messages: List[Dict[str, str]],
+                          temperature: float = 0.7,
+                          max_tokens: int = 800) -> Iterator[str]:
+        """流式生成文本补全，按到达顺序逐个返回文本片段
+
+        与generate_completion不同，请求失败时直接抛出异常，由调用方决定如何提示。
+        相同请求正在进行时，从头重放已收到的片段并继续跟随同一次调用。
+        """
+        return completion_flights.stream(
+            _completion_key(messages, temperature, max_tokens),
+            lambda: self._stream(messages, temperature, max_tokens)
+        )
+
+    def _stream(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> Iterator[str]:
+        response = self._call_azure_openai(messages, temperature, max_tokens, stream=True)
+        for chunk in response:
+            # Azure会先发送只包含内容过滤结果、没有choices的数据块
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                yield content
+
 # 创建全局实例
 azure_openai = AzureOpenAIProvider() 
\ No newline at end of file
@@ -0,0 +1,125 @@
+import re
+import time
+import threading
+from typing import Dict, Any, List, Optional
+
+# 中日韩字符大致每个字符一个token，其余文本大致每4个字符一个token
+CJK_PATTERN = re.compile(r'[\u3000-\u9fff\uac00-\ud7af\uff00-\uffef]')
+
+
+class RateLimitTimeout(Exception):
+    """在最长等待时间内没有获得足够的配额"""
+
+
+def estimate_tokens(text: str) -> int:
+    """估算文本的token数"""
+    if not text:
+        return 0
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def estimate_request_tokens(messages: List[Dict[str, str]], max_tokens: int = 0) -> int:
+    """估算一次请求占用的token数：提示词 + 每条消息的固定开销 + 最大生成长度"""
+    return sum(estimate_tokens(message.get('content', '')) + 4 for message in messages) + max_tokens
+
+
+class TokenBucket:
+    """令牌桶：容量为每分钟配额，按配额匀速补充"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """距离桶中令牌足够还需等待的时间（秒），调用前需先refill"""
+        # 单次请求超过容量时只要求桶满，避免永远无法满足
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """按部署的每分钟请求数（RPM）和每分钟token数（TPM）限流
+
+    请求前按估算的token数从两个令牌桶中取出配额，配额不足时排队等待，
+    超过最长等待时间才抛出RateLimitTimeout，避免突发请求直接触发429。
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, max_wait: float = 30.0):
+        """初始化限流器
+
+        Args:
+            requests_per_minute: 每分钟请求数配额，0表示不限制
+            tokens_per_minute: 每分钟token数配额，0表示不限制
+            max_wait: 单次请求的最长排队时间（秒）
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._waited = 0.0
+        self._throttled = 0
+
+    def acquire(self, tokens: int, timeout: Optional[float] = None) -> float:
+        """取出一次请求的配额，配额不足时等待
+
+        Args:
+            tokens: 估算的token数
+            timeout: 最长等待时间（秒），None时使用max_wait
+
+        Returns:
+            实际等待的时间（秒）
+        """
+        timeout = self.max_wait if timeout is None else timeout
+        start = time.monotonic()
+        throttled = False
+        while True:
+            with self._lock:
+                wait = 0.0
+                for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+                    if bucket is not None:
+                        bucket.refill()
+                        wait = max(wait, bucket.wait_time(amount))
+                if wait == 0.0:
+                    if self.requests is not None:
+                        self.requests.tokens -= 1
+                    if self.tokens is not None:
+                        # 允许单次请求透支，后续请求等待补足
+                        self.tokens.tokens -= tokens
+                    waited = time.monotonic() - start
+                    self._waited += waited
+                    self._throttled += 1 if throttled else 0
+                    return waited
+
+            if time.monotonic() - start + wait > timeout:
+                raise RateLimitTimeout(f"等待Azure OpenAI配额超过{timeout}秒")
+            throttled = True
+            time.sleep(wait)
+
+    def settle(self, reserved: int, actual: Optional[int]) -> None:
+        """请求完成后按实际用量退还多预留的token"""
+        if self.tokens is None or actual is None or actual >= reserved:
+            return
+        with self._lock:
+            self.tokens.refill()
+            self.tokens.tokens = min(self.tokens.capacity, self.tokens.tokens + reserved - actual)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取限流统计信息"""
+        with self._lock:
+            return {
+                'requests_per_minute': self.requests.capacity if self.requests else None,
+                'tokens_per_minute': self.tokens.capacity if self.tokens else None,
+                'throttled_requests': self._throttled,
+                'total_wait_seconds': round(self._waited, 3)
+            }
@@ -0,0 +1,120 @@
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+
+class _Call:
+    """一次正在进行的上游调用"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Stream:
+    """一次正在进行的流式上游调用，已收到的片段供所有调用方重放"""
+
+    def __init__(self):
+        self.items = []
+        self.finished = False
+        self.error = None
+        self.condition = threading.Condition()
+
+
+class SingleFlight:
+    """合并相同键的并发调用
+
+    同一时刻相同键只发起一次上游调用，其余调用方等待并共享同一结果（或异常）。
+    调用结束后立即移除，不缓存结果。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._streams = {}
+        self._calls_made = 0
+        self._calls_shared = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """执行调用，相同键的调用正在进行时等待其结果"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._calls_made += 1
+            else:
+                self._calls_shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stream(self, key: str, fn: Callable[[], Iterable[Any]]) -> Iterator[Any]:
+        """执行流式调用，相同键的调用正在进行时从头重放已收到的片段并继续跟随
+
+        上游在后台线程中读取，个别调用方提前断开不影响其他调用方。
+        """
+        with self._lock:
+            stream = self._streams.get(key)
+            leader = stream is None
+            if leader:
+                stream = self._streams[key] = _Stream()
+                self._calls_made += 1
+            else:
+                self._calls_shared += 1
+
+        if leader:
+            threading.Thread(target=self._produce, args=(key, stream, fn), daemon=True).start()
+
+        position = 0
+        while True:
+            with stream.condition:
+                while position >= len(stream.items) and not stream.finished:
+                    stream.condition.wait()
+                items = stream.items[position:]
+                finished = stream.finished
+            for item in items:
+                yield item
+            position += len(items)
+            if finished and position >= len(stream.items):
+                if stream.error is not None:
+                    raise stream.error
+                return
+
+    def _produce(self, key: str, stream: _Stream, fn: Callable[[], Iterable[Any]]) -> None:
+        try:
+            for item in fn():
+                with stream.condition:
+                    stream.items.append(item)
+                    stream.condition.notify_all()
+        except Exception as e:
+            stream.error = e
+        finally:
+            with self._lock:
+                del self._streams[key]
+            with stream.condition:
+                stream.finished = True
+                stream.condition.notify_all()
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取合并统计信息"""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls) + len(self._streams),
+                'upstream_calls': self._calls_made,
+                'coalesced_calls': self._calls_shared
+            }
@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.config.settings import Settings
+
+# 模块导入时创建共享的客户端，未配置时使用占位值（测试不会发出请求）
+for key in ('AZURE_OPENAI_API_KEY', 'AZURE_OPENAI_DEPLOYMENT_NAME', 'AZURE_OPENAI_EMBEDDING_DEPLOYMENT'):
+    if not getattr(Settings, key):
+        setattr(Settings, key, 'test')
+if not Settings.AZURE_OPENAI_ENDPOINT:
+    Settings.AZURE_OPENAI_ENDPOINT = 'https://example.invalid'
+
+from backend.providers.azure_openai import AzureOpenAIProvider
+
+
+class FakeEmbeddings:
+    """记录请求的输入，前failures次请求失败"""
+
+    def __init__(self, failures: int = 0):
+        self.inputs = []
+        self.failures = failures
+
+    def create(self, input, model):
+        self.inputs.append(input)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('temporarily unavailable')
+        texts = input if isinstance(input, list) else [input]
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in enumerate(texts)
+        ])
+
+
+def _provider(embeddings: FakeEmbeddings) -> AzureOpenAIProvider:
+    provider = AzureOpenAIProvider.__new__(AzureOpenAIProvider)
+    provider.client = SimpleNamespace(embeddings=embeddings)
+    return provider
+
+
+def test_embedding_uses_stripped_text():
+    embeddings = FakeEmbeddings()
+    provider = _provider(embeddings)
+    assert provider.get_embedding('  falling ball \n') == [12.0]
+    assert provider.get_embeddings(['falling ball', ' falling ball ', '  ']) == [[12.0], [12.0], None]
+    assert embeddings.inputs == ['falling ball', ['falling ball', 'falling ball']]
+    assert provider.get_embedding(' ') is None
+
+
+def test_single_embedding_retries_transient_errors():
+    embeddings = FakeEmbeddings(failures=1)
+    assert _provider(embeddings).get_embedding('ball') == [4.0]
+    assert len(embeddings.inputs) == 2
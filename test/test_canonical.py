@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.modelica.canonical import PLACEHOLDER, canonicalize, split_parameters, structural_hash
+
+MODEL = '''model M
+  parameter Real a = 1.5;
+  parameter Real b = -2 "desc";
+  final parameter Real c = 3;
+  parameter Real d = 4 annotation(Evaluate=true);
+  parameter Integer n = 5;
+  parameter SI.Mass m = 1e3;
+  parameter Real e = a * 2;
+  model Inner
+    parameter Real k = 7;
+  end Inner;
+  Real x(start = 1);
+equation
+  der(x) = -a * x;
+  annotation(experiment(StopTime=10, Interval=0.1));
+end M;'''
+
+
+def test_split_parameters_masks_only_overridable_literals():
+    text, parameters = split_parameters(MODEL)
+    # final、Evaluate=true、非Real类型、表达式绑定和嵌套类中的参数保持原样
+    assert parameters == {'a': '1.5', 'b': '-2.0', 'm': '1000.0'}
+    assert f'a = {PLACEHOLDER} ;' in text
+    assert f'b = {PLACEHOLDER} "desc" ;' in text
+    assert f'm = {PLACEHOLDER} ;' in text
+    for kept in ('c = 3 ;', 'd = 4 annotation', 'n = 5 ;', 'e = a * 2 ;', 'k = 7 ;'):
+        assert kept in text
+
+
+def test_canonicalize_ignores_comments_whitespace_and_modifier_order():
+    first = 'model A Real x; annotation(experiment(StopTime=10, Interval=0.1)); end A;'
+    second = 'model A  // comment\n  Real x;\n  annotation(experiment(Interval=1e-1, StopTime=10));\nend A;'
+    assert canonicalize(first) == canonicalize(second)
+    assert structural_hash(first) == structural_hash(second)
+
+
+def test_canonicalize_keeps_array_order():
+    assert canonicalize('model A Real x[2] = {1, 2}; end A;') != canonicalize('model A Real x[2] = {2, 1}; end A;')
+
+
+def test_structural_hash_markdown_fence():
+    assert structural_hash('```modelica\n' + MODEL + '\n```') == structural_hash(MODEL)
+
+
+def test_structural_hash_parameters():
+    changed = MODEL.replace('a = 1.5', 'a = 2.5')
+    assert structural_hash(changed) != structural_hash(MODEL)
+    assert structural_hash(changed, include_parameters=False) == structural_hash(MODEL, include_parameters=False)
+
+    # 不可覆盖的参数值改变时结构不同
+    final_changed = MODEL.replace('c = 3', 'c = 4')
+    assert structural_hash(final_changed, include_parameters=False) != structural_hash(MODEL, include_parameters=False)
@@ -0,0 +1,88 @@
+import os
+import sys
+from pathlib import Path
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.modelica.compile_cache import CompiledModelCache, executable_name
+
+CODE = '''model Ball
+  parameter Real g = 9.81;
+  parameter Real h0 = 10;
+  Real h(start = h0);
+equation
+  der(h) = -g;
+end Ball;'''
+
+
+def _build(directory, size: int = 1000) -> str:
+    """模拟omc构建出的可执行文件"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, executable_name('Ball')), 'wb') as f:
+        f.write(b'x' * size)
+    return str(directory)
+
+
+def test_store_and_lookup(tmp_path):
+    cache = CompiledModelCache(str(tmp_path / 'cache'))
+    assert cache.lookup('Ball', CODE) is None
+    stored = cache.store('Ball', CODE, _build(tmp_path / 'build'))
+    assert os.path.exists(stored.executable)
+
+    compiled, overrides = cache.lookup('Ball', CODE)
+    assert compiled.executable == stored.executable
+    assert overrides == {}
+
+    # 只有参数值不同时复用可执行文件，通过覆盖项传入新的值
+    compiled, overrides = cache.lookup('Ball', CODE.replace('9.81', '1.625'))
+    assert overrides == {'g': '1.625'}
+
+    # 结构不同或模型名不同时不命中
+    assert cache.lookup('Ball', CODE.replace('der(h) = -g', 'der(h) = -2 * g')) is None
+    assert cache.lookup('Other', CODE) is None
+
+    stats = cache.get_stats()
+    assert stats['entries'] == 1
+    assert stats['hits'] == 2 and stats['misses'] == 3
+
+
+def test_store_without_executable(tmp_path):
+    cache = CompiledModelCache(str(tmp_path / 'cache'))
+    os.makedirs(tmp_path / 'empty')
+    assert cache.store('Ball', CODE, str(tmp_path / 'empty')) is None
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache = CompiledModelCache(str(tmp_path / 'cache'), max_bytes=2500)
+    first = CODE
+    second = CODE.replace('der(h) = -g', 'der(h) = -2 * g')
+    third = CODE.replace('der(h) = -g', 'der(h) = -3 * g')
+    cache.store('Ball', first, _build(tmp_path / 'b1'))
+    cache.store('Ball', second, _build(tmp_path / 'b2'))
+    # 访问第一个条目后，最久未使用的是第二个
+    meta_file = os.path.join(cache.lookup('Ball', first)[0].directory, 'meta.json')
+    os.utime(meta_file, (os.path.getmtime(meta_file) + 10,) * 2)
+    cache.store('Ball', third, _build(tmp_path / 'b3'))
+
+    assert cache.lookup('Ball', second) is None
+    assert cache.lookup('Ball', first) is not None
+    assert cache.lookup('Ball', third) is not None
+
+
+def test_lookup_links_into_task_dir(tmp_path):
+    cache = CompiledModelCache(str(tmp_path / 'cache'), max_bytes=1500)
+    cache.store('Ball', CODE, _build(tmp_path / 'build'))
+    task_dir = tmp_path / 'task'
+    os.makedirs(task_dir)
+
+    compiled, _ = cache.lookup('Ball', CODE, str(task_dir))
+    assert compiled.directory == str(task_dir)
+    assert os.path.exists(compiled.executable)
+
+    # 运行期间条目被淘汰，任务目录中的可执行文件不受影响
+    cache.store('Ball', CODE.replace('der(h) = -g', 'der(h) = -2 * g'), _build(tmp_path / 'other'))
+    assert cache.lookup('Ball', CODE) is None
+    assert os.path.exists(compiled.executable)
@@ -0,0 +1,107 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.modelica.downsample import (
+    ResolutionPyramid, PyramidCache, largest_triangle_three_buckets, overview
+)
+
+COUNT = 100001
+
+
+@pytest.fixture
+def signal():
+    time = np.linspace(0.0, 10.0, COUNT)
+    values = np.sin(7 * time)
+    values[54321] = 9.0
+    values[12345] = -9.0
+    return time, values
+
+
+def test_minmax_keeps_extremes(signal):
+    time, values = signal
+    pyramid = ResolutionPyramid(time, values)
+    assert pyramid.levels
+
+    result = pyramid.query(None, None, 800)
+    assert len(result['time']) <= 2 * 800
+    assert max(result['values']) == 9.0
+    assert min(result['values']) == -9.0
+    assert result['points_in_window'] == COUNT
+    assert np.all(np.diff(result['time']) > 0)
+
+
+def test_minmax_window(signal):
+    time, values = signal
+    result = ResolutionPyramid(time, values).query(2.0, 3.0, 100)
+    # 窗口两侧各多取一个点，折线可以连到窗口边缘
+    assert result['time'][0] <= 2.0 < result['time'][1]
+    assert result['time'][-2] < 3.0 <= result['time'][-1]
+    assert len(result['time']) <= 2 * 100 + 2
+
+
+def test_small_window_returns_raw_samples(signal):
+    time, values = signal
+    result = ResolutionPyramid(time, values).query(5.0, 5.0005, 800)
+    assert result['level'] == 0
+    i0 = np.searchsorted(time, 5.0, side='left') - 1
+    i1 = np.searchsorted(time, 5.0005, side='right') + 1
+    np.testing.assert_array_equal(result['values'], values[i0:i1])
+
+
+def test_lttb(signal):
+    time, values = signal
+    result = ResolutionPyramid(time, values).query(None, None, 500, method='lttb')
+    assert len(result['time']) == 500
+    assert result['time'][0] == 0.0 and result['time'][-1] == 10.0
+
+    with pytest.raises(ValueError):
+        ResolutionPyramid(time, values).query(None, None, 500, method='mean')
+
+
+def test_largest_triangle_three_buckets_endpoints():
+    x = np.arange(1000, dtype=np.float64)
+    selected = largest_triangle_three_buckets(x, np.sin(x), 50)
+    assert len(selected) == 50
+    assert selected[0] == 0 and selected[-1] == 999
+    assert np.all(np.diff(selected) > 0)
+    np.testing.assert_array_equal(largest_triangle_three_buckets(x[:10], x[:10], 50), np.arange(10))
+
+
+def test_overview_shares_time_axis(signal):
+    time, values = signal
+    velocity = np.cos(3 * time)
+    result = overview(time, {'height': values, 'velocity': velocity}, 800)
+    assert len(result['time']) <= 2 * 800 * 2 + 2
+    assert result['time'][0] == 0.0 and result['time'][-1] == 10.0
+    assert result['values']['height'].max() == 9.0
+    assert result['values']['height'].min() == -9.0
+    assert len(result['values']['velocity']) == len(result['time'])
+
+    short = overview(time[:100], {'height': values[:100]}, 800)
+    assert len(short['time']) == 100
+
+
+def test_pyramid_cache(tmp_path, signal):
+    time, values = signal
+    result_file = tmp_path / 'result.mat'
+    result_file.write_bytes(b'')
+    loads = []
+
+    def load():
+        loads.append(1)
+        return time, values
+
+    cache = PyramidCache(max_entries=1)
+    first = cache.get(str(result_file), 'height', load)
+    assert cache.get(str(result_file), 'height', load) is first
+    cache.get(str(result_file), 'velocity', load)
+    cache.get(str(result_file), 'height', load)
+    assert len(loads) == 3
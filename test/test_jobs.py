@@ -0,0 +1,107 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.modelica.jobs import (
+    CANCELLED, FAILED, QUEUED, SUCCEEDED, TIMEOUT, QueueFullError, SimulationJobQueue
+)
+
+
+def _wait(job, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.finished
+
+
+def _runner(status: str = '仿真成功'):
+    def run(modelica_code, model_name, control, *args):
+        if modelica_code == 'slow':
+            while True:
+                control.check()
+                time.sleep(0.01)
+        return {
+            'status': status,
+            'result_id': f'{model_name}_run',
+            'error': None if status == '仿真成功' else 'boom',
+            'data': {'time': [0.0, 1.0]}
+        }
+    return run
+
+
+def test_job_succeeds():
+    jobs = SimulationJobQueue(_runner(), workers=1)
+    job = jobs.submit('model M end M;', 'M')
+    _wait(job)
+    assert job.status == SUCCEEDED
+    assert job.to_dict()['job_id'] == job.id
+    # 只保留结果ID，结果数据从结果存储读取
+    assert job.to_dict()['result_id'] == 'M_run'
+    assert not hasattr(job, 'result')
+    assert jobs.get_metrics()['completed'][SUCCEEDED] == 1
+
+
+@pytest.mark.parametrize('status', ['仿真失败', '仿真成功但处理结果失败'])
+def test_job_fails(status):
+    jobs = SimulationJobQueue(_runner(status), workers=1)
+    job = jobs.submit('model M end M;', 'M')
+    _wait(job)
+    assert job.status == FAILED
+    assert job.error == 'boom'
+
+
+def test_job_timeout():
+    jobs = SimulationJobQueue(_runner(), workers=1)
+    job = jobs.submit('slow', 'M', timeout=0.2)
+    _wait(job)
+    assert job.status == TIMEOUT
+
+
+def test_cancel_running_and_queued():
+    jobs = SimulationJobQueue(_runner(), workers=1, default_timeout=None)
+    running = jobs.submit('slow', 'M')
+    queued = jobs.submit('model M end M;', 'M')
+    deadline = time.monotonic() + 5
+    while running.status == QUEUED and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert jobs.cancel(queued.id).status == CANCELLED
+    jobs.cancel(running.id)
+    _wait(running)
+    assert running.status == CANCELLED
+    assert jobs.cancel('missing') is None
+
+
+def test_queue_full():
+    release = threading.Event()
+
+    def blocked(modelica_code, model_name, control, *args):
+        release.wait(5)
+        return {'status': '仿真成功'}
+
+    jobs = SimulationJobQueue(blocked, workers=1, max_queue=1)
+    first = jobs.submit('a', 'M')
+    deadline = time.monotonic() + 5
+    while first.status == QUEUED and time.monotonic() < deadline:
+        time.sleep(0.01)
+    jobs.submit('b', 'M')
+    with pytest.raises(QueueFullError):
+        jobs.submit('c', 'M')
+    release.set()
+
+
+def test_retention():
+    jobs = SimulationJobQueue(_runner(), workers=1, retention=2)
+    submitted = [jobs.submit('model M end M;', 'M') for _ in range(4)]
+    for job in submitted:
+        _wait(job)
+    assert jobs.get(submitted[0].id) is None
+    assert jobs.get(submitted[-1].id) is submitted[-1]
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.db.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+def test_tokenize_mixed_text():
+    tokens = tokenize('弹跳小球 FallingMarble model spring_mass')
+    assert tokens[:3] == ['弹跳', '跳小', '小球']
+    assert 'fallingmarble' in tokens and 'falling' in tokens and 'marble' in tokens
+    assert 'spring_mass' in tokens and 'spring' in tokens and 'mass' in tokens
+    # Modelica关键字不作为检索词
+    assert 'model' not in tokens
+
+
+def test_reciprocal_rank_fusion():
+    # k=1时 a: 1/2，b: 1/3 + 1/3，c: 1/4 + 1/2
+    assert reciprocal_rank_fusion([['a', 'b', 'c'], ['c', 'b']], k=1) == ['c', 'b', 'a']
+    assert reciprocal_rank_fusion([['a', 'b'], ['a', 'b']])[:2] == ['a', 'b']
+
+
+def test_bm25_search_and_remove():
+    index = BM25Index()
+    index.add('ball', '弹跳小球 BouncingBall 小球从高处落下并弹起')
+    index.add('spring', '弹簧振子 SpringMass 质量块在弹簧上振动')
+    index.add('tank', '水箱液位 WaterTank 液位控制')
+    assert len(index) == 3
+
+    results = index.search('小球弹跳', n_results=2)
+    assert results[0][0] == 'ball'
+    assert 0 < results[0][1] <= 1
+    assert index.search('SpringMass')[0][0] == 'spring'
+    assert index.search('电路') == []
+
+    index.remove('ball')
+    assert len(index) == 2
+    assert all(doc_id != 'ball' for doc_id, _ in index.search('小球弹跳'))
+
+    # 替换已有文档
+    index.add('spring', '水箱')
+    assert index.search('SpringMass') == []
@@ -0,0 +1,99 @@
+import struct
+import sys
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pytest
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.modelica.mat_reader import MatResultReader, MatResultTail
+
+NAMES = ['time', 'height', 'velocity', 'g', 'mass', 'speed']
+DESCRIPTIONS = ['Time', 'Height', 'Velocity', 'Gravity', 'Mass', 'Negated velocity']
+# dataInfo：(数据矩阵, 列号)，负列号表示取反的别名
+DATA_INFO = [[0, 1], [2, 2], [2, 3], [1, 1], [1, 2], [2, -3]]
+TIME = np.linspace(0.0, 1.0, 5)
+TRAJECTORIES = np.vstack([TIME, 10 - TIME ** 2, -2 * TIME])
+
+
+def _matrix(name: str, array: np.ndarray, precision: int = 0, text: bool = False,
+            ncols: Optional[int] = None) -> bytes:
+    """MAT v4矩阵：头部 | 名称 | 按列存放的数据"""
+    mrows, columns = array.shape
+    dtype = {0: '<f8', 2: '<i4', 5: 'u1'}[precision]
+    name_bytes = name.encode('ascii') + b'\0'
+    header = struct.pack('<5i', precision * 10 + int(text), mrows,
+                         columns if ncols is None else ncols, 0, len(name_bytes))
+    return header + name_bytes + np.asarray(array, dtype=dtype).T.tobytes()
+
+
+def _chars(strings):
+    width = max(len(text) for text in strings)
+    return np.array([[ord(char) for char in text.ljust(width, '\0')] for text in strings], dtype=np.uint8)
+
+
+def _header() -> bytes:
+    """binTrans格式中data_2之前的所有矩阵"""
+    info = np.array([[matrix, column, 0, -1] for matrix, column in DATA_INFO]).T
+    return b''.join([
+        _matrix('Aclass', _chars(['Atrajectory', '1.1', '', 'binTrans']), 5, True),
+        _matrix('name', _chars(NAMES).T, 5, True),
+        _matrix('description', _chars(DESCRIPTIONS).T, 5, True),
+        _matrix('dataInfo', info, 2),
+        _matrix('data_1', np.array([[9.81, 9.81], [2.0, 2.0]]))
+    ])
+
+
+@pytest.fixture
+def result_file(tmp_path):
+    path = tmp_path / 'Ball_res.mat'
+    path.write_bytes(_header() + _matrix('data_2', TRAJECTORIES))
+    return str(path)
+
+
+def test_variables_and_descriptions(result_file):
+    reader = MatResultReader(result_file)
+    assert reader.variables == NAMES
+    assert reader.descriptions['speed'] == 'Negated velocity'
+    np.testing.assert_array_equal(reader.time, TIME)
+
+
+def test_read_trajectories_parameters_and_aliases(result_file):
+    series = MatResultReader(result_file).read()
+    assert set(series) == set(NAMES) - {'time'}
+    np.testing.assert_array_equal(series['height'], TRAJECTORIES[1])
+    np.testing.assert_array_equal(series['speed'], -TRAJECTORIES[2])
+    # 参数展开为与时间等长的常数序列
+    np.testing.assert_array_equal(series['g'], np.full(len(TIME), 9.81))
+    np.testing.assert_array_equal(series['mass'], np.full(len(TIME), 2.0))
+
+
+def test_read_selected_and_missing(result_file):
+    reader = MatResultReader(result_file)
+    assert list(reader.read(['velocity'])) == ['velocity']
+    with pytest.raises(KeyError):
+        reader.read(['missing'])
+
+
+def test_tail_reads_partially_written_file(tmp_path):
+    # 仿真进行中data_2头部的列数为0，只返回已完整写入的时间点
+    path = tmp_path / 'Ball_res.mat'
+    header = _header() + _matrix('data_2', TRAJECTORIES[:, :0], ncols=0)
+    columns = [TRAJECTORIES[:, i].astype('<f8').tobytes() for i in range(len(TIME))]
+    path.write_bytes(header + columns[0] + columns[1] + columns[2][:5])
+
+    tail = MatResultTail(str(path))
+    chunk = tail.poll()
+    assert chunk['start'] == 0
+    np.testing.assert_array_equal(chunk['data']['time'], TIME[:2])
+    assert tail.poll() is None
+
+    path.write_bytes(header + b''.join(columns))
+    chunk = tail.poll()
+    assert chunk['start'] == 2
+    np.testing.assert_array_equal(chunk['data']['values']['height'], TRAJECTORIES[1, 2:])
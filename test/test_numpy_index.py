@@ -0,0 +1,139 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.db import numpy_index
+from backend.db.numpy_index import NumpyCollection
+
+
+def _fill(collection):
+    collection.upsert(
+        ids=['x', 'y', 'xy'],
+        embeddings=[[1.0, 0.0], [0.0, 2.0], [1.0, 1.0]],
+        documents=['doc x', 'doc y', 'doc xy'],
+        metadatas=[{'n': 1}, {'n': 2}, {'n': 3}]
+    )
+
+
+def test_query_orders_by_distance():
+    collection = NumpyCollection('examples')
+    _fill(collection)
+    results = collection.query([[1.0, 0.1], [0.0, 1.0]], n_results=2)
+    assert results['ids'] == [['x', 'xy'], ['y', 'xy']]
+    assert results['documents'][0] == ['doc x', 'doc xy']
+    assert results['metadatas'][1] == [{'n': 2}, {'n': 3}]
+    # 归一化向量的平方L2距离
+    assert results['distances'][1][0] == pytest.approx(0.0, abs=1e-6)
+    assert results['distances'][1][1] == pytest.approx(2 - np.sqrt(2), abs=1e-6)
+
+
+def test_query_empty():
+    collection = NumpyCollection('examples')
+    assert collection.query([[1.0, 0.0]], n_results=3) == {
+        'ids': [[]], 'documents': [[]], 'metadatas': [[]], 'distances': [[]]
+    }
+
+
+def test_upsert_updates_and_delete():
+    collection = NumpyCollection('examples')
+    _fill(collection)
+    collection.upsert(ids=['x'], embeddings=[[0.0, 1.0]], documents=['moved'], metadatas=[{'n': 4}])
+    assert collection.count() == 3
+    assert collection.get(ids=['x', 'missing'])['documents'] == ['moved']
+    assert collection.query([[0.0, 1.0]], n_results=3)['distances'][0][:2] == pytest.approx([0.0, 0.0], abs=1e-6)
+
+    collection.delete(['y', 'missing'])
+    assert collection.get()['ids'] == ['x', 'xy']
+    assert collection.query([[1.0, 1.0]], n_results=1)['ids'] == [['xy']]
+
+    with pytest.raises(ValueError):
+        collection.upsert(ids=['z'], embeddings=[[1.0, 0.0, 0.0]], documents=[''], metadatas=[{}])
+
+
+def test_persistence(tmp_path):
+    collection = NumpyCollection('examples', str(tmp_path))
+    _fill(collection)
+    collection.delete(['y'])
+
+    reloaded = NumpyCollection('examples', str(tmp_path))
+    assert reloaded.get() == collection.get()
+    assert reloaded.query([[1.0, 0.0]], n_results=1)['ids'] == [['x']]
+    reloaded.upsert(ids=['z'], embeddings=[[0.0, 1.0]], documents=['doc z'], metadatas=[{}])
+    assert NumpyCollection('examples', str(tmp_path)).count() == 3
+
+
+def test_writes_do_not_modify_query_snapshot():
+    collection = NumpyCollection('examples')
+    _fill(collection)
+    # 查询在锁外使用的矩阵和列表
+    matrix, ids, documents = collection._matrix, collection._ids, collection._documents
+    rows = np.array(matrix[:len(ids)])
+
+    collection.upsert(ids=['x', 'z'], embeddings=[[0.0, 1.0], [1.0, 0.0]],
+                      documents=['moved', 'doc z'], metadatas=[{}, {}])
+    collection.upsert(ids=['w'], embeddings=[[1.0, 0.0]], documents=['doc w'], metadatas=[{}])
+    collection.delete(['y'])
+    assert ids == ['x', 'y', 'xy']
+    assert documents == ['doc x', 'doc y', 'doc xy']
+    np.testing.assert_array_equal(matrix[:len(ids)], rows)
+    assert collection.get()['ids'] == ['x', 'xy', 'z', 'w']
+
+
+def test_appends_reuse_spare_rows():
+    collection = NumpyCollection('examples')
+    _fill(collection)
+    for i in range(20):
+        collection.upsert(ids=[f'n{i}'], embeddings=[[1.0, float(i)]], documents=[''], metadatas=[{}])
+    assert collection.count() == 23
+    # 容量按倍数增长，矩阵不必每次复制
+    assert collection._matrix.shape[0] < 2 * 23
+    assert collection.query([[1.0, 19.0]], n_results=1)['ids'] == [['n19']]
+
+
+def test_writes_append_to_log_and_compact(tmp_path, monkeypatch):
+    monkeypatch.setattr(numpy_index, 'COMPACT_MIN_RECORDS', 4)
+    collection = NumpyCollection('examples', str(tmp_path))
+    _fill(collection)
+    collection.upsert(ids=['x'], embeddings=[[0.0, 1.0]], documents=['moved'], metadatas=[{'n': 4}])
+    log_file = tmp_path / 'examples.log'
+    # 写入只追加日志，不重写快照
+    assert len(log_file.read_text(encoding='utf-8').splitlines()) == 2
+    assert not (tmp_path / 'examples.npy').exists()
+    reloaded = NumpyCollection('examples', str(tmp_path))
+    assert reloaded.get() == collection.get()
+
+    # 日志中的条目数超过上限和当前条目数时合并为快照
+    collection.delete(['y'])
+    assert log_file.read_text(encoding='utf-8') == ''
+    assert (tmp_path / 'examples.npy').exists()
+    collection.upsert(ids=['y'], embeddings=[[0.0, 2.0]], documents=['again'], metadatas=[{}])
+    reloaded = NumpyCollection('examples', str(tmp_path))
+    assert reloaded.get() == collection.get()
+    assert reloaded.get()['ids'] == ['x', 'xy', 'y']
+    np.testing.assert_allclose(
+        reloaded.query([[0.0, 1.0]], n_results=3)['distances'],
+        collection.query([[0.0, 1.0]], n_results=3)['distances'],
+        atol=1e-6
+    )
+
+
+def test_torn_log_record_is_ignored(tmp_path):
+    collection = NumpyCollection('examples', str(tmp_path))
+    _fill(collection)
+    log_file = tmp_path / 'examples.log'
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write('{"op": "upsert", "ids": ["z"')
+
+    reloaded = NumpyCollection('examples', str(tmp_path))
+    assert reloaded.get() == collection.get()
+    # 不完整的记录在加载时合并掉，之后的写入不会接在它后面
+    assert log_file.read_text(encoding='utf-8') == ''
+    reloaded.upsert(ids=['z'], embeddings=[[1.0, 0.0]], documents=['doc z'], metadatas=[{}])
+    assert NumpyCollection('examples', str(tmp_path)).count() == 4
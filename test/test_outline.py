@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.modelica.outline import tokenize, parse_outline
+
+BALL = '''model Ball "falling ball" // model Fake
+  import SI = Modelica.Units.SI;
+  parameter Real g = 9.81 "gravity";
+  parameter SI.Height h0(start=1) = 10;
+  Real h(start = h0) "/* not a comment */";
+equation
+  der(h) = -g;
+  annotation(experiment(StopTime = 5, Interval=0.01));
+end Ball;
+model Other
+end Other;'''
+
+
+def test_tokenize_kinds():
+    tokens = list(tokenize('x := 1.5e-3; // c\n"a\\"b" /* d */', comments=True))
+    assert [(token.kind, token.text) for token in tokens] == [
+        ('ident', 'x'), ('operator', ':='), ('number', '1.5e-3'), ('operator', ';'),
+        ('comment', '// c'), ('string', '"a\\"b"'), ('comment', '/* d */')
+    ]
+    assert tokens[-1].line == 2
+
+
+def test_tokenize_skips_comments_by_default():
+    assert [token.text for token in tokenize('a /* b */ c // d')] == ['a', 'c']
+
+
+def test_parse_outline():
+    outline = parse_outline(BALL)
+    assert outline['name'] == 'Ball'
+    assert outline['kind'] == 'model'
+    assert outline['description'] == 'falling ball'
+    assert outline['classes'] == [{'kind': 'model', 'name': 'Ball'}, {'kind': 'model', 'name': 'Other'}]
+    assert outline['imports'] == ['SI = Modelica.Units.SI']
+    assert outline['parameters'] == [
+        {'name': 'g', 'type': 'Real', 'default': 9.81, 'description': 'gravity'},
+        {'name': 'h0', 'type': 'SI.Height', 'default': 10.0, 'description': None}
+    ]
+    assert outline['experiment'] == {'StopTime': 5.0, 'Interval': 0.01}
+    assert BALL[:outline['end']].endswith('end Ball;')
+
+
+def test_parse_outline_fenced():
+    outline = parse_outline('Here:\n```modelica\n' + BALL + '\n```\nDone')
+    assert outline['name'] == 'Ball'
+    assert outline['end'] == parse_outline(BALL)['end']
+
+
+def test_parse_outline_streamed_prefixes():
+    # 类名之后还没有其他记号时名称可能尚未生成完
+    assert parse_outline(BALL[:len('model Bal')])['name'] is None
+    assert parse_outline(BALL[:len('model Ball ')])['name'] is None
+    assert parse_outline(BALL[:len('model Ball "f')])['name'] == 'Ball'
+
+    for cut in range(len(BALL)):
+        outline = parse_outline(BALL[:cut])
+        if outline['end'] is not None:
+            assert cut >= parse_outline(BALL)['end']
+
+
+def test_parse_outline_unterminated():
+    outline = parse_outline('```modelica\nmodel A\n  Real x;\nequation\n  if x > 0 then\n    x = 1;\n  end if;\n')
+    assert outline['name'] == 'A'
+    assert outline['end'] is None
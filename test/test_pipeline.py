@@ -0,0 +1,149 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.modelica import session_pool
+from backend.modelica.pipeline import SimulationPipeline, import_libraries
+from backend.modelica.session_pool import OMCSessionPool
+
+MODEL = '''```modelica
+model Ball
+  import SI = Modelica.Units.SI;
+  Real h(start = 1);
+equation
+  der(h) = -1;
+end Ball;
+```
+The model describes a falling ball.'''
+
+
+class FakeOMC:
+    def __init__(self):
+        self.classes = []
+
+    def sendExpression(self, expression: str):
+        if expression.startswith('loadModel('):
+            self.classes.append(expression[len('loadModel('):-1])
+            return True
+        if expression == 'getClassNames()':
+            return tuple(self.classes)
+        return ''
+
+
+def _feed(pipeline: SimulationPipeline, text: str, size: int = 7) -> None:
+    for i in range(0, len(text), size):
+        pipeline.feed('Ball', text[i:i + size])
+
+
+def test_import_libraries():
+    assert import_libraries(['SI = Modelica.Units.SI', 'Modelica.Constants.pi', 'Lib.*']) == [
+        'Modelica', 'Modelica', 'Lib'
+    ]
+
+
+def test_simulation_starts_at_end_of_model():
+    calls = []
+
+    def simulate(code, model_name, control, session):
+        calls.append((code, model_name, session))
+        return {'status': '仿真成功', 'model_name': model_name}
+
+    pipeline = SimulationPipeline(simulate, lambda result_id: None)
+    end = MODEL.index('end Ball;') + len('end Ball;')
+    _feed(pipeline, MODEL[:end - 1])
+    assert not pipeline.started
+    pipeline.feed('Ball', MODEL[end - 1:end])
+    assert pipeline.started
+
+    # 模型之后的说明文字不影响仿真
+    _feed(pipeline, MODEL[end:])
+    events = list(pipeline.finish())
+    assert events[-1] == ('result', {'status': '仿真成功', 'model_name': 'Ball'})
+    code, model_name, session = calls[0]
+    assert code.strip().startswith('model Ball') and code.endswith('end Ball;')
+    assert session is None
+
+
+def test_incomplete_model():
+    pipeline = SimulationPipeline(lambda *args: {}, lambda result_id: None)
+    _feed(pipeline, MODEL[:MODEL.index('end Ball;')])
+    assert list(pipeline.finish()) == [('error', {'status': '仿真失败', 'error': '生成的代码中没有完整的模型定义'})]
+
+
+def test_close_cancels_running_simulation():
+    started = threading.Event()
+    stopped = threading.Event()
+
+    def simulate(code, model_name, control, session):
+        started.set()
+        try:
+            while True:
+                control.check()
+                control.cancel_event.wait(0.01)
+        finally:
+            stopped.set()
+
+    pipeline = SimulationPipeline(simulate, lambda result_id: None, timeout=30)
+    _feed(pipeline, MODEL)
+    assert started.wait(5)
+    pipeline.close()
+    assert stopped.wait(5)
+
+
+def test_session_reserved_and_libraries_preloaded(monkeypatch):
+    monkeypatch.setattr(session_pool, 'OMCSessionZMQ', FakeOMC)
+    pool = OMCSessionPool(size=1, preload_libraries=[])
+    sessions = []
+
+    def simulate(code, model_name, control, session):
+        sessions.append(session)
+        return {'status': '仿真成功'}
+
+    pipeline = SimulationPipeline(simulate, lambda result_id: None, session_pool=pool, timeout=5)
+    _feed(pipeline, MODEL)
+    assert list(pipeline.finish())[-1][0] == 'result'
+    assert sessions[0] is not None
+    assert sessions[0].omc.classes == ['Modelica']
+    assert pool.checkout(timeout=5) is sessions[0]
+
+
+def test_invalid_model_waits_for_checked_code():
+    codes = []
+
+    def simulate(code, model_name, control, session):
+        codes.append(code)
+        return {'status': '仿真成功', 'model_name': model_name}
+
+    def validate(code):
+        return [{'line': 4, 'reference': 'x', 'message': 'bad'}] if 'der(h) = -1' in code else []
+
+    pipeline = SimulationPipeline(simulate, lambda result_id: None, validate=validate)
+    _feed(pipeline, MODEL)
+    # 引用检查未通过时不提前仿真
+    assert not pipeline.started
+
+    repaired = MODEL.replace('der(h) = -1', 'der(h) = -2')
+    events = list(pipeline.finish(repaired))
+    assert events[-1] == ('result', {'status': '仿真成功', 'model_name': 'Ball'})
+    assert codes == [repaired[repaired.index('model Ball'):repaired.index('end Ball;') + len('end Ball;')]]
+
+
+def test_finish_with_checked_code_after_early_start():
+    codes = []
+
+    def simulate(code, model_name, control, session):
+        codes.append(code)
+        return {'status': '仿真成功'}
+
+    pipeline = SimulationPipeline(simulate, lambda result_id: None, validate=lambda code: [])
+    _feed(pipeline, MODEL)
+    assert pipeline.started
+    assert list(pipeline.finish(MODEL))[-1][0] == 'result'
+    assert len(codes) == 1
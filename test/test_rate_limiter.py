@@ -0,0 +1,53 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.providers.rate_limiter import (
+    RateLimiter, RateLimitTimeout, estimate_request_tokens, estimate_tokens
+)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens('') == 0
+    assert estimate_tokens('abcdefgh') == 2
+    assert estimate_tokens('弹跳小球') == 4
+    assert estimate_request_tokens([{'role': 'user', 'content': 'abcd'}], max_tokens=100) == 1 + 4 + 100
+
+
+def test_unlimited():
+    limiter = RateLimiter(0, 0)
+    for _ in range(100):
+        assert limiter.acquire(10 ** 6) < 0.05
+    assert limiter.get_stats()['requests_per_minute'] is None
+
+
+def test_requests_wait_for_refill():
+    # 每秒补充一个请求配额
+    limiter = RateLimiter(60, 0)
+    for _ in range(60):
+        limiter.acquire(0)
+    start = time.monotonic()
+    waited = limiter.acquire(0)
+    assert 0.5 < waited and time.monotonic() - start < 2
+    assert limiter.get_stats()['throttled_requests'] == 1
+
+
+def test_timeout_when_quota_exhausted():
+    limiter = RateLimiter(0, 600, max_wait=0.1)
+    limiter.acquire(600)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(100)
+
+
+def test_settle_returns_unused_tokens():
+    limiter = RateLimiter(0, 600, max_wait=0.1)
+    limiter.acquire(600)
+    limiter.settle(600, 100)
+    assert limiter.acquire(400, timeout=0) < 0.05
@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.modelica.result_store import ResultStore
+
+
+def _run(store: ResultStore, model_name: str = 'Ball', size: int = 10):
+    run_id, run_dir = store.create_run(model_name)
+    source = os.path.join(run_dir, f"{model_name}_res.mat")
+    with open(source, 'wb') as f:
+        f.write(b'x' * size)
+    result_file = store.promote(run_id, source)
+    store.release(run_id)
+    return run_id, run_dir, result_file
+
+
+def test_run_lifecycle(tmp_path):
+    store = ResultStore(str(tmp_path))
+    run_id, run_dir, result_file = _run(store)
+    assert run_id.startswith('Ball_')
+    assert not os.path.exists(run_dir)
+    assert os.path.dirname(result_file) == store.results_dir
+    assert store.result_path(run_id) == result_file
+    assert store.result_path('missing') is None
+    assert store.get_stats()['runs'] == 1
+    assert store.get_stats()['result_bytes'] == 10
+
+
+def test_evict_by_size_oldest_first(tmp_path):
+    store = ResultStore(str(tmp_path), max_bytes=25)
+    first, _, first_file = _run(store)
+    time.sleep(0.01)
+    second, _, _ = _run(store)
+    time.sleep(0.01)
+    third, _, _ = _run(store)
+
+    assert store.evict() == 1
+    assert store.result_path(first) is None
+    assert not os.path.exists(first_file)
+    assert store.result_path(second) is not None and store.result_path(third) is not None
+
+
+def test_evict_expired(tmp_path):
+    store = ResultStore(str(tmp_path), max_age=0.05)
+    run_id, _, _ = _run(store)
+    time.sleep(0.1)
+    assert store.evict() == 1
+    assert store.result_path(run_id) is None
+    assert store.get_stats()['runs'] == 0
+
+
+def test_tag_and_find(tmp_path):
+    store = ResultStore(str(tmp_path))
+    assert store.find('key') is None
+    run_id, _, result_file = _run(store)
+    store.tag(run_id, 'key')
+    assert store.find('key') == (run_id, result_file)
+
+    time.sleep(0.01)
+    newer, _, newer_file = _run(store)
+    store.tag(newer, 'key')
+    assert store.find('key') == (newer, newer_file)
+
+    # 结果文件已删除时视为没有记录
+    os.remove(newer_file)
+    os.remove(result_file)
+    assert store.find('key') is None
+
+
+def test_runs_visible_to_other_instances(tmp_path):
+    # 同一目录上的另一个实例（例如另一个进程）
+    store = ResultStore(str(tmp_path))
+    other = ResultStore(str(tmp_path))
+
+    run_id, _, result_file = _run(store)
+    store.tag(run_id, 'key')
+    assert other.result_path(run_id) == result_file
+    assert ResultStore(str(tmp_path)).find('key') == (run_id, result_file)
+
+    # 另一个实例淘汰时能看到本实例之后创建的运行
+    other.max_bytes = 0
+    assert other.evict() == 1
+    assert store.result_path(run_id) is None
+    assert os.listdir(other.meta_dir) == []
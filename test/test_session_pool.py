@@ -0,0 +1,101 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.modelica import session_pool
+from backend.modelica.session_pool import OMCSessionPool, SessionReservation
+
+
+class FakeOMC:
+    """模拟OMCSessionZMQ，记录已加载的顶层类"""
+
+    def __init__(self):
+        self.classes = []
+        self.expressions = []
+
+    def sendExpression(self, expression: str):
+        self.expressions.append(expression)
+        if expression.startswith('loadModel('):
+            self.classes.append(expression[len('loadModel('):-1])
+            return True
+        if expression.startswith('deleteClass('):
+            self.classes.remove(expression[len('deleteClass('):-1])
+            return True
+        if expression == 'getClassNames()':
+            return tuple(self.classes)
+        return ''
+
+
+@pytest.fixture(autouse=True)
+def fake_omc(monkeypatch):
+    monkeypatch.setattr(session_pool, 'OMCSessionZMQ', FakeOMC)
+
+
+def test_sessions_are_reused_and_reset():
+    pool = OMCSessionPool(size=1)
+    session = pool.checkout()
+    assert session.omc.classes == ['Modelica']
+    session.omc.classes.append('Ball')
+    pool.checkin(session)
+
+    assert pool.checkout() is session
+    assert session.omc.classes == ['Modelica']
+    assert pool.get_stats()['created'] == 1
+
+
+def test_checkout_timeout():
+    pool = OMCSessionPool(size=1)
+    pool.checkout()
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        pool.checkout(timeout=0.1)
+    assert time.monotonic() - start < 2
+
+
+def test_failed_and_worn_out_sessions_are_recycled():
+    pool = OMCSessionPool(size=1, max_uses=2)
+    with pytest.raises(RuntimeError):
+        with pool.session() as session:
+            raise RuntimeError('omc crashed')
+    assert pool.get_stats()['recycled'] == 1
+
+    session = pool.checkout()
+    pool.checkin(session)
+    assert pool.checkout() is session
+    pool.checkin(session)
+    assert pool.get_stats()['recycled'] == 2
+    assert pool.checkout() is not session
+
+
+def test_waiter_wakes_when_session_is_discarded():
+    pool = OMCSessionPool(size=1)
+    session = pool.checkout()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.checkout(timeout=5)))
+    waiter.start()
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    pool.checkin(session, failed=True)
+    waiter.join()
+    assert time.monotonic() - start < 1
+    assert acquired and acquired[0] is not session
+
+
+def test_reservation_preloads_libraries():
+    pool = OMCSessionPool(size=1)
+    reservation = SessionReservation(pool, timeout=5)
+    reservation.preload(['Modelica', 'ThermoSysPro', 'bad name'])
+    session = reservation.acquire(5)
+    assert session.omc.classes == ['Modelica', 'ThermoSysPro']
+
+    reservation.release()
+    assert pool.checkout(timeout=5) is session
@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.config.settings import Settings
+from backend.modelica.simulation_setup import resolve_setup, variable_filter
+
+
+def test_defaults():
+    setup = resolve_setup()
+    for key, value in Settings.SIMULATION_SETTINGS.items():
+        assert setup[key] == value
+    assert setup['variableFilter'] == '.*'
+
+
+def test_interval_sets_number_of_intervals():
+    setup = resolve_setup({'startTime': 1, 'stopTime': '3', 'interval': 0.01, 'numberOfIntervals': 7})
+    assert setup['startTime'] == 1.0 and setup['stopTime'] == 3.0
+    assert setup['numberOfIntervals'] == 200
+    assert resolve_setup({'numberOfIntervals': '50'})['numberOfIntervals'] == 50
+
+
+@pytest.mark.parametrize('options', [
+    {'stopTime': 0},
+    {'startTime': 5, 'stopTime': 5},
+    {'tolerance': 0},
+    {'interval': -1},
+    {'numberOfIntervals': 0},
+    {'numberOfIntervals': Settings.SIMULATION_MAX_INTERVALS + 1},
+    {'stopTime': 'ten'},
+    {'tolerance': [1e-6]},
+    {'method': 'magic'},
+    {'variables': ['height;system("rm")']},
+    {'stopTime': 'nan'},
+    {'stopTime': float('inf')},
+    {'startTime': '-inf'},
+    {'tolerance': float('nan')},
+    {'interval': 'inf'},
+    {'interval': 1e-320},
+    {'numberOfIntervals': float('inf')},
+    {'numberOfIntervals': 'nan'},
+])
+def test_invalid_options(options):
+    with pytest.raises(ValueError):
+        resolve_setup(options)
+
+
+def test_method():
+    assert resolve_setup({'method': 'cvode'})['method'] == 'cvode'
+
+
+def test_variable_filter():
+    assert variable_filter(None) == '.*'
+    assert variable_filter([]) == '.*'
+    assert variable_filter(['height', 'der(h)', 'a.b[1]']) == r'time|height|der\(h\)|a\.b\[1\]'
+    assert variable_filter(['time', 'x']) == 'time|x'
+
+
+def test_variables_must_be_a_list():
+    # 字符串不能被当作逐个字符的变量列表
+    with pytest.raises(ValueError):
+        variable_filter('height')
+    with pytest.raises(ValueError):
+        resolve_setup({'variables': 'height'})
+
+
+def test_experiment_annotation_defaults():
+    setup = resolve_setup(experiment={'StartTime': 1.0, 'StopTime': 11.0, 'Interval': 0.5, 'Tolerance': 1e-8})
+    assert setup['startTime'] == 1.0 and setup['stopTime'] == 11.0
+    assert setup['numberOfIntervals'] == 20
+    assert setup['tolerance'] == 1e-8
+
+    # 请求中的设置优先，请求指定了输出间隔数时不再使用注解中的步长
+    setup = resolve_setup({'stopTime': 21, 'numberOfIntervals': 10}, {'StopTime': 11.0, 'Interval': 0.5})
+    assert setup['stopTime'] == 21.0 and setup['numberOfIntervals'] == 10
+
+    # 引用其他常量的表达式忽略
+    assert resolve_setup(experiment={'StopTime': 'tEnd'})['stopTime'] == Settings.SIMULATION_SETTINGS['stopTime']
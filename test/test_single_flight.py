@@ -0,0 +1,91 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.providers.single_flight import SingleFlight
+
+
+def _concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls, results = [], []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return 'answer'
+
+    threads = _concurrently(5, lambda: results.append(flight.do('key', fn)))
+    while flight.get_stats()['upstream_calls'] + flight.get_stats()['coalesced_calls'] < 5:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ['answer'] * 5
+    assert flight.get_stats() == {'in_flight': 0, 'upstream_calls': 1, 'coalesced_calls': 4}
+
+    # 调用结束后不缓存结果
+    assert flight.do('key', lambda: 'again') == 'again'
+
+
+def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError('upstream failed')
+
+    with pytest.raises(RuntimeError):
+        flight.do('key', fail)
+    assert flight.do('key', lambda: 1) == 1
+
+
+def test_stream_replays_received_items():
+    flight = SingleFlight()
+    first_item = threading.Event()
+    release = threading.Event()
+
+    def fn():
+        yield 'a'
+        first_item.set()
+        release.wait(5)
+        yield 'b'
+
+    leader = flight.stream('key', fn)
+    assert next(leader) == 'a'
+    assert first_item.wait(5)
+    # 后加入的调用方从头重放
+    follower = flight.stream('key', lambda: iter(['unused']))
+    assert next(follower) == 'a'
+    release.set()
+    assert list(leader) == ['b']
+    assert list(follower) == ['b']
+    assert flight.get_stats()['coalesced_calls'] == 1
+
+
+def test_stream_error():
+    flight = SingleFlight()
+
+    def fn():
+        yield 'a'
+        raise RuntimeError('broken stream')
+
+    stream = flight.stream('key', fn)
+    assert next(stream) == 'a'
+    with pytest.raises(RuntimeError):
+        next(stream)
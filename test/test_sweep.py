@@ -0,0 +1,70 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.modelica.process import run_process
+from backend.modelica.sweep import CANCEL_FILE, expand_points, run_point
+
+
+def test_expand_grid():
+    points = expand_points(grid={'k': [1, 2], 'm': [0.5]})
+    assert points == [{'k': '1.0', 'm': '0.5'}, {'k': '2.0', 'm': '0.5'}]
+
+
+def test_expand_points():
+    assert expand_points(points=[{'a.b': 3}, {'a.b': -1e-3}]) == [{'a.b': '3.0'}, {'a.b': '-0.001'}]
+
+
+@pytest.mark.parametrize('grid, points', [
+    (None, None),
+    ({'k': [1]}, [{'k': 1}]),
+    ({'k': []}, None),
+    ({'k': 1}, None),
+    (None, [{'k': '1; rm'}]),
+    (None, [{'k': True}]),
+    (None, [{'k=1 -x': 1}]),
+])
+def test_expand_invalid(grid, points):
+    with pytest.raises(ValueError):
+        expand_points(grid, points)
+
+
+class SleepingModel:
+    """运行时一直等待的已编译模型"""
+    model_name = 'Ball'
+
+    def run(self, task_dir, settings, overrides=None, control=None):
+        return run_process([sys.executable, '-c', 'import time; time.sleep(30)'], task_dir, control)
+
+
+def test_run_point_timeout(tmp_path):
+    start = time.monotonic()
+    result = run_point(SleepingModel(), str(tmp_path / 'point'), {}, 0, {'k': '1.0'}, timeout=0.5)
+    assert result['status'] == '仿真超时'
+    assert result['index'] == 0 and result['parameters'] == {'k': '1.0'}
+    assert time.monotonic() - start < 10
+
+
+def test_run_point_cancel_file(tmp_path):
+    cancel_file = str(tmp_path / CANCEL_FILE)
+    timer = threading.Timer(0.3, lambda: open(cancel_file, 'w').close())
+    timer.start()
+    start = time.monotonic()
+    result = run_point(SleepingModel(), str(tmp_path / 'point'), {}, 1, {}, cancel_file=cancel_file)
+    timer.join()
+    assert result['status'] == '仿真已取消'
+    assert time.monotonic() - start < 10
+
+    # 取消文件已存在时不再启动
+    result = run_point(SleepingModel(), str(tmp_path / 'next'), {}, 2, {}, cancel_file=cancel_file)
+    assert result['status'] == '仿真已取消'
+    assert os.path.isdir(tmp_path / 'next')
@@ -0,0 +1,93 @@
+import sys
+from pathlib import Path
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.modelica.msl_index import MslIndex
+from backend.modelica.validator import format_issues, validate_references
+
+TRANSLATIONAL = 'Modelica.Mechanics.Translational'
+FLANGE = [['s', 'Real', '', ''], ['f', 'Real', '', '']]
+INDEX = MslIndex({
+    'Modelica': ['package', [], []],
+    'Modelica.Units': ['package', [], []],
+    'Modelica.Units.SI': ['package', [], []],
+    'Modelica.Units.SI.Mass': ['type', [], []],
+    'Modelica.Mechanics': ['package', [], []],
+    TRANSLATIONAL: ['package', [], []],
+    f'{TRANSLATIONAL}.Interfaces': ['package', [], []],
+    f'{TRANSLATIONAL}.Interfaces.Flange_a': ['connector', FLANGE, []],
+    f'{TRANSLATIONAL}.Interfaces.Flange_b': ['connector', FLANGE, []],
+    f'{TRANSLATIONAL}.Interfaces.PartialTwoFlanges': ['model', [
+        ['flange_a', f'{TRANSLATIONAL}.Interfaces.Flange_a', '', ''],
+        ['flange_b', f'{TRANSLATIONAL}.Interfaces.Flange_b', '', '']
+    ], []],
+    f'{TRANSLATIONAL}.Components': ['package', [], []],
+    f'{TRANSLATIONAL}.Components.Mass': [
+        'model', [['m', 'Modelica.Units.SI.Mass', 'parameter', '']],
+        [f'{TRANSLATIONAL}.Interfaces.PartialTwoFlanges']
+    ],
+    f'{TRANSLATIONAL}.Components.Spring': [
+        'model', [['c', 'Real', 'parameter', '']],
+        [f'{TRANSLATIONAL}.Interfaces.PartialTwoFlanges']
+    ],
+    f'{TRANSLATIONAL}.Components.Fixed': ['model', [
+        ['s0', 'Real', 'parameter', ''],
+        ['flange', f'{TRANSLATIONAL}.Interfaces.Flange_b', '', '']
+    ], []]
+})
+
+OSCILLATOR = '''model Oscillator "spring and mass"
+  import Modelica.Mechanics.Translational.Components;
+  import SI = Modelica.Units.SI;
+  parameter SI.Mass m0 = 1 "mass; uses Damper d";
+  Components.Mass mass(m = m0);
+  Components.Spring spring(c = 10);
+  Modelica.Mechanics.Translational.Components.Fixed fixed(s0 = 0);
+  Helper helper; // Damper damper;
+  model Helper
+    Real x;
+  equation
+    der(x) = -x;
+  end Helper;
+equation
+  connect(fixed.flange, spring.flange_a);
+  connect(spring.flange_b, mass.flange_a);
+end Oscillator;'''
+
+BROKEN = '''model Broken
+  import Modelica.Mechanics.Translational.Parts;
+  Modelica.Mechanics.Translational.Components.Mass mass(m = 1, d = 2);
+  Parts.Spring spring;
+  Damper damper;
+  Modelica.Mechanics.Translational pkg;
+equation
+  connect(mass.flange_c, mass.flange_a);
+end Broken;'''
+
+
+def test_valid_model_has_no_issues():
+    assert validate_references(OSCILLATOR, INDEX) == []
+    assert validate_references('```modelica\n' + OSCILLATOR + '\n```', INDEX) == []
+
+
+def test_invalid_references():
+    issues = validate_references(BROKEN, INDEX)
+    # 通过错误import引用的类型不重复报告
+    assert [(issue['line'], issue['reference']) for issue in issues] == [
+        (2, f'{TRANSLATIONAL}.Parts'),
+        (3, f'{TRANSLATIONAL}.Components.Mass.d'),
+        (5, 'Damper'),
+        (6, TRANSLATIONAL),
+        (8, 'mass.flange_c')
+    ]
+
+
+def test_format_issues():
+    issues = validate_references(BROKEN, INDEX)
+    lines = format_issues(issues).split('\n')
+    assert len(lines) == len(issues)
+    assert lines[0] == f'第2行: 标准库中不存在{TRANSLATIONAL}.Parts'
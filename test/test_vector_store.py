@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.config.settings import Settings
+
+# 模块导入时创建共享的Azure OpenAI客户端，未配置时使用占位值（测试不会发出请求）
+for key in ('AZURE_OPENAI_API_KEY', 'AZURE_OPENAI_DEPLOYMENT_NAME', 'AZURE_OPENAI_EMBEDDING_DEPLOYMENT'):
+    if not getattr(Settings, key):
+        setattr(Settings, key, 'test')
+if not Settings.AZURE_OPENAI_ENDPOINT:
+    Settings.AZURE_OPENAI_ENDPOINT = 'https://example.invalid'
+
+from backend.db import vector_store
+from backend.db.vector_store import ModelicaVectorStore, embedding_text
+
+
+class FakeProvider:
+    """按文本本身生成向量：相同文本得到相同向量，不同文本的向量正交"""
+
+    def __init__(self):
+        self.texts = []
+        self._axes = {}
+
+    def get_embedding(self, text):
+        self.texts.append(text)
+        axis = self._axes.setdefault(text, len(self._axes))
+        return [1.0 if i == axis else 0.0 for i in range(16)]
+
+    def get_embeddings(self, texts):
+        return [self.get_embedding(text) for text in texts]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    provider = FakeProvider()
+    monkeypatch.setattr(vector_store, 'azure_openai', provider)
+    monkeypatch.setattr(Settings, 'EMBEDDING_CACHE_DIR', str(tmp_path / 'embedding_cache'))
+    return ModelicaVectorStore(collection_name='semantic_cache', backend='numpy'), provider
+
+
+def test_embedding_text():
+    assert embedding_text('falling ball', []) == 'falling ball'
+    assert embedding_text('falling ball', ['gravity', 'bounce']) == 'falling ball gravity bounce'
+
+
+def test_semantic_entry_matches_same_prompt(store):
+    semantic_cache, provider = store
+    semantic_cache.update_example('key', '小球从10米高处落下', [], 'model Ball end Ball;', 'Ball')
+    # 条目与查询按相同的文本获取embedding
+    matches = semantic_cache.search('小球从10米高处落下', similarity_threshold=0.01)
+    assert [match['id'] for match in matches] == ['key']
+    assert matches[0]['similarity_score'] == pytest.approx(1.0)
+    assert provider.texts == ['小球从10米高处落下']
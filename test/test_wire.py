@@ -0,0 +1,74 @@
+import json
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# 添加src目录到Python路径
+src_root = str(Path(__file__).parent.parent / 'src')
+if src_root not in sys.path:
+    sys.path.append(src_root)
+
+from backend.modelica.wire import BINARY_MIMETYPE, encode_binary, negotiate_dtype, to_jsonable
+
+RESULT = {
+    'status': '仿真成功',
+    'result_id': 'Ball_1',
+    'data': {
+        'time': np.linspace(0.0, 1.0, 3),
+        'values': {'height': np.array([10.0, 9.5, 8.0]), 'velocity': np.array([0.0, -1.0, -2.0])}
+    }
+}
+
+
+def _decode(buffer: bytes):
+    """按前端decodeBinaryResult的方式解析"""
+    assert buffer[:4] == b'SIMR'
+    header_length = struct.unpack_from('<I', buffer, 4)[0]
+    header = json.loads(buffer[8:8 + header_length].decode('utf-8'))
+    data_start = -(-(8 + header_length) // 8) * 8
+    dtype = '<f4' if header['dtype'] == 'float32' else '<f8'
+    columns = {}
+    for column in header['columns']:
+        assert (data_start + column['offset']) % 8 == 0
+        columns[column['name']] = np.frombuffer(
+            buffer, dtype=dtype, count=header['length'], offset=data_start + column['offset']
+        )
+    return header, columns
+
+
+def test_negotiate_dtype():
+    assert negotiate_dtype(None) is None
+    assert negotiate_dtype('application/json') is None
+    assert negotiate_dtype(f'{BINARY_MIMETYPE};q=0.9, application/json;q=0.8') == 'float64'
+    assert negotiate_dtype(f'application/json, {BINARY_MIMETYPE}; dtype=float32') == 'float32'
+    assert negotiate_dtype(f'{BINARY_MIMETYPE}; dtype=int8') == 'float64'
+
+
+def test_encode_binary_round_trip():
+    header, columns = _decode(encode_binary(RESULT))
+    assert header['result'] == {'status': '仿真成功', 'result_id': 'Ball_1'}
+    assert [column['name'] for column in header['columns']] == ['time', 'height', 'velocity']
+    np.testing.assert_array_equal(columns['time'], RESULT['data']['time'])
+    np.testing.assert_array_equal(columns['velocity'], RESULT['data']['values']['velocity'])
+
+
+def test_encode_binary_float32_alignment():
+    result = dict(RESULT, data={'time': np.arange(3.0), 'values': {'x': np.arange(3.0) * 0.5}})
+    header, columns = _decode(encode_binary(result, 'float32'))
+    assert header['dtype'] == 'float32'
+    np.testing.assert_array_equal(columns['x'], np.array([0.0, 0.5, 1.0], dtype=np.float32))
+
+
+def test_encode_binary_without_data():
+    header, columns = _decode(encode_binary({'status': '仿真失败', 'error': 'x'}))
+    assert header['length'] == 0
+    assert header['result']['status'] == '仿真失败'
+
+
+def test_to_jsonable():
+    converted = to_jsonable(RESULT)
+    assert converted['data']['values']['height'] == [10.0, 9.5, 8.0]
+    json.dumps(converted)
+    assert to_jsonable({'status': '仿真失败'}) == {'status': '仿真失败'}